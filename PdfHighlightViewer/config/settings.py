@@ -1,7 +1,13 @@
 import configparser
 import os
 
-from ..export.formats import PdfExportMode
+from ..export.formats import (
+    ExcelImageFormat, ExcelSplitMode, ImageArchiveMode, ImageColorMode, ImageEncodeFormat, ImageExportMode,
+    PdfExportMode, PdfSavePreset,
+)
+
+# キャッシュディレクトリの既定値
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.pdf_highlight_viewer', 'cache')
 
 class Settings:
     """
@@ -47,18 +53,46 @@ class Settings:
         self.highlight_color_max = (255, 255, 50)
         self.text_color_min = (200, 0, 0)
         self.text_color_max = (255, 50, 50)
+        # 名前付きの色範囲 (1要素に1つ。空の場合は上の範囲を使う)
+        self.highlight_color_ranges = []
+        self.text_color_ranges = []
 
         # 抽出設定
         self.extract_highlights = True
         self.extract_text_color = False
         self.extract_keyword = False
         self.extraction_keyword = ""
+        self.raster_highlight_detection = False
+        self.raster_detection_dpi = 60
+        # 開いているファイルが更新されたら、変更されたページを抽出し直す
+        self.auto_reextract = True
 
         # エクスポート設定
         self.pdf_export_mode = PdfExportMode.ONE_PAGE.value
         self.excel_image_scale = 2.0
         self.image_export_border_width = 5
         self.pdf_export_border_width = 1.5
+        self.pdf_save_preset = PdfSavePreset.BALANCED.value
+        self.image_export_mode = ImageExportMode.PAGE.value
+        self.image_export_margin = 20.0
+        self.excel_image_format = ExcelImageFormat.PNG.value
+        self.excel_jpeg_quality = 85
+        self.excel_rows_per_part = 0
+        self.excel_split_mode = ExcelSplitMode.SHEET.value
+        self.image_encode_format = ImageEncodeFormat.PNG.value
+        self.png_compress_level = 6
+        self.image_quality = 90
+        self.image_color_mode = ImageColorMode.RGB.value
+        self.image_export_dpi = 300
+        self.image_archive_mode = ImageArchiveMode.FOLDER.value
+        self.image_archive_manifest = True
+        self.incremental_image_export = False
+
+        # キャッシュ設定
+        self.cache_dir = DEFAULT_CACHE_DIR
+        self.render_cache_size_mb = 512
+        # この大きさ (MB) 以下のPDFはメモリに読み込んで開く (0で無効)
+        self.in_memory_open_max_mb = 0
 
     def load(self):
         """設定ファイルから設定を読み込みます。
@@ -88,17 +122,59 @@ class Settings:
         self.text_color_min = (min_r_t, min_g_t, min_b_t)
         self.text_color_max = (max_r_t, max_g_t, max_b_t)
 
+        self.highlight_color_ranges = self._get_lines('HighlightColor', 'Ranges')
+        self.text_color_ranges = self._get_lines('TextColor', 'Ranges')
+
         # 抽出設定
         self.extract_highlights = self.config.getboolean('Extraction', 'ExtractHighlights', fallback=True)
         self.extract_text_color = self.config.getboolean('Extraction', 'ExtractTextColor', fallback=False)
         self.extract_keyword = self.config.getboolean('Extraction', 'ExtractKeyword', fallback=False)
         self.extraction_keyword = self.config.get('Extraction', 'Keyword', fallback="")
+        self.raster_highlight_detection = self.config.getboolean('Extraction', 'RasterHighlightDetection', fallback=False)
+        self.raster_detection_dpi = self.config.getint('Extraction', 'RasterDetectionDpi', fallback=60)
+        self.auto_reextract = self.config.getboolean('Extraction', 'AutoReextract', fallback=True)
 
         # エクスポート設定
         self.pdf_export_mode = self.config.get('Export', 'PdfExportMode', fallback=PdfExportMode.ONE_PAGE.value)
         self.excel_image_scale = self.config.getfloat('Export', 'ExcelImageScale', fallback=2.0)
         self.image_export_border_width = self.config.getint('Export', 'ImageExportBorderWidth', fallback=5)
         self.pdf_export_border_width = self.config.getfloat('Export', 'PdfExportBorderWidth', fallback=1.5)
+        self.pdf_save_preset = self.config.get('Export', 'PdfSavePreset', fallback=PdfSavePreset.BALANCED.value)
+        self.image_export_mode = self.config.get('Export', 'ImageExportMode', fallback=ImageExportMode.PAGE.value)
+        self.image_export_margin = self.config.getfloat('Export', 'ImageExportMargin', fallback=20.0)
+        self.excel_image_format = self.config.get('Export', 'ExcelImageFormat', fallback=ExcelImageFormat.PNG.value)
+        self.excel_jpeg_quality = self.config.getint('Export', 'ExcelJpegQuality', fallback=85)
+        self.excel_rows_per_part = self.config.getint('Export', 'ExcelRowsPerPart', fallback=0)
+        self.excel_split_mode = self.config.get('Export', 'ExcelSplitMode', fallback=ExcelSplitMode.SHEET.value)
+        self.image_encode_format = self.config.get('Export', 'ImageEncodeFormat', fallback=ImageEncodeFormat.PNG.value)
+        self.png_compress_level = self.config.getint('Export', 'PngCompressLevel', fallback=6)
+        self.image_quality = self.config.getint('Export', 'ImageQuality', fallback=90)
+        self.image_color_mode = self.config.get('Export', 'ImageColorMode', fallback=ImageColorMode.RGB.value)
+        self.image_export_dpi = self.config.getint('Export', 'ImageExportDpi', fallback=300)
+        self.image_archive_mode = self.config.get('Export', 'ImageArchiveMode', fallback=ImageArchiveMode.FOLDER.value)
+        self.image_archive_manifest = self.config.getboolean('Export', 'ImageArchiveManifest', fallback=True)
+        self.incremental_image_export = self.config.getboolean('Export', 'IncrementalImageExport', fallback=False)
+
+        # キャッシュ設定
+        self.cache_dir = self.config.get('Cache', 'Directory', fallback=DEFAULT_CACHE_DIR) or DEFAULT_CACHE_DIR
+        self.render_cache_size_mb = self.config.getint('Cache', 'RenderCacheSizeMB', fallback=512)
+        self.in_memory_open_max_mb = self.config.getint('Cache', 'InMemoryOpenMaxMB', fallback=0)
+
+    def _get_lines(self, section, option):
+        """複数行の値を、空でない行のリストとして読み込みます。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            section (str): セクション名。
+            option (str): キー名。
+
+        Returns:
+            list[str]: 前後の空白を除いた行のリスト。
+        """
+        value = self.config.get(section, option, fallback="")
+        return [line.strip() for line in value.splitlines() if line.strip()]
 
     def save(self):
         """現在の設定を設定ファイルに保存します。
@@ -116,6 +192,7 @@ class Settings:
         self.config.set('HighlightColor', 'Max_G', str(self.highlight_color_max[1]))
         self.config.set('HighlightColor', 'Min_B', str(self.highlight_color_min[2]))
         self.config.set('HighlightColor', 'Max_B', str(self.highlight_color_max[2]))
+        self.config.set('HighlightColor', 'Ranges', "\n".join(self.highlight_color_ranges))
 
         if not self.config.has_section('TextColor'):
             self.config.add_section('TextColor')
@@ -125,6 +202,7 @@ class Settings:
         self.config.set('TextColor', 'Max_G', str(self.text_color_max[1]))
         self.config.set('TextColor', 'Min_B', str(self.text_color_min[2]))
         self.config.set('TextColor', 'Max_B', str(self.text_color_max[2]))
+        self.config.set('TextColor', 'Ranges', "\n".join(self.text_color_ranges))
 
         if not self.config.has_section('Extraction'):
             self.config.add_section('Extraction')
@@ -132,6 +210,9 @@ class Settings:
         self.config.set('Extraction', 'ExtractTextColor', str(self.extract_text_color))
         self.config.set('Extraction', 'ExtractKeyword', str(self.extract_keyword))
         self.config.set('Extraction', 'Keyword', self.extraction_keyword)
+        self.config.set('Extraction', 'RasterHighlightDetection', str(self.raster_highlight_detection))
+        self.config.set('Extraction', 'RasterDetectionDpi', str(self.raster_detection_dpi))
+        self.config.set('Extraction', 'AutoReextract', str(self.auto_reextract))
 
         if not self.config.has_section('Export'):
             self.config.add_section('Export')
@@ -139,6 +220,27 @@ class Settings:
         self.config.set('Export', 'ExcelImageScale', str(self.excel_image_scale))
         self.config.set('Export', 'ImageExportBorderWidth', str(self.image_export_border_width))
         self.config.set('Export', 'PdfExportBorderWidth', str(self.pdf_export_border_width))
+        self.config.set('Export', 'PdfSavePreset', self.pdf_save_preset)
+        self.config.set('Export', 'ImageExportMode', self.image_export_mode)
+        self.config.set('Export', 'ImageExportMargin', str(self.image_export_margin))
+        self.config.set('Export', 'ExcelImageFormat', self.excel_image_format)
+        self.config.set('Export', 'ExcelJpegQuality', str(self.excel_jpeg_quality))
+        self.config.set('Export', 'ExcelRowsPerPart', str(self.excel_rows_per_part))
+        self.config.set('Export', 'ExcelSplitMode', self.excel_split_mode)
+        self.config.set('Export', 'ImageEncodeFormat', self.image_encode_format)
+        self.config.set('Export', 'PngCompressLevel', str(self.png_compress_level))
+        self.config.set('Export', 'ImageQuality', str(self.image_quality))
+        self.config.set('Export', 'ImageColorMode', self.image_color_mode)
+        self.config.set('Export', 'ImageExportDpi', str(self.image_export_dpi))
+        self.config.set('Export', 'ImageArchiveMode', self.image_archive_mode)
+        self.config.set('Export', 'ImageArchiveManifest', str(self.image_archive_manifest))
+        self.config.set('Export', 'IncrementalImageExport', str(self.incremental_image_export))
+
+        if not self.config.has_section('Cache'):
+            self.config.add_section('Cache')
+        self.config.set('Cache', 'Directory', self.cache_dir)
+        self.config.set('Cache', 'RenderCacheSizeMB', str(self.render_cache_size_mb))
+        self.config.set('Cache', 'InMemoryOpenMaxMB', str(self.in_memory_open_max_mb))
 
         with open(self.config_file, 'w', encoding='utf-8') as configfile:
             self.config.write(configfile)
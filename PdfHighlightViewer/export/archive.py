@@ -0,0 +1,148 @@
+"""画像エクスポートの出力を、1つのZIPまたはtarアーカイブへ逐次書き込むライターを提供します。
+
+ネットワーク上の共有フォルダなどでは、小さなファイルを大量に作成する処理が
+エクスポート時間の大半を占めます。このライターは画像を受け取った時点で
+アーカイブの1エントリとして書き込むため、一時ファイルを作らず、出力先に
+作成されるファイルは1つだけです。画像はすでに圧縮されているため、
+エントリは無圧縮で格納します。
+"""
+
+import csv
+import io
+import os
+import tarfile
+import time
+import zipfile
+
+from .formats import ImageArchiveMode
+from . import metadata
+
+# アーカイブの末尾に格納する一覧のファイル名
+MANIFEST_NAME = "manifest.csv"
+
+# 形式ごとの拡張子
+ARCHIVE_EXTENSIONS = {
+    ImageArchiveMode.ZIP.value: ".zip",
+    ImageArchiveMode.TAR.value: ".tar",
+}
+
+class ImageArchiveWriter:
+    """画像をZIPまたはtarアーカイブへ逐次書き込むクラス。
+
+    `with` 文で使用でき、例外で抜けた場合は書きかけのファイルを削除します。
+    一覧 (`MANIFEST_NAME`) を含める場合は、各画像のファイル名とハイライトの
+    メタデータ (`metadata.FIELDS`) を1行ずつ記録し、閉じるときに書き込みます。
+    """
+
+    def __init__(self, filepath, archive_mode, manifest=True):
+        """ImageArchiveWriterオブジェクトを初期化し、出力先のファイルを作成します。
+
+        Args:
+            filepath (str): 出力先のアーカイブのパス。
+            archive_mode (str): `ImageArchiveMode` の値 ("zip" または "tar")。
+            manifest (bool, optional): Trueの場合は一覧のCSVを格納します。
+
+        Raises:
+            ValueError: 未対応の形式が指定された場合。
+        """
+        self.filepath = filepath
+        self.archive_mode = archive_mode
+        if archive_mode == ImageArchiveMode.ZIP.value:
+            self._zip = zipfile.ZipFile(filepath, "w", zipfile.ZIP_STORED)
+            self._tar = None
+        elif archive_mode == ImageArchiveMode.TAR.value:
+            self._zip = None
+            self._tar = tarfile.open(filepath, "w", format=tarfile.PAX_FORMAT)
+        else:
+            raise ValueError(f"未対応のアーカイブ形式です: {archive_mode}")
+        self._manifest_rows = [] if manifest else None
+        self._count = 0
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def add_image(self, name, data, highlight=None):
+        """画像を1エントリとして書き込みます。
+
+        Args:
+            name (str): アーカイブ内のファイル名。
+            data (bytes): エンコード済みの画像データ。
+            highlight (Highlight, optional): 一覧に記録するハイライト情報。
+
+        Returns:
+            int: 書き込んだバイト数。
+        """
+        self._write(name, data)
+        self._count += 1
+        if self._manifest_rows is not None and highlight is not None:
+            no, page, x0, y0, x1, y1, conditions, color, text = metadata.highlight_row(self._count, highlight)
+            self._manifest_rows.append([name, no, page, x0, y0, x1, y1, ";".join(conditions), color, text])
+        return len(data)
+
+    def close(self):
+        """一覧を書き込み、アーカイブを閉じます。
+
+        Returns:
+            int: 一覧として書き込んだバイト数 (一覧を含めない場合は0)。
+        """
+        if self._closed:
+            return 0
+        size = 0
+        if self._manifest_rows is not None:
+            buffer = io.StringIO(newline="")
+            writer = csv.writer(buffer)
+            writer.writerow(["file"] + metadata.FIELDS)
+            writer.writerows(self._manifest_rows)
+            data = buffer.getvalue().encode("utf-8")
+            self._write(MANIFEST_NAME, data)
+            size = len(data)
+        self._close_archive()
+        self._closed = True
+        return size
+
+    def abort(self):
+        """書き込みを中止し、書きかけのファイルを削除します。"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._close_archive()
+        except OSError:
+            pass
+        try:
+            os.remove(self.filepath)
+        except OSError:
+            pass
+
+    def _write(self, name, data):
+        """アーカイブに1エントリを書き込みます。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if self._zip is not None:
+            self._zip.writestr(name, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._tar.addfile(info, io.BytesIO(data))
+
+    def _close_archive(self):
+        """アーカイブのファイルを閉じます。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if self._zip is not None:
+            self._zip.close()
+        else:
+            self._tar.close()
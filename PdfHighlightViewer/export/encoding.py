@@ -0,0 +1,85 @@
+"""画像エクスポートでの画像の保存形式と、そのプリセットを提供します。
+
+設定ウィンドウがプリセットを使うため、アプリケーションの起動を遅くしないよう
+Pillowは画像を保存する時点で読み込みます。
+"""
+
+import os
+
+from .formats import ImageColorMode, ImageEncodeFormat, ImageEncoderPreset
+
+# 減色する場合の色数
+PALETTE_COLORS = 64
+
+# プリセットごとの設定値 (`Settings` の属性名と値)
+IMAGE_ENCODER_PRESETS = {
+    ImageEncoderPreset.FAST.value: dict(
+        image_encode_format=ImageEncodeFormat.PNG.value, png_compress_level=1, image_quality=90,
+        image_color_mode=ImageColorMode.RGB.value, image_export_dpi=300),
+    ImageEncoderPreset.STANDARD.value: dict(
+        image_encode_format=ImageEncodeFormat.PNG.value, png_compress_level=6, image_quality=90,
+        image_color_mode=ImageColorMode.RGB.value, image_export_dpi=300),
+    ImageEncoderPreset.SMALL.value: dict(
+        image_encode_format=ImageEncodeFormat.PNG.value, png_compress_level=9, image_quality=80,
+        image_color_mode=ImageColorMode.PALETTE.value, image_export_dpi=200),
+}
+
+# 形式ごとの拡張子
+_EXTENSIONS = {
+    ImageEncodeFormat.PNG.value: ".png",
+    ImageEncodeFormat.JPEG.value: ".jpg",
+    ImageEncodeFormat.WEBP.value: ".webp",
+}
+
+def image_extension(image_format):
+    """画像の形式に対応する拡張子を返します。
+
+    Args:
+        image_format (str): `ImageEncodeFormat` の値。
+
+    Returns:
+        str: ドットから始まる拡張子。未知の形式の場合は ".png"。
+    """
+    return _EXTENSIONS.get(image_format, ".png")
+
+def format_for_path(filepath, default):
+    """ファイルの拡張子から画像の形式を判定します。
+
+    Args:
+        filepath (str): 保存先のパス。
+        default (str): 判定できない場合に返す `ImageEncodeFormat` の値。
+
+    Returns:
+        str: `ImageEncodeFormat` の値。
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in (".jpg", ".jpeg"):
+        return ImageEncodeFormat.JPEG.value
+    for image_format, extension in _EXTENSIONS.items():
+        if ext == extension:
+            return image_format
+    return default
+
+def save_image(img, fp, options, image_format=None):
+    """エンコード設定に従って画像を保存します。
+
+    減色 (`ImageColorMode.PALETTE`) はPNG形式の場合だけ行います。
+    JPEGとWebPは減色した画像を扱えないため、そのままの色数で保存します。
+
+    Args:
+        img (Image.Image): 保存する画像 (RGBまたはグレースケール)。
+        fp (str | BinaryIO): 保存先のパスまたはファイルオブジェクト。
+        options (ExportOptions): エクスポートの設定。
+        image_format (str, optional): `ImageEncodeFormat` の値。省略時は設定の形式。
+    """
+    image_format = image_format or options.image_encode_format
+    if image_format == ImageEncodeFormat.JPEG.value:
+        img.save(fp, format="JPEG", quality=options.image_quality)
+    elif image_format == ImageEncodeFormat.WEBP.value:
+        img.save(fp, format="WEBP", quality=options.image_quality)
+    else:
+        if options.image_color_mode == ImageColorMode.PALETTE.value and img.mode == "RGB":
+            from PIL import Image
+
+            img = img.quantize(PALETTE_COLORS, method=Image.Quantize.FASTOCTREE)
+        img.save(fp, format="PNG", compress_level=options.png_compress_level)
@@ -3,30 +3,53 @@
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import fitz
 import os
-from collections import defaultdict
-from PIL import Image, ImageDraw
-import io
-import openpyxl
-from openpyxl.drawing.image import Image as OpenpyxlImage
 
-from .formats import ExportFormat, PdfExportMode
+from .archive import ARCHIVE_EXTENSIONS
+from .formats import ExportFormat, ImageArchiveMode, ImageEncodeFormat
+from .tasks import ExportOptions, ExportTask, run_export_task
+from . import encoding
+
+# 画像の形式ごとの保存ダイアログに表示するファイルの種類 (表示名とパターン)
+IMAGE_FILETYPES = {
+    ImageEncodeFormat.PNG.value: ("PNG Image", "*.png"),
+    ImageEncodeFormat.JPEG.value: ("JPEG Image", "*.jpg"),
+    ImageEncodeFormat.WEBP.value: ("WebP Image", "*.webp"),
+}
+
+# メタデータの形式ごとの表示名、拡張子、`ExportTask` のメソッド名
+METADATA_FORMATS = {
+    ExportFormat.CSV: ("CSV", ".csv", "export_csv"),
+    ExportFormat.JSONL: ("JSON Lines", ".jsonl", "export_jsonl"),
+    ExportFormat.PARQUET: ("Parquet", ".parquet", "export_parquet"),
+}
 
 class Exporter:
-    """エクスポート処理を実行するクラス。"""
+    """保存先の選択と結果の表示を行い、エクスポート処理を実行するクラス。
 
-    def __init__(self, doc, highlights, app_settings):
+    エクスポート処理そのものは `ExportTask` が行います。ジョブキューが
+    指定されている場合はバックグラウンドのジョブとして登録し、完了時の
+    表示はキュー側のコールバックに任せます。
+    """
+
+    def __init__(self, doc, highlights, app_settings, job_queue=None, filepath=None):
         """Exporterオブジェクトを初期化します。
 
         Args:
             doc (fitz.Document): 操作対象のPDFドキュメント。
             highlights (list[Highlight]): 抽出されたハイライト情報のリスト。
             app_settings (Settings): アプリケーションの設定オブジェクト。
+            job_queue (ExportJobQueue, optional): エクスポートを登録するジョブキュー。
+                省略時は呼び出し元のスレッドで実行し、完了まで待ちます。
+            filepath (str, optional): ドキュメントのファイルのパス。メモリ上で
+                開いたドキュメント (`doc.name` が空) でも、ジョブのワーカー
+                プロセスでファイルから開き直せるよう指定します。省略時は `doc.name`。
         """
         self.doc = doc
+        self.filepath = filepath
         self.highlights = highlights
         self.app_settings = app_settings
+        self.job_queue = job_queue
 
     def export_selected(self, export_format: ExportFormat, listbox: tk.Listbox):
         """選択されたハイライト領域を、指定された形式でエクスポートします。
@@ -35,7 +58,7 @@ class Exporter:
         ファイルとして保存します。
 
         Args:
-            export_format (ExportFormat): PNG、PDF、EXCELのいずれかの形式。
+            export_format (ExportFormat): エクスポート形式。
             listbox (tk.Listbox): 選択項目を取得するためのリストボックスウィジェット。
         """
         if not self.doc or not self.highlights:
@@ -48,6 +71,10 @@ class Exporter:
             self._export_selected_highlight_as_pdf(listbox)
         elif export_format is ExportFormat.EXCEL:
             self._export_selected_highlight_as_excel(listbox)
+        elif export_format in METADATA_FORMATS:
+            highlight = self._selected_highlight(listbox)
+            if highlight is not None:
+                self._export_metadata(export_format, [highlight])
         else:
             # このルートは通常通らないはず
             messagebox.showerror("内部エラー", f"未対応のエクスポート形式です: {export_format}")
@@ -60,7 +87,7 @@ class Exporter:
         複数のファイルとして出力されたりします。
 
         Args:
-            export_format (ExportFormat): PNG、PDF、EXCELのいずれかの形式。
+            export_format (ExportFormat): エクスポート形式。
         """
         if not self.doc or not self.highlights:
             messagebox.showwarning("エクスポート不可", "エクスポート対象のPDFが開かれていません。")
@@ -72,6 +99,8 @@ class Exporter:
             self._export_all_highlights_as_pdf()
         elif export_format is ExportFormat.EXCEL:
             self._export_all_highlights_as_excel()
+        elif export_format in METADATA_FORMATS:
+            self._export_metadata(export_format, self.highlights)
         else:
             # このルートは通常通らないはず
             messagebox.showerror("内部エラー", f"未対応のエクスポート形式です: {self.export_format}")
@@ -80,282 +109,173 @@ class Exporter:
     def _export_selected_highlight_as_image(self, listbox: tk.Listbox):
         """選択中のハイライト箇所を含むページ全体を画像として保存します。
 
-        ハイライト箇所は赤枠で囲まれて描画されます。
-
         Note:
             この関数は内部利用を想定しています。
 
         Args:
             listbox (tk.Listbox): 選択項目を取得するためのリストボックスウィジェット。
         """
-        selection_indices = listbox.curselection()
-        if not selection_indices:
-            messagebox.showwarning("エクスポート不可", "エクスポートする領域が選択されていません。")
+        highlight = self._selected_highlight(listbox)
+        if highlight is None:
             return
-        selected_index = selection_indices[0]
-        if not (0 <= selected_index < len(self.highlights)):
-            return
-        highlight = self.highlights[selected_index]
-        page_num = highlight.page_num
-        rect = highlight.rect
-        filepath = filedialog.asksaveasfilename(title="ページ画像を保存", defaultextension=".png", filetypes=[("PNG Image", "*.png"), ("JPEG Image", "*.jpg")])
+        # 設定の形式を既定にし、ほかの形式も選べるようにする
+        image_format = self.app_settings.image_encode_format
+        filetypes = [IMAGE_FILETYPES[image_format]] if image_format in IMAGE_FILETYPES else []
+        filetypes += [filetype for key, filetype in IMAGE_FILETYPES.items() if key != image_format]
+        filepath = filedialog.asksaveasfilename(title="ページ画像を保存", defaultextension=encoding.image_extension(image_format), filetypes=filetypes)
         if not filepath:
             return
-        try:
-            page = self.doc[page_num]
-            dpi = 300
-            zoom = dpi / 72
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            draw = ImageDraw.Draw(img)
-            highlight_rect_on_image = rect * mat
-            draw.rectangle((highlight_rect_on_image.x0, highlight_rect_on_image.y0, highlight_rect_on_image.x1, highlight_rect_on_image.y1), outline="red", width=self.app_settings.image_export_border_width)
-            img.save(filepath)
-            messagebox.showinfo("成功", f"ページ画像をエクスポートしました:\n{filepath}")
-        except Exception as e:
-            messagebox.showerror("エクスポートエラー", f"画像の保存中にエラーが発生しました:\n{e}")
+        self._run("ページ画像", "画像の保存中にエラーが発生しました", [highlight], "export_selected_image", filepath)
 
     def _export_all_highlights_as_image(self):
         """すべてのハイライト箇所を個別の画像ファイルとして保存します。
 
-        各ハイライト箇所を含むページ全体が、それぞれ別の画像ファイルとして
-        指定されたフォルダに保存されます。ハイライト箇所は赤枠で囲まれます。
+        設定 (`image_archive_mode`) がフォルダ以外の場合は、1つのアーカイブに
+        まとめて保存します。
 
         Note:
             この関数は内部利用を想定しています。
         """
+        archive_mode = self.app_settings.image_archive_mode
+        if archive_mode != ImageArchiveMode.FOLDER.value:
+            extension = ARCHIVE_EXTENSIONS.get(archive_mode, ".zip")
+            filepath = filedialog.asksaveasfilename(title="画像をアーカイブとして保存", defaultextension=extension, filetypes=[(f"{extension[1:].upper()} archive", f"*{extension}")])
+            if not filepath:
+                return
+            self._run("画像", "エクスポート中にエラーが発生しました", self.highlights, "export_image_archive", filepath)
+            return
         folder_path = filedialog.askdirectory(title="保存先のフォルダを選択")
         if not folder_path:
             return
-        try:
-            page_counters = defaultdict(int)
-            exported_count = 0
-            dpi = 300
-            zoom = dpi / 72
-            mat = fitz.Matrix(zoom, zoom)
-            for highlight in self.highlights:
-                page_num = highlight.page_num
-                rect = highlight.rect
-                page_counters[page_num] += 1
-                counter = page_counters[page_num]
-                filename = f"page-{page_num + 1}-{counter}.png"
-                filepath = os.path.join(folder_path, filename)
-                page = self.doc[page_num]
-                pix = page.get_pixmap(matrix=mat, alpha=False)
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                draw = ImageDraw.Draw(img)
-                highlight_rect_on_image = rect * mat
-                draw.rectangle((highlight_rect_on_image.x0, highlight_rect_on_image.y0, highlight_rect_on_image.x1, highlight_rect_on_image.y1), outline="red", width=self.app_settings.image_export_border_width)
-                img.save(filepath)
-                exported_count += 1
-            messagebox.showinfo("成功", f"{exported_count}個のページ画像をエクスポートしました。\nフォルダ: {folder_path}")
-        except Exception as e:
-            messagebox.showerror("エクスポートエラー", f"エクスポート中にエラーが発生しました:\n{e}")
+        self._run("画像", "エクスポート中にエラーが発生しました", self.highlights, "export_all_images", folder_path)
 
     # --- Private PDF Export Methods ---
     def _export_selected_highlight_as_pdf(self, listbox: tk.Listbox):
         """選択中のハイライト箇所を含むページを単一ページのPDFとして保存します。
 
-        ハイライト箇所は赤枠で囲まれて描画されます。
-
         Note:
             この関数は内部利用を想定しています。
 
         Args:
             listbox (tk.Listbox): 選択項目を取得するためのリストボックスウィジェット。
         """
-        selection_indices = listbox.curselection()
-        if not selection_indices:
-            messagebox.showwarning("エクスポート不可", "エクスポートする領域が選択されていません。")
+        highlight = self._selected_highlight(listbox)
+        if highlight is None:
             return
-        selected_index = selection_indices[0]
-        if not (0 <= selected_index < len(self.highlights)):
-            return
-        highlight = self.highlights[selected_index]
-        page_num = highlight.page_num
-        rect = highlight.rect
         filepath = filedialog.asksaveasfilename(title="PDFとして保存", defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
         if not filepath:
             return
-        try:
-            new_doc = fitz.open()
-            new_doc.insert_pdf(self.doc, from_page=page_num, to_page=page_num)
-            new_page = new_doc[0]
-            new_page.draw_rect(rect, color=(1, 0, 0), width=self.app_settings.pdf_export_border_width)
-            new_doc.save(filepath)
-            new_doc.close()
-            messagebox.showinfo("成功", f"PDFをエクスポートしました:\n{filepath}")
-        except Exception as e:
-            messagebox.showerror("エクスポートエラー", f"PDFの保存中にエラーが発生しました:\n{e}")
+        self._run("PDF", "PDFの保存中にエラーが発生しました", [highlight], "export_selected_pdf", filepath)
 
     def _export_all_highlights_as_pdf(self):
         """すべてのハイライト箇所を単一のPDFファイルにまとめて保存します。
 
-        設定（`pdf_export_mode`）に応じて、ハイライトごとにページを作成するか、
-        同一ページ上のハイライトを1ページにまとめるかが決まります。
-
         Note:
             この関数は内部利用を想定しています。
         """
         filepath = filedialog.asksaveasfilename(title="PDFとして保存", defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
         if not filepath:
             return
-        final_doc = fitz.open()
-        try:
-            if self.app_settings.pdf_export_mode == PdfExportMode.ONE_PAGE.value:
-                for highlight in self.highlights:
-                    page_num = highlight.page_num
-                    rect = highlight.rect
-                    temp_doc = fitz.open()
-                    temp_doc.insert_pdf(self.doc, from_page=page_num, to_page=page_num)
-                    new_page = temp_doc[0]
-                    new_page.draw_rect(rect, color=(1, 0, 0), width=self.app_settings.pdf_export_border_width)
-                    final_doc.insert_pdf(temp_doc)
-                    temp_doc.close()
-            elif self.app_settings.pdf_export_mode == PdfExportMode.MERGE.value:
-                highlights_by_page = defaultdict(list)
-                for highlight in self.highlights:
-                    highlights_by_page[highlight.page_num].append(highlight.rect)
-                sorted_pages = sorted(highlights_by_page.keys())
-                for page_num in sorted_pages:
-                    temp_doc = fitz.open()
-                    temp_doc.insert_pdf(self.doc, from_page=page_num, to_page=page_num)
-                    new_page = temp_doc[0]
-                    for rect in highlights_by_page[page_num]:
-                        new_page.draw_rect(rect, color=(1, 0, 0), width=self.app_settings.pdf_export_border_width)
-                    final_doc.insert_pdf(temp_doc)
-                    temp_doc.close()
-            final_doc.save(filepath)
-            messagebox.showinfo("成功", f"{len(final_doc)}ページのPDFをエクスポートしました。\n{filepath}")
-        except Exception as e:
-            messagebox.showerror("エクスポートエラー", f"PDFのエクスポート中にエラーが発生しました:\n{e}")
-        finally:
-            final_doc.close()
+        self._run("PDF", "PDFのエクスポート中にエラーが発生しました", self.highlights, "export_all_pdf", filepath)
 
     # --- Private Excel Export Methods ---
     def _export_selected_highlight_as_excel(self, listbox: tk.Listbox):
         """選択中のハイライト箇所をExcelファイルとして保存します。
 
-        ハイライト箇所の画像、ページ番号、抽出されたテキストを1行の
-        データとしてExcelファイルに出力します。
-
         Note:
             この関数は内部利用を想定しています。
 
         Args:
             listbox (tk.Listbox): 選択項目を取得するためのリストボックスウィジェット。
         """
-        selection_indices = listbox.curselection()
-        if not selection_indices:
-            messagebox.showwarning("エクスポート不可", "エクスポートする領域が選択されていません。")
-            return
-        selected_index = selection_indices[0]
-        if not (0 <= selected_index < len(self.highlights)):
+        highlight = self._selected_highlight(listbox)
+        if highlight is None:
             return
         filepath = filedialog.asksaveasfilename(title="Excelとして保存", defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx")])
         if not filepath:
             return
-        try:
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Highlight"
-            ws.append(["No", "ページ画像", "ページ番号", "テキスト"])
-            highlight = self.highlights[selected_index]
-            page_num = highlight.page_num
-            rect = highlight.rect
-            page = self.doc[page_num]
-            text = page.get_text("text", clip=rect).strip()
-            ws.cell(row=2, column=1, value=1)
-            ws.cell(row=2, column=3, value=page_num + 1)
-            ws.cell(row=2, column=4, value=text)
-            scale = self.app_settings.excel_image_scale
-            mat = fitz.Matrix(scale, scale)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            draw = ImageDraw.Draw(img)
-            highlight_rect_on_image = rect * mat
-            draw.rectangle((highlight_rect_on_image.x0, highlight_rect_on_image.y0, highlight_rect_on_image.x1, highlight_rect_on_image.y1), outline="red", width=self.app_settings.image_export_border_width)
-            img_path = io.BytesIO()
-            img.save(img_path, format="PNG")
-            img_path.seek(0)
-            img_for_excel = OpenpyxlImage(img_path)
-            ws.add_image(img_for_excel, "B2")
-            ws.column_dimensions['A'].width = 5
-            ws.column_dimensions['B'].width = img_for_excel.width * 0.14
-            ws.column_dimensions['C'].width = 10
-            ws.column_dimensions['D'].width = 50
-            ws.row_dimensions[2].height = img_for_excel.height * 0.75
-            wb.save(filepath)
-            messagebox.showinfo("成功", f"Excelファイルをエクスポートしました:\n{filepath}")
-        except Exception as e:
-            messagebox.showerror("エクスポートエラー", f"Excelファイルのエクスポート中にエラーが発生しました:\n{e}")
+        self._run("Excel", "Excelファイルのエクスポート中にエラーが発生しました", [highlight], "export_selected_excel", filepath)
 
     def _export_all_highlights_as_excel(self):
         """すべてのハイライト箇所を単一のExcelファイルにまとめて保存します。
 
-        各ハイライト箇所の画像、ページ番号、抽出されたテキストを
-        Excelファイルに1行ずつのデータとして出力します。
-
         Note:
             この関数は内部利用を想定しています。
         """
         filepath = filedialog.asksaveasfilename(title="Excelとして保存", defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx")])
         if not filepath:
             return
+        self._run("Excel", "Excelファイルのエクスポート中にエラーが発生しました", self.highlights, "export_all_excel", filepath)
+
+    # --- Private Metadata Export Methods ---
+    def _export_metadata(self, export_format, highlights):
+        """ハイライトのメタデータ (ページ、座標、一致した条件、文字列) を表形式で保存します。
+
+        画像をレンダリングしないため、件数が多くても短時間で完了します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            export_format (ExportFormat): CSV、JSONL、PARQUETのいずれかの形式。
+            highlights (list[Highlight]): エクスポートするハイライト情報のリスト。
+        """
+        title, extension, method_name = METADATA_FORMATS[export_format]
+        filepath = filedialog.asksaveasfilename(title=f"{title}として保存", defaultextension=extension, filetypes=[(f"{title} files", f"*{extension}")])
+        if not filepath:
+            return
+        self._run(title, f"{title}ファイルのエクスポート中にエラーが発生しました", highlights, method_name, filepath)
+
+    # --- Private Helper Methods ---
+    def _selected_highlight(self, listbox: tk.Listbox):
+        """リストボックスで選択中のハイライトを返します。
+
+        選択されていない場合は警告を表示します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            listbox (tk.Listbox): 選択項目を取得するためのリストボックスウィジェット。
+
+        Returns:
+            Highlight | None: 選択中のハイライト。選択されていない場合はNone。
+        """
+        selection_indices = listbox.curselection()
+        if not selection_indices:
+            messagebox.showwarning("エクスポート不可", "エクスポートする領域が選択されていません。")
+            return None
+        selected_index = selection_indices[0]
+        if not (0 <= selected_index < len(self.highlights)):
+            return None
+        return self.highlights[selected_index]
+
+    def _run(self, title, error_message, highlights, method_name, target):
+        """`ExportTask` のメソッドを、ジョブとして登録するかその場で実行します。
+
+        ドキュメントのファイルがない場合は、ワーカープロセスで開き直せないため、
+        常にその場で実行します。ジョブはUIで開いているドキュメントとは別に
+        ファイルを開くため、UIのドキュメントが閉じられても影響を受けません。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            title (str): 進捗の表示に使うジョブの名前。
+            error_message (str): 失敗したときに表示するメッセージ。
+            highlights (list[Highlight]): エクスポートするハイライト情報のリスト。
+            method_name (str): 実行する `ExportTask` のメソッド名。
+            target (str): 保存先のパスまたはフォルダ。
+        """
+        options = ExportOptions.from_settings(self.app_settings)
+        filepath = self.filepath or self.doc.name
+        if self.job_queue is not None and filepath and os.path.isfile(filepath) and not self.doc.needs_pass:
+            self.job_queue.submit(f"{title}のエクスポート", error_message, run_export_task,
+                                  filepath, list(highlights), options, method_name, target)
+            return
         try:
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Highlights"
-            ws.append(["No", "ページ画像", "ページ番号", "テキスト"])
-            highlights_by_page = defaultdict(list)
-            for highlight in self.highlights:
-                highlights_by_page[highlight.page_num].append(highlight.rect)
-            sorted_pages = sorted(highlights_by_page.keys())
-            current_row = 2
-            highlight_no = 1
-            max_image_width = 0
-            for page_num in sorted_pages:
-                rects = highlights_by_page[page_num]
-                num_highlights = len(rects)
-                start_row = current_row
-                end_row = start_row + num_highlights - 1
-                if num_highlights > 1:
-                    ws.merge_cells(start_row=start_row, start_column=2, end_row=end_row, end_column=2)
-                    ws.merge_cells(start_row=start_row, start_column=3, end_row=end_row, end_column=3)
-                ws.cell(row=start_row, column=3, value=page_num + 1)
-                ws.cell(row=start_row, column=3).alignment = openpyxl.styles.Alignment(horizontal='center', vertical='center')
-                page = self.doc[page_num]
-                scale = self.app_settings.excel_image_scale
-                mat = fitz.Matrix(scale, scale)
-                pix = page.get_pixmap(matrix=mat, alpha=False)
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                draw = ImageDraw.Draw(img)
-                for r in rects:
-                    highlight_rect_on_image = r * mat
-                    draw.rectangle((highlight_rect_on_image.x0, highlight_rect_on_image.y0, highlight_rect_on_image.x1, highlight_rect_on_image.y1), outline="red", width=self.app_settings.image_export_border_width)
-                img_path = io.BytesIO()
-                img.save(img_path, format="PNG")
-                img_path.seek(0)
-                img_for_excel = OpenpyxlImage(img_path)
-                ws.add_image(img_for_excel, f"B{start_row}")
-                if img_for_excel.width > max_image_width:
-                    max_image_width = img_for_excel.width
-                total_height_points = img_for_excel.height * 0.75
-                height_per_row = total_height_points / num_highlights
-                for i in range(num_highlights):
-                    ws.row_dimensions[start_row + i].height = height_per_row
-                for rect in rects:
-                    text = page.get_text("text", clip=rect).strip()
-                    ws.cell(row=current_row, column=1, value=highlight_no)
-                    ws.cell(row=current_row, column=4, value=text)
-                    highlight_no += 1
-                    current_row += 1
-            ws.column_dimensions['A'].width = 5
-            ws.column_dimensions['B'].width = max_image_width * 0.14
-            ws.column_dimensions['C'].width = 10
-            ws.column_dimensions['D'].width = 50
-            wb.save(filepath)
-            messagebox.showinfo("成功", f"{highlight_no - 1}個のハイライトをExcelファイルにエクスポートしました:\n{filepath}")
+            task = ExportTask(self.doc, highlights, options)
+            message = getattr(task, method_name)(target)
+            messagebox.showinfo("成功", message)
         except Exception as e:
-            messagebox.showerror("エクスポートエラー", f"Excelファイルのエクスポート中にエラーが発生しました:\n{e}")
+            messagebox.showerror("エクスポートエラー", f"{error_message}:\n{e}")
@@ -7,8 +7,74 @@ class ExportFormat(Enum):
     PNG = "png"
     PDF = "pdf"
     EXCEL = "excel"
+    CSV = "csv"
+    JSONL = "jsonl"
+    PARQUET = "parquet"
 
 class PdfExportMode(Enum):
-    """PDFエクスポートのモードを定義する列挙型。"""
+    """PDFエクスポートのモードを定義する列挙型。
+
+    ANNOTATED_COPYは元のPDF全体のコピーに赤枠の注釈を追加します。
+    """
     ONE_PAGE = "one_page"
     MERGE = "merge"
+    ANNOTATED_COPY = "annotated_copy"
+
+class PdfSavePreset(Enum):
+    """PDFエクスポートの保存方法のプリセットを定義する列挙型。
+
+    FASTは保存が最も速く、SMALLはファイルサイズが最も小さくなります。
+    """
+    FAST = "fast"
+    BALANCED = "balanced"
+    SMALL = "small"
+
+class ImageExportMode(Enum):
+    """画像/Excelエクスポートで出力する範囲を定義する列挙型。"""
+    PAGE = "page"
+    REGION = "region"
+
+class ExcelImageFormat(Enum):
+    """Excelエクスポートで貼り付ける画像の形式を定義する列挙型。"""
+    PNG = "png"
+    JPEG = "jpeg"
+
+class ExcelSplitMode(Enum):
+    """Excelエクスポートで行数が上限を超えたときの分割先を定義する列挙型。"""
+    SHEET = "sheet"
+    WORKBOOK = "workbook"
+
+class ImageEncodeFormat(Enum):
+    """画像エクスポートで保存する画像の形式を定義する列挙型。"""
+    PNG = "png"
+    JPEG = "jpeg"
+    WEBP = "webp"
+
+class ImageColorMode(Enum):
+    """画像エクスポートの色数を定義する列挙型。
+
+    GRAYはグレースケールで直接レンダリングし、PALETTEはレンダリング後に
+    減色します (PNG形式の場合のみ有効)。
+    """
+    RGB = "rgb"
+    GRAY = "gray"
+    PALETTE = "palette"
+
+class ImageEncoderPreset(Enum):
+    """画像エクスポートのエンコード設定のプリセットを定義する列挙型。
+
+    FASTは保存が最も速く、SMALLはファイルサイズが最も小さくなります。
+    """
+    FAST = "fast"
+    STANDARD = "standard"
+    SMALL = "small"
+
+class ImageArchiveMode(Enum):
+    """画像の一括エクスポートの保存先を定義する列挙型。
+
+    FOLDERは画像ごとに個別のファイルを作成し、ZIPとTARは1つのアーカイブに
+    まとめて書き込みます。
+    """
+    FOLDER = "folder"
+    ZIP = "zip"
+    TAR = "tar"
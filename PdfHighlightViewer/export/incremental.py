@@ -0,0 +1,102 @@
+"""差分エクスポートのためのマニフェストを提供します。
+
+差分エクスポートでは、出力先のフォルダにマニフェスト (`MANIFEST_NAME`) を置き、
+前回書き出したハイライトごとのファイル名を記録します。ハイライトは
+ページの描画内容のハッシュ値と矩形から作る識別子 (`hit_id`) で区別するため、
+ページ番号がずれても内容が同じハイライトは同じものとして扱われます
+(同じ描画内容のページにある同じ矩形は、識別子に出現順の番号を付けて区別します)。
+再エクスポートでは、識別子がマニフェストにないハイライトだけを書き出し、
+なくなったハイライトのファイルを削除します。出力内容に影響する設定が
+前回と異なる場合は、すべてのハイライトを書き出し直します。
+"""
+
+import hashlib
+import json
+import os
+
+# 出力先のフォルダに置くマニフェストのファイル名
+MANIFEST_NAME = "export-manifest.json"
+
+# マニフェストの形式のバージョン
+MANIFEST_VERSION = 1
+
+def hit_id(page_hash, rect):
+    """ハイライトの識別子を返します。
+
+    Args:
+        page_hash (str): ハイライトがあるページの `hashing.page_hash` の値。
+        rect (fitz.Rect): ハイライトの矩形。
+
+    Returns:
+        str: 16進数表記の識別子。
+    """
+    text = f"{page_hash}|{rect.x0:.2f},{rect.y0:.2f},{rect.x1:.2f},{rect.y1:.2f}"
+    return hashlib.blake2b(text.encode("ascii"), digest_size=8).hexdigest()
+
+class ExportManifest:
+    """差分エクスポートで書き出したファイルを記録するマニフェスト。
+
+    `entries` はハイライトの識別子と、フォルダ内のファイル名の辞書です。
+    """
+
+    def __init__(self, folder_path, signature):
+        """ExportManifestオブジェクトを初期化し、前回のマニフェストを読み込みます。
+
+        前回のマニフェストがない場合、読み込めない場合、`signature` が前回と
+        異なる場合は、再利用できるエントリはありません (`previous` には
+        削除の対象として前回のエントリが残ります)。
+
+        Args:
+            folder_path (str): 出力先のフォルダ。
+            signature (dict): 出力内容に影響する設定値。JSONに変換できる値に限ります。
+        """
+        self.folder_path = folder_path
+        self.signature = signature
+        # 前回書き出したすべてのファイル
+        self.previous = {}
+        # 前回のファイルのうち、今回も同じ内容として使えるもの
+        self.reusable = {}
+        self.entries = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.previous = {str(key): str(value) for key, value in data.get("entries", {}).items()}
+                if data.get("signature") == signature:
+                    self.reusable = {key: filename for key, filename in self.previous.items()
+                                     if os.path.isfile(os.path.join(folder_path, filename))}
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    @property
+    def path(self):
+        """マニフェストのファイルのパスを返します。"""
+        return os.path.join(self.folder_path, MANIFEST_NAME)
+
+    def remove_stale(self):
+        """前回書き出したファイルのうち、今回のエントリにないものを削除します。
+
+        Returns:
+            int: 削除したファイルの数。
+        """
+        current = set(self.entries.values())
+        removed = 0
+        for filename in set(self.previous.values()) - current:
+            try:
+                os.remove(os.path.join(self.folder_path, filename))
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def save(self):
+        """マニフェストを保存します。
+
+        書き込み途中のファイルが読まれないよう、一時ファイルに書き込んでから
+        置き換えます。
+        """
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "signature": self.signature,
+                       "entries": self.entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,184 @@
+"""バックグラウンドで実行するエクスポートジョブの、進捗とキャンセルの仕組みを提供します。
+
+エクスポートはTkのスレッドを止めないよう、ジョブ専用のワーカープロセスで
+実行されます (PyMuPDFはスレッドからの並行利用に対応していないため)。
+ワーカープロセスからの進捗はキューで送られ、キャンセルは共有メモリ上の
+フラグで伝えられます。ここに置く関数は `ProcessPoolExecutor` から呼び出されるため、
+モジュールのトップレベルに定義しています。
+"""
+
+import time
+from enum import Enum
+
+# 進捗を報告する最短の間隔 (秒)
+REPORT_INTERVAL = 0.2
+
+class ExportCancelled(Exception):
+    """エクスポートがキャンセルされたことを表す例外。"""
+
+class ExportError(Exception):
+    """ワーカープロセスでエクスポートに失敗したことを表す例外。
+
+    PyMuPDFの例外などはpickleできないことがあるため、メッセージだけを
+    呼び出し元のプロセスへ伝えます。
+    """
+
+class ExportJobStatus(Enum):
+    """エクスポートジョブの状態を定義する列挙型。"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class ExportProgress:
+    """エクスポート処理から進捗を報告し、キャンセルを確認するためのクラス。
+
+    報告先とキャンセルの確認方法を省略した場合は、進捗を数えるだけで
+    キャンセルされることはありません。
+    """
+
+    def __init__(self, report=None, is_cancelled=None):
+        """ExportProgressオブジェクトを初期化します。
+
+        Args:
+            report (Callable[[int, int, int], None], optional): 処理済みの件数、
+                全体の件数、書き込んだバイト数を受け取る関数。
+            is_cancelled (Callable[[], bool], optional): キャンセルされていれば
+                Trueを返す関数。
+        """
+        self.done = 0
+        self.total = 0
+        self.bytes_written = 0
+        self._report = report
+        self._is_cancelled = is_cancelled
+        self._last_report = 0.0
+
+    def set_total(self, total):
+        """全体の件数を設定します。
+
+        Args:
+            total (int): 全体の件数。
+        """
+        self.total = total
+        self._send(force=True)
+
+    def advance(self, count=1, bytes_written=0):
+        """処理済みの件数と書き込んだバイト数を加算します。
+
+        Args:
+            count (int, optional): 新たに処理した件数。
+            bytes_written (int, optional): 新たに書き込んだバイト数。
+
+        Raises:
+            ExportCancelled: キャンセルされている場合。
+        """
+        self.done += count
+        self.bytes_written += bytes_written
+        self._send()
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        """キャンセルされていれば例外を送出します。
+
+        Raises:
+            ExportCancelled: キャンセルされている場合。
+        """
+        if self._is_cancelled is not None and self._is_cancelled():
+            raise ExportCancelled()
+
+    def finish(self):
+        """最終的な進捗を報告します。"""
+        self._send(force=True)
+
+    def _send(self, force=False):
+        """前回の報告から `REPORT_INTERVAL` 秒以上経っていれば進捗を報告します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if self._report is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_report >= REPORT_INTERVAL:
+            self._last_report = now
+            self._report(self.done, self.total, self.bytes_written)
+
+class ExportJob:
+    """キューに登録されたエクスポートジョブの状態を保持するクラス。"""
+
+    def __init__(self, job_id, title, error_message):
+        """ExportJobオブジェクトを初期化します。
+
+        Args:
+            job_id (int): ジョブの番号。
+            title (str): 進捗の表示に使うジョブの名前。
+            error_message (str): 失敗したときに表示するメッセージ。
+        """
+        self.job_id = job_id
+        self.title = title
+        self.error_message = error_message
+        self.status = ExportJobStatus.QUEUED
+        self.done = 0
+        self.total = 0
+        self.bytes_written = 0
+        self.started_at = None
+        # 完了時のメッセージと、失敗時の例外
+        self.message = None
+        self.error = None
+        self.future = None
+
+    def eta(self):
+        """残り時間の見込みを返します。
+
+        Returns:
+            float | None: 残り時間 (秒)。まだ見込めない場合はNone。
+        """
+        if self.started_at is None or self.done <= 0 or self.total <= 0:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        return elapsed * max(0, self.total - self.done) / self.done
+
+# ワーカープロセスで使う進捗のキューとキャンセルフラグ
+_progress_queue = None
+_cancel_flag = None
+
+def init_worker(progress_queue, cancel_flag):
+    """ジョブ用のワーカープロセスを初期化します。
+
+    Args:
+        progress_queue (multiprocessing.Queue): 進捗を送るキュー。
+        cancel_flag (multiprocessing.Value): キャンセルするジョブの番号。
+    """
+    global _progress_queue, _cancel_flag
+    _progress_queue = progress_queue
+    _cancel_flag = cancel_flag
+
+def run_job(job_id, func, args):
+    """ワーカープロセスでジョブを実行します。
+
+    Args:
+        job_id (int): ジョブの番号。
+        func (Callable[..., str]): 実行する関数。最後の引数として
+            `ExportProgress` を受け取り、完了時のメッセージを返します。
+        args (tuple): `func` に渡す引数。
+
+    Returns:
+        str: `func` の戻り値。
+
+    Raises:
+        ExportCancelled: キャンセルされた場合。
+        ExportError: そのほかの理由で失敗した場合。
+    """
+    progress = ExportProgress(
+        report=lambda done, total, bytes_written: _progress_queue.put((job_id, done, total, bytes_written)),
+        is_cancelled=lambda: _cancel_flag.value == job_id)
+    progress.finish()
+    try:
+        return func(*args, progress)
+    except ExportCancelled:
+        raise
+    except Exception as e:
+        raise ExportError(str(e)) from None
+    finally:
+        progress.finish()
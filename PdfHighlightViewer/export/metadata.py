@@ -0,0 +1,156 @@
+"""ハイライトのメタデータ (ページ、座標、一致した条件、色の分類、文字列) を表形式で書き出す機能を提供します。
+
+画像を扱わないため、件数が多くても短時間で出力できます。行は
+`BATCH_SIZE` 件ずつ書き込むため、メモリ使用量は件数によらず一定です。
+Parquet形式の出力には `pyarrow` が必要です (インストールされていない場合は
+その形式だけが使えません)。
+"""
+
+import csv
+import importlib.util
+import json
+import os
+from contextlib import contextmanager
+
+# 一度に書き込む行数 (Parquetでは行グループの大きさになる)
+BATCH_SIZE = 10000
+
+# 出力する列
+FIELDS = ["no", "page", "x0", "y0", "x1", "y1", "conditions", "color", "text"]
+
+def parquet_available():
+    """Parquet形式で出力できるかどうかを返します。
+
+    Returns:
+        bool: `pyarrow` がインストールされていればTrue。
+    """
+    return importlib.util.find_spec("pyarrow") is not None
+
+def write_csv(filepath, highlights, progress):
+    """ハイライトのメタデータをCSV (UTF-8) で書き出します。
+
+    一致した条件はセミコロン区切りの1列にまとめます。
+
+    Args:
+        filepath (str): 保存先のパス。
+        highlights (list[Highlight]): 出力するハイライト情報のリスト。
+        progress (ExportProgress): 進捗の報告先。
+    """
+    with _removing_on_error(filepath):
+        with open(filepath, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            position = 0
+            for batch in _batches(highlights):
+                writer.writerows(
+                    [no, page, x0, y0, x1, y1, ";".join(conditions), color, text]
+                    for no, page, x0, y0, x1, y1, conditions, color, text in batch)
+                end = f.tell()
+                progress.advance(len(batch), end - position)
+                position = end
+
+def write_jsonl(filepath, highlights, progress):
+    """ハイライトのメタデータをJSON Lines (UTF-8) で書き出します。
+
+    1行に1件のJSONオブジェクトを出力し、座標は `rect` の配列、
+    一致した条件は `conditions` の配列にまとめます。色の分類は `color` です。
+
+    Args:
+        filepath (str): 保存先のパス。
+        highlights (list[Highlight]): 出力するハイライト情報のリスト。
+        progress (ExportProgress): 進捗の報告先。
+    """
+    with _removing_on_error(filepath):
+        with open(filepath, "w", encoding="utf-8", newline="\n") as f:
+            for batch in _batches(highlights):
+                data = "".join(
+                    json.dumps({"no": no, "page": page, "rect": [x0, y0, x1, y1],
+                                "conditions": conditions, "color": color, "text": text},
+                               ensure_ascii=False) + "\n"
+                    for no, page, x0, y0, x1, y1, conditions, color, text in batch)
+                f.write(data)
+                progress.advance(len(batch), len(data.encode("utf-8")))
+
+def write_parquet(filepath, highlights, progress):
+    """ハイライトのメタデータをParquet形式で書き出します。
+
+    `BATCH_SIZE` 件ごとに1つの行グループとして書き込みます。
+
+    Args:
+        filepath (str): 保存先のパス。
+        highlights (list[Highlight]): 出力するハイライト情報のリスト。
+        progress (ExportProgress): 進捗の報告先。
+
+    Raises:
+        RuntimeError: `pyarrow` がインストールされていない場合。
+    """
+    if not parquet_available():
+        raise RuntimeError("Parquet形式で出力するには pyarrow をインストールしてください。")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("no", pa.int64()), ("page", pa.int32()),
+        ("x0", pa.float64()), ("y0", pa.float64()), ("x1", pa.float64()), ("y1", pa.float64()),
+        ("conditions", pa.list_(pa.string())), ("color", pa.string()), ("text", pa.string()),
+    ])
+    with _removing_on_error(filepath):
+        with pq.ParquetWriter(filepath, schema) as writer:
+            for batch in _batches(highlights):
+                columns = list(zip(*batch))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                    schema=schema))
+                progress.advance(len(batch))
+        progress.advance(0, os.path.getsize(filepath))
+
+def highlight_row(no, highlight):
+    """ハイライト1件分の出力する値の組を返します。
+
+    Args:
+        no (int): 番号 (1から)。
+        highlight (Highlight): ハイライト情報。
+
+    Returns:
+        tuple: `FIELDS` の順に並んだ値。一致した条件は値のリスト、色の分類は
+            色範囲の名前 (ない場合は空文字列) です。
+    """
+    rect = highlight.rect
+    return (no, highlight.page_num + 1, rect.x0, rect.y0, rect.x1, rect.y1,
+            [condition.value for condition in highlight.conditions], highlight.color_class, highlight.text)
+
+def _batches(highlights):
+    """ハイライトを出力する値の組に変換し、`BATCH_SIZE` 件ずつ返します。
+
+    Note:
+        この関数は内部利用を想定しています。
+
+    Yields:
+        list[tuple]: 番号、ページ番号 (1から)、座標、一致した条件の値のリスト、
+            色の分類、文字列の組のリスト。
+    """
+    batch = []
+    for no, highlight in enumerate(highlights, start=1):
+        batch.append(highlight_row(no, highlight))
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+@contextmanager
+def _removing_on_error(filepath):
+    """途中で失敗した場合やキャンセルされた場合に、書きかけのファイルを削除します。
+
+    Note:
+        この関数は内部利用を想定しています。
+    """
+    try:
+        yield
+    except BaseException:
+        if os.path.exists(filepath):
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
+        raise
@@ -0,0 +1,154 @@
+"""ハイライト箇所に赤枠を付けたPDFを組み立てる機能を提供します。
+
+元のページは出力先のドキュメントへページごとに1回だけ取り込み、各出力ページには
+`show_pdf_page` でそのページをXObjectとして配置します。同じページを何度配置しても
+XObjectは共有されるため、フォントや画像が出力ページの数だけ複製されることは
+ありません。
+
+元のPDF全体に赤枠を付ける場合 (`write_annotated_copy`) は、元のファイルを
+コピーして枠を注釈として追加し、増分保存で変更したオブジェクトだけを
+末尾に追記します。
+"""
+
+import os
+import shutil
+
+import fitz
+
+from .formats import PdfSavePreset
+
+# 保存プリセットごとの `fitz.Document.save` の引数
+SAVE_OPTIONS = {
+    PdfSavePreset.FAST.value: dict(garbage=0, deflate=False),
+    PdfSavePreset.BALANCED.value: dict(garbage=3, deflate=True),
+    PdfSavePreset.SMALL.value: dict(garbage=4, deflate=True, clean=True, use_objstms=True),
+}
+
+def build_highlight_pdf(src_doc, pages, color=(1, 0, 0), width=1.5, progress=None):
+    """指定されたページに赤枠を描画した新しいPDFドキュメントを作成します。
+
+    Args:
+        src_doc (fitz.Document): 元のドキュメント。
+        pages (Iterable[tuple[int, list[fitz.Rect]]]): 出力するページ番号 (0-indexed) と、
+            そのページに描画する矩形のリストの組。同じページ番号を複数回
+            指定すると、そのページが複数回出力されます。
+        color (tuple[float, float, float], optional): 枠の色。
+        width (float, optional): 枠の太さ。
+        progress (ExportProgress, optional): 出力ページごとに進捗を報告する先。
+
+    Returns:
+        fitz.Document: 作成されたドキュメント。呼び出し元で閉じる必要があります。
+    """
+    pages = list(pages)
+    # 注釈は `show_pdf_page` では表示されないため、取り込んだページに焼き込んでおく
+    source = fitz.open()
+    source_index = {}
+    for page_num, _ in pages:
+        if page_num not in source_index:
+            source_index[page_num] = len(source)
+            source.insert_pdf(src_doc, from_page=page_num, to_page=page_num, links=False, annots=True)
+    source.bake(annots=True, widgets=True)
+    # `show_pdf_page` で回転したページを配置すると縮小されて収まるため、
+    # 取り込んだページは回転させずに配置し、出力ページに同じ回転を設定する
+    rotations = {}
+    for page in source:
+        rotations[page.number] = page.rotation
+        page.set_rotation(0)
+
+    out_doc = fitz.open()
+    try:
+        for page_num, rects in pages:
+            src_page = source[source_index[page_num]]
+            page = out_doc.new_page(width=src_page.rect.width, height=src_page.rect.height)
+            page.show_pdf_page(page.rect, source, src_page.number)
+            page.set_rotation(rotations[src_page.number])
+            if rects:
+                shape = page.new_shape()
+                for rect in rects:
+                    shape.draw_rect(rect)
+                shape.finish(color=color, width=width)
+                shape.commit()
+            if progress is not None:
+                progress.advance()
+    except Exception:
+        out_doc.close()
+        raise
+    finally:
+        source.close()
+    return out_doc
+
+def write_annotated_copy(src_doc, pages, filepath, color=(1, 0, 0), width=1.5, progress=None):
+    """元のドキュメントのコピーに赤枠の矩形注釈を追加し、保存します。
+
+    元のドキュメントがファイルから開かれている場合は、ファイルをそのまま
+    コピーしてから注釈を追加し、増分保存します。処理時間はファイル全体の
+    大きさではなく、注釈を追加するページの数に比例します。増分保存のため
+    保存プリセットは使いません。ファイルから開かれていない場合や、パスワードで
+    保護されている場合 (コピーを開き直せないため) は、メモリ上のコピーに
+    注釈を追加して通常の方法で保存します。
+
+    Args:
+        src_doc (fitz.Document): 元のドキュメント。
+        pages (Iterable[tuple[int, list[fitz.Rect]]]): 注釈を追加するページ番号
+            (0-indexed) と、そのページの矩形のリストの組。
+        filepath (str): 保存先のパス。元のファイルと同じパスは指定できません。
+        color (tuple[float, float, float], optional): 枠の色。
+        width (float, optional): 枠の太さ。
+        progress (ExportProgress, optional): ページごとに進捗を報告する先。
+
+    Returns:
+        int: 注釈を追加したページ数。
+
+    Raises:
+        ValueError: 保存先が元のファイルと同じ場合。
+    """
+    source_path = src_doc.name
+    incremental = bool(source_path) and os.path.isfile(source_path) and not src_doc.needs_pass
+    if incremental:
+        if os.path.exists(filepath) and os.path.samefile(source_path, filepath):
+            raise ValueError("元のPDFと同じファイルには保存できません。")
+        shutil.copyfile(source_path, filepath)
+        doc = fitz.open(filepath)
+    else:
+        doc = fitz.open("pdf", src_doc.tobytes())
+    completed = False
+    try:
+        count = 0
+        for page_num, rects in pages:
+            page = doc[page_num]
+            for rect in rects:
+                annot = page.add_rect_annot(rect)
+                annot.set_colors(stroke=color)
+                annot.set_border(width=width)
+                annot.update()
+            count += 1
+            if progress is not None:
+                progress.advance()
+        if not incremental:
+            doc.save(filepath, garbage=3, deflate=True)
+        elif doc.can_save_incrementally():
+            doc.saveIncr()
+        else:
+            # 修復して開かれたファイルなどは増分保存できないため、書き直して置き換える
+            tmp_path = f"{filepath}.{os.getpid()}.tmp"
+            doc.save(tmp_path, garbage=3, deflate=True)
+            doc.close()
+            os.replace(tmp_path, filepath)
+        completed = True
+    finally:
+        if not doc.is_closed:
+            doc.close()
+        if not completed and incremental and os.path.exists(filepath):
+            os.remove(filepath)
+    return count
+
+def save_pdf(doc, filepath, preset):
+    """保存プリセットに応じたオプションでドキュメントを保存します。
+
+    Args:
+        doc (fitz.Document): 保存するドキュメント。
+        filepath (str): 保存先のパス。
+        preset (str): `PdfSavePreset` の値。未知の値の場合は `BALANCED` として扱います。
+    """
+    options = SAVE_OPTIONS.get(preset, SAVE_OPTIONS[PdfSavePreset.BALANCED.value])
+    doc.save(filepath, **options)
@@ -0,0 +1,148 @@
+"""エクスポート用の、ページのレンダリングと画像のエンコードを並列に行うパイプラインを提供します。
+
+ページのレンダリングはプロセスプール (ワーカーごとにドキュメントを1つ開いたまま)
+で行い、赤枠の描画やPNGへのエンコード、ファイルへの書き込みはスレッドプールで
+行います。PillowはエンコードのあいだGILを解放するため、スレッドでも並列に動きます。
+処理中のページ数には上限を設け、ページ数が多くてもメモリ使用量が増え続けない
+ようにしています。レンダリングキャッシュが指定された場合は、キャッシュにある
+ページはレンダリングせずにその結果を使います。
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from PIL import Image
+
+from ..pdf import render_cache, workers
+
+# 並列処理に使うワーカー数の既定値
+DEFAULT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+def map_rendered_pages(doc, page_nums, scale, func, workers_count=None, gray=False, cache=None):
+    """各ページをレンダリングし、その画像に `func` を適用した結果をページ順に返します。
+
+    `func` はスレッドプールで実行されるため、PyMuPDFのオブジェクトには
+    触れず、渡された画像だけを扱う必要があります。ワーカー数が1以下の場合や、
+    ファイルから開かれていないドキュメント、パスワードで保護されたドキュメントの
+    場合は、同じ処理を呼び出し元のスレッドで順に実行します。どちらの場合も
+    `func` に渡される画像は同じ内容になります。
+
+    Args:
+        doc (fitz.Document): レンダリング対象のドキュメント。
+        page_nums (Iterable[int]): レンダリングするページ番号 (0-indexed)。
+        scale (float): レンダリング倍率。
+        func (Callable[[int, Image.Image], Any]): ページ番号とページ画像を受け取る関数。
+            画像はほかのページと共有されないため、直接書き換えても構いません。
+        workers_count (int, optional): レンダリングとエンコードのそれぞれに使う
+            ワーカー数。省略時は `DEFAULT_WORKERS`。
+        gray (bool, optional): Trueの場合はグレースケール ("L") の画像を渡します。
+        cache (RenderCache, optional): 利用するレンダリングキャッシュ。
+
+    Yields:
+        Any: ページ順に並んだ `func` の戻り値。
+    """
+    page_nums = list(page_nums)
+    return map_rendered_regions(
+        doc, [(page_num, None) for page_num in page_nums], scale,
+        lambda index, img, origin: func(page_nums[index], img), workers_count, gray, cache)
+
+def map_rendered_regions(doc, regions, scale, func, workers_count=None, gray=False, cache=None):
+    """ページの指定範囲をレンダリングし、その画像に `func` を適用した結果を順に返します。
+
+    実行方法と `func` の制約は `map_rendered_pages` と同じです。
+
+    Args:
+        doc (fitz.Document): レンダリング対象のドキュメント。
+        regions (Iterable[tuple[int, fitz.Rect | None]]): ページ番号 (0-indexed) と
+            レンダリングする範囲 (ページ座標) の組。範囲がNoneの場合はページ全体。
+        scale (float): レンダリング倍率。
+        func (Callable[[int, Image.Image, tuple[int, int]], Any]): `regions` 内での
+            インデックス、画像、ページ全体を描画した場合の画像上での左上の位置を
+            受け取る関数。
+        workers_count (int, optional): レンダリングとエンコードのそれぞれに使う
+            ワーカー数。省略時は `DEFAULT_WORKERS`。
+        gray (bool, optional): Trueの場合はグレースケール ("L") の画像を渡します。
+        cache (RenderCache, optional): 利用するレンダリングキャッシュ。ドキュメントが
+            キャッシュできない場合 (`render_cache.cacheable`) は使いません。
+
+    Yields:
+        Any: `regions` の順に並んだ `func` の戻り値。
+    """
+    if workers_count is None:
+        workers_count = DEFAULT_WORKERS
+    filepath = doc.name
+    if not render_cache.cacheable(doc):
+        cache = None
+    if workers_count <= 1 or not filepath or not os.path.isfile(filepath) or doc.needs_pass:
+        for index, (page_num, clip) in enumerate(regions):
+            img, origin = render_region(doc, page_num, scale, clip, gray, cache)
+            yield func(index, img, origin)
+        return
+
+    # レンダリング中とエンコード中のページの合計がこの数を超えないようにする
+    max_pending = workers_count * 2
+    render_pool = ProcessPoolExecutor(max_workers=workers_count)
+    encode_pool = ThreadPoolExecutor(max_workers=workers_count)
+    pending = deque()
+    try:
+        for index, (page_num, clip) in enumerate(regions):
+            clip = tuple(clip) if clip is not None else None
+            rendered = render_pool.submit(workers.render_region_samples, filepath, page_num, scale, clip, gray, cache)
+            pending.append(encode_pool.submit(_process_rendered_region, rendered, index, func, gray))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # 途中で例外が起きた場合や、呼び出し元が反復を打ち切った場合は残りを破棄する
+        for future in pending:
+            future.cancel()
+        render_pool.shutdown(wait=True, cancel_futures=True)
+        encode_pool.shutdown(wait=True, cancel_futures=True)
+
+def render_region(doc, page_num, scale, clip=None, gray=False, cache=None):
+    """ページの指定範囲を呼び出し元のスレッドでレンダリングし、画像を返します。
+
+    Args:
+        doc (fitz.Document): レンダリング対象のドキュメント。
+        page_num (int): ページ番号 (0-indexed)。
+        scale (float): レンダリング倍率。
+        clip (fitz.Rect | None, optional): レンダリングする範囲 (ページ座標)。
+            Noneの場合はページ全体。
+        gray (bool, optional): Trueの場合はグレースケール ("L") の画像を返します。
+        cache (RenderCache, optional): 利用するレンダリングキャッシュ。ドキュメントが
+            キャッシュできない場合は使いません。
+
+    Returns:
+        tuple[Image.Image, tuple[int, int]]: 画像と、ページ全体を描画した場合の
+            画像上での左上の位置。
+    """
+    if cache is not None and not render_cache.cacheable(doc):
+        cache = None
+    clip = tuple(clip) if clip is not None else None
+    rendered = render_cache.render_samples(lambda: doc[page_num], doc.name, page_num, scale, clip, gray, cache)
+    return _samples_to_image(rendered, gray)
+
+def _process_rendered_region(rendered, index, func, gray):
+    """レンダリングの完了を待ち、画像に `func` を適用します。
+
+    Note:
+        この関数は内部利用を想定しています。
+    """
+    img, origin = _samples_to_image(rendered.result(), gray)
+    return func(index, img, origin)
+
+def _samples_to_image(rendered, gray):
+    """レンダリング結果のサンプルデータから画像を作成します。
+
+    Note:
+        この関数は内部利用を想定しています。
+
+    Returns:
+        tuple[Image.Image, tuple[int, int]]: 画像と、ページ全体を描画した場合の
+            画像上での左上の位置。
+    """
+    x, y, width, height, stride, samples = rendered
+    mode = "L" if gray else "RGB"
+    return Image.frombuffer(mode, (width, height), samples, "raw", mode, stride, 1), (x, y)
@@ -0,0 +1,694 @@
+"""ダイアログを使わずにエクスポートを実行する処理を提供します。
+
+ここでの処理はファイルの選択や結果の表示を行わず、保存先のパスを受け取って
+書き込み、完了時のメッセージを返します。失敗した場合は例外を送出します。
+ジョブのワーカープロセスからも呼び出せるよう、設定は `ExportOptions` に
+コピーして渡します。
+"""
+
+import io
+import os
+from collections import Counter, defaultdict
+from dataclasses import dataclass, fields
+
+import fitz
+from PIL import ImageDraw
+
+from .formats import ExcelImageFormat, ExcelSplitMode, ImageColorMode, ImageExportMode, PdfExportMode
+from .jobs import ExportProgress
+from .archive import ImageArchiveWriter
+from .incremental import ExportManifest, hit_id
+from .xlsx_writer import StreamingXlsxWriter
+from ..pdf.hashing import page_hash
+from ..pdf.render_cache import RenderCache
+from . import encoding, metadata, pipeline, pdf_builder
+
+@dataclass
+class ExportOptions:
+    """エクスポートに使う設定値を保持するデータクラス。"""
+    pdf_export_mode: str
+    excel_image_scale: float
+    image_export_border_width: int
+    pdf_export_border_width: float
+    pdf_save_preset: str
+    image_export_mode: str
+    image_export_margin: float
+    excel_image_format: str
+    excel_jpeg_quality: int
+    excel_rows_per_part: int
+    excel_split_mode: str
+    image_encode_format: str
+    png_compress_level: int
+    image_quality: int
+    image_color_mode: str
+    image_export_dpi: int
+    cache_dir: str
+    render_cache_size_mb: int
+    image_archive_mode: str
+    image_archive_manifest: bool
+    incremental_image_export: bool
+
+    @classmethod
+    def from_settings(cls, settings):
+        """アプリケーションの設定から、エクスポートに使う値をコピーします。
+
+        Args:
+            settings (Settings): アプリケーションの設定オブジェクト。
+
+        Returns:
+            ExportOptions: 設定値のコピー。
+        """
+        return cls(**{field.name: getattr(settings, field.name) for field in fields(cls)})
+
+class ExportTask:
+    """ハイライト領域のエクスポートを実行するクラス。"""
+
+    def __init__(self, doc, highlights, options, progress=None):
+        """ExportTaskオブジェクトを初期化します。
+
+        Args:
+            doc (fitz.Document): 操作対象のPDFドキュメント。
+            highlights (list[Highlight]): エクスポートするハイライト情報のリスト。
+                `export_selected_*` では先頭の要素だけを使います。
+            options (ExportOptions): エクスポートの設定。
+            progress (ExportProgress, optional): 進捗の報告先。
+        """
+        self.doc = doc
+        self.highlights = highlights
+        self.options = options
+        self.progress = progress if progress is not None else ExportProgress()
+        # 同じページを同じ条件で何度もレンダリングしないためのキャッシュ
+        self.render_cache = RenderCache.from_settings(options)
+
+    # --- Image Export ---
+    def export_selected_image(self, filepath):
+        """ハイライト箇所を含むページ全体を画像として保存します。
+
+        ハイライト箇所は赤枠で囲まれて描画されます。設定 (`image_export_mode`)
+        が領域のみの場合は、ハイライト箇所の周辺だけを保存します。画像の形式は
+        保存先の拡張子から判定し、判定できない場合は設定 (`image_encode_format`) に従います。
+
+        Args:
+            filepath (str): 保存先のパス。
+
+        Returns:
+            str: 完了時のメッセージ。
+        """
+        self.progress.set_total(1)
+        highlight = self.highlights[0]
+        page_num = highlight.page_num
+        rect = highlight.rect
+        zoom = self.options.image_export_dpi / 72
+        mat = fitz.Matrix(zoom, zoom)
+        gray = self.options.image_color_mode == ImageColorMode.GRAY.value
+        img, (x, y) = pipeline.render_region(
+            self.doc, page_num, zoom, self._export_clip(page_num, rect), gray, self.render_cache)
+        draw = ImageDraw.Draw(img)
+        highlight_rect_on_image = self._display_rects([highlight])[id(highlight)] * mat
+        draw.rectangle((highlight_rect_on_image.x0 - x, highlight_rect_on_image.y0 - y, highlight_rect_on_image.x1 - x, highlight_rect_on_image.y1 - y), outline="red", width=self.options.image_export_border_width)
+        encoding.save_image(img, filepath, self.options,
+                            encoding.format_for_path(filepath, self.options.image_encode_format))
+        self.progress.advance(1, os.path.getsize(filepath))
+        return f"ページ画像をエクスポートしました:\n{filepath}"
+
+    def export_all_images(self, folder_path):
+        """すべてのハイライト箇所を個別の画像ファイルとして保存します。
+
+        各ハイライト箇所を含むページ全体が、それぞれ別の画像ファイルとして
+        指定されたフォルダに保存されます。ハイライト箇所は赤枠で囲まれます。
+        画像の作成方法は `_render_highlight_images` を参照してください。
+        ファイルへの書き込みもエンコードと同じスレッドで並列に行います。
+        設定 (`incremental_image_export`) がTrueの場合は、前回から変わった
+        ハイライトだけを書き出します (`_export_images_incrementally`)。
+
+        Args:
+            folder_path (str): 保存先のフォルダ。
+
+        Returns:
+            str: 完了時のメッセージ。
+        """
+        if self.options.incremental_image_export:
+            return self._export_images_incrementally(folder_path)
+        self.progress.set_total(len(self.highlights))
+
+        def save_image(filename, img):
+            filepath = os.path.join(folder_path, filename)
+            encoding.save_image(img, filepath, self.options)
+            return os.path.getsize(filepath)
+
+        for results in self._render_highlight_images(save_image):
+            self.progress.advance(len(results), sum(size for _, size in results))
+        return f"{self.progress.done}個の{self._image_kind()}をエクスポートしました。\nフォルダ: {folder_path}"
+
+    def export_image_archive(self, filepath):
+        """すべてのハイライト箇所の画像を1つのZIPまたはtarアーカイブに保存します。
+
+        画像は `export_all_images` と同じ名前と内容で、設定 (`image_archive_mode`)
+        の形式のアーカイブへ順に書き込みます。エンコードは並列に行い、
+        アーカイブへの書き込みだけを呼び出し元のスレッドで行います。
+        `image_archive_manifest` がTrueの場合は、各画像のファイル名と
+        ハイライトのメタデータの一覧 (CSV) をアーカイブの末尾に格納します。
+        途中で失敗した場合やキャンセルされた場合は、書きかけのファイルを削除します。
+
+        Args:
+            filepath (str): 保存先のパス。
+
+        Returns:
+            str: 完了時のメッセージ。
+        """
+        self.progress.set_total(len(self.highlights))
+
+        def encode_image(filename, img):
+            buffer = io.BytesIO()
+            encoding.save_image(img, buffer, self.options)
+            return filename, buffer.getvalue()
+
+        with ImageArchiveWriter(filepath, self.options.image_archive_mode,
+                                manifest=self.options.image_archive_manifest) as archive:
+            for results in self._render_highlight_images(encode_image):
+                size = sum(archive.add_image(filename, data, highlight) for highlight, (filename, data) in results)
+                self.progress.advance(len(results), size)
+            self.progress.advance(0, archive.close())
+        return f"{self.progress.done}個の{self._image_kind()}をエクスポートしました:\n{filepath}"
+
+    def _export_images_incrementally(self, folder_path):
+        """前回のエクスポートから変わったハイライトの画像だけをフォルダに保存します。
+
+        ファイル名は `page-<ページ番号>-<識別子>.<拡張子>` で、識別子はページの
+        描画内容と矩形から作ります (`incremental.hit_id`)。前回と同じ識別子の
+        画像は書き出さず、ページ番号だけが変わった場合は名前を変更します。
+        同じ描画内容のページ (繰り返しのページなど) の同じ矩形は同じ識別子に
+        なるため、2つ目以降には出現順の番号を付けて区別します。
+        前回書き出して今回はなくなったハイライトの画像は削除します。
+        名前の変更、削除、マニフェストの更新はすべての書き出しが終わってから
+        まとめて行うため、途中でキャンセルされた場合や失敗した場合も、
+        フォルダ内のファイルは前回のマニフェストの記録と一致したままです。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            folder_path (str): 保存先のフォルダ。
+
+        Returns:
+            str: 完了時のメッセージ。
+        """
+        self.progress.set_total(len(self.highlights))
+        manifest = ExportManifest(folder_path, self._image_signature())
+        extension = encoding.image_extension(self.options.image_encode_format)
+        page_hashes = {}
+        occurrences = Counter()
+        filenames = {}
+        pending = []
+        renames = []
+        for highlight in self.highlights:
+            page_num = highlight.page_num
+            if page_num not in page_hashes:
+                page_hashes[page_num] = page_hash(self.doc[page_num])
+            key = hit_id(page_hashes[page_num], highlight.rect)
+            occurrences[key] += 1
+            if occurrences[key] > 1:
+                key = f"{key}-{occurrences[key]}"
+            filename = f"page-{page_num + 1}-{key}{extension}"
+            manifest.entries[key] = filename
+            previous = manifest.reusable.get(key)
+            if previous is None:
+                filenames[id(highlight)] = filename
+                pending.append(highlight)
+            elif previous != filename:
+                renames.append((previous, filename))
+        unchanged = len(self.highlights) - len(pending)
+        self.progress.advance(unchanged)
+
+        def save_image(filename, img):
+            filepath = os.path.join(folder_path, filename)
+            encoding.save_image(img, filepath, self.options)
+            return os.path.getsize(filepath)
+
+        for results in self._render_highlight_images(
+                save_image, pending, lambda highlight, counter: filenames[id(highlight)]):
+            self.progress.advance(len(results), sum(size for _, size in results))
+        for previous, filename in renames:
+            os.replace(os.path.join(folder_path, previous), os.path.join(folder_path, filename))
+        removed = manifest.remove_stale()
+        manifest.save()
+        return (f"{len(pending)}個の{self._image_kind()}をエクスポートしました。\n"
+                f"変更のない{unchanged}個は書き出しを省略し、{removed}個の古い画像を削除しました。\n"
+                f"フォルダ: {folder_path}")
+
+    def _image_signature(self):
+        """画像の出力内容に影響する設定値を返します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Returns:
+            dict: 設定名と値の辞書。
+        """
+        names = ["image_export_dpi", "image_encode_format", "png_compress_level", "image_quality",
+                 "image_color_mode", "image_export_mode", "image_export_margin", "image_export_border_width"]
+        return {name: getattr(self.options, name) for name in names}
+
+    def _render_highlight_images(self, func, highlights=None, filename_for=None):
+        """ハイライトごとに赤枠を描画した画像を作成し、`func` を適用した結果を返します。
+
+        ページはハイライトの数によらず1回だけレンダリングし、その画像の
+        コピーに各ハイライトの赤枠を描画します。設定 (`image_export_mode`)
+        が領域のみの場合は、ハイライトごとにその周辺だけをレンダリングします。
+        レンダリングと `func` の呼び出しは `pipeline` で並列に行います。
+        解像度、形式、色数はエンコード設定 (`image_export_dpi` など) に従います。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            func (Callable[[str, Image.Image], Any]): 画像のファイル名と画像を受け取る関数。
+                スレッドプールで実行されます。
+            highlights (list[Highlight], optional): 対象のハイライト。省略時はすべて。
+            filename_for (Callable[[Highlight, int], str], optional): ハイライトと
+                ページ内での連番 (1から) からファイル名を返す関数。省略時は
+                `page-<ページ番号>-<連番>.<拡張子>`。
+
+        Yields:
+            list[tuple[Highlight, Any]]: レンダリングの単位 (ページまたは領域) ごとの、
+                ハイライトと `func` の戻り値の組のリスト。
+        """
+        highlights_by_page = defaultdict(list)
+        for highlight in (self.highlights if highlights is None else highlights):
+            highlights_by_page[highlight.page_num].append(highlight)
+        zoom = self.options.image_export_dpi / 72
+        mat = fitz.Matrix(zoom, zoom)
+        border_width = self.options.image_export_border_width
+        gray = self.options.image_color_mode == ImageColorMode.GRAY.value
+        extension = encoding.image_extension(self.options.image_encode_format)
+
+        def default_filename(highlight, counter):
+            return f"page-{highlight.page_num + 1}-{counter}{extension}"
+
+        filename_for = filename_for or default_filename
+        # 赤枠の描画はスレッドプールで行われるため、ページを使う変換は先に済ませる
+        display_rects = self._display_rects(
+            [highlight for page_highlights in highlights_by_page.values() for highlight in page_highlights])
+
+        if self.options.image_export_mode == ImageExportMode.REGION.value:
+            regions = []
+            targets = []
+            for page_num, page_highlights in highlights_by_page.items():
+                for counter, highlight in enumerate(page_highlights, start=1):
+                    regions.append((page_num, self._export_clip(page_num, highlight.rect)))
+                    targets.append((highlight, filename_for(highlight, counter)))
+
+            def process_region_image(index, img, origin):
+                highlight, filename = targets[index]
+                draw = ImageDraw.Draw(img)
+                highlight_rect_on_image = display_rects[id(highlight)] * mat
+                draw.rectangle((highlight_rect_on_image.x0 - origin[0], highlight_rect_on_image.y0 - origin[1], highlight_rect_on_image.x1 - origin[0], highlight_rect_on_image.y1 - origin[1]), outline="red", width=border_width)
+                return [(highlight, func(filename, img))]
+
+            yield from pipeline.map_rendered_regions(self.doc, regions, zoom, process_region_image, gray=gray,
+                                                     cache=self.render_cache)
+            return
+
+        def process_page_images(page_num, base_img):
+            results = []
+            for counter, highlight in enumerate(highlights_by_page[page_num], start=1):
+                filename = filename_for(highlight, counter)
+                img = base_img.copy()
+                draw = ImageDraw.Draw(img)
+                highlight_rect_on_image = display_rects[id(highlight)] * mat
+                draw.rectangle((highlight_rect_on_image.x0, highlight_rect_on_image.y0, highlight_rect_on_image.x1, highlight_rect_on_image.y1), outline="red", width=border_width)
+                results.append((highlight, func(filename, img)))
+            return results
+
+        yield from pipeline.map_rendered_pages(self.doc, list(highlights_by_page), zoom, process_page_images,
+                                               gray=gray, cache=self.render_cache)
+
+    def _image_kind(self):
+        """完了時のメッセージに使う、画像の種類の名前を返します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        return "領域画像" if self.options.image_export_mode == ImageExportMode.REGION.value else "ページ画像"
+
+    # --- PDF Export ---
+    def export_selected_pdf(self, filepath):
+        """ハイライト箇所を含むページを単一ページのPDFとして保存します。
+
+        ハイライト箇所は赤枠で囲まれて描画されます。
+
+        Args:
+            filepath (str): 保存先のパス。
+
+        Returns:
+            str: 完了時のメッセージ。
+        """
+        highlight = self.highlights[0]
+        self._save_highlight_pdf([(highlight.page_num, [highlight.rect])], filepath)
+        return f"PDFをエクスポートしました:\n{filepath}"
+
+    def export_all_pdf(self, filepath):
+        """すべてのハイライト箇所を単一のPDFファイルにまとめて保存します。
+
+        設定（`pdf_export_mode`）に応じて、ハイライトごとにページを作成するか、
+        同一ページ上のハイライトを1ページにまとめるかが決まります。
+        元のページは `pdf_builder` で1回だけ取り込まれ、出力ページ間で共有されます。
+        注釈付きコピーの場合は、元のPDF全体のコピーに赤枠の注釈を追加します
+        (`pdf_builder.write_annotated_copy`)。
+
+        Args:
+            filepath (str): 保存先のパス。
+
+        Returns:
+            str: 完了時のメッセージ。
+        """
+        if self.options.pdf_export_mode in (PdfExportMode.MERGE.value, PdfExportMode.ANNOTATED_COPY.value):
+            highlights_by_page = defaultdict(list)
+            for highlight in self.highlights:
+                highlights_by_page[highlight.page_num].append(highlight.rect)
+            pages = [(page_num, highlights_by_page[page_num]) for page_num in sorted(highlights_by_page)]
+        else:
+            pages = [(highlight.page_num, [highlight.rect]) for highlight in self.highlights]
+        if self.options.pdf_export_mode == PdfExportMode.ANNOTATED_COPY.value:
+            self.progress.set_total(len(pages))
+            page_count = pdf_builder.write_annotated_copy(
+                self.doc, pages, filepath, width=self.options.pdf_export_border_width, progress=self.progress)
+            self.progress.advance(0, os.path.getsize(filepath))
+            return f"{page_count}ページに赤枠を追加したPDFをエクスポートしました。\n{filepath}"
+        page_count = self._save_highlight_pdf(pages, filepath)
+        return f"{page_count}ページのPDFをエクスポートしました。\n{filepath}"
+
+    def _save_highlight_pdf(self, pages, filepath):
+        """赤枠を描画したPDFを作成し、保存します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            pages (list[tuple[int, list[fitz.Rect]]]): 出力するページ番号と矩形のリストの組。
+            filepath (str): 保存先のパス。
+
+        Returns:
+            int: 出力したページ数。
+        """
+        self.progress.set_total(len(pages))
+        new_doc = pdf_builder.build_highlight_pdf(self.doc, pages, width=self.options.pdf_export_border_width, progress=self.progress)
+        try:
+            pdf_builder.save_pdf(new_doc, filepath, self.options.pdf_save_preset)
+            self.progress.advance(0, os.path.getsize(filepath))
+            return len(new_doc)
+        finally:
+            new_doc.close()
+
+    # --- Excel Export ---
+    def export_selected_excel(self, filepath):
+        """ハイライト箇所をExcelファイルとして保存します。
+
+        ハイライト箇所の画像、ページ番号、抽出されたテキストを1行の
+        データとしてExcelファイルに出力します。
+
+        Args:
+            filepath (str): 保存先のパス。
+
+        Returns:
+            str: 完了時のメッセージ。
+        """
+        # openpyxlは読み込みに時間がかかるため、使うときだけ読み込む
+        import openpyxl
+        from openpyxl.drawing.image import Image as OpenpyxlImage
+
+        self.progress.set_total(1)
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Highlight"
+        ws.append(["No", "ページ画像", "ページ番号", "テキスト"])
+        highlight = self.highlights[0]
+        page_num = highlight.page_num
+        rect = highlight.rect
+        ws.cell(row=2, column=1, value=1)
+        ws.cell(row=2, column=3, value=page_num + 1)
+        ws.cell(row=2, column=4, value=highlight.text)
+        scale = self.options.excel_image_scale
+        mat = fitz.Matrix(scale, scale)
+        img, (x, y) = pipeline.render_region(
+            self.doc, page_num, scale, self._export_clip(page_num, rect), cache=self.render_cache)
+        draw = ImageDraw.Draw(img)
+        highlight_rect_on_image = self._display_rects([highlight])[id(highlight)] * mat
+        draw.rectangle((highlight_rect_on_image.x0 - x, highlight_rect_on_image.y0 - y, highlight_rect_on_image.x1 - x, highlight_rect_on_image.y1 - y), outline="red", width=self.options.image_export_border_width)
+        img_path = io.BytesIO(self._encode_excel_image(img)[0])
+        img_for_excel = OpenpyxlImage(img_path)
+        ws.add_image(img_for_excel, "B2")
+        ws.column_dimensions['A'].width = 5
+        ws.column_dimensions['B'].width = img_for_excel.width * 0.14
+        ws.column_dimensions['C'].width = 10
+        ws.column_dimensions['D'].width = 50
+        ws.row_dimensions[2].height = img_for_excel.height * 0.75
+        wb.save(filepath)
+        self.progress.advance(1, os.path.getsize(filepath))
+        return f"Excelファイルをエクスポートしました:\n{filepath}"
+
+    def export_all_excel(self, filepath):
+        """すべてのハイライト箇所を単一のExcelファイルにまとめて保存します。
+
+        各ハイライト箇所の画像、ページ番号、抽出されたテキストを
+        Excelファイルに1行ずつのデータとして出力します。設定
+        (`image_export_mode`) がページ全体の場合は同じページの行で画像を
+        共有し、領域のみの場合は各行にその領域の画像を貼り付けます。
+
+        行と画像は `StreamingXlsxWriter` で逐次ファイルへ書き出すため、
+        件数が多くてもメモリ使用量は増えません。`excel_rows_per_part` が
+        0より大きい場合は、その行数ごとにシートまたはファイルを分割します。
+        途中で失敗した場合やキャンセルされた場合は、書きかけのファイルを削除します。
+
+        Args:
+            filepath (str): 保存先のパス。
+
+        Returns:
+            str: 完了時のメッセージ。
+        """
+        self.progress.set_total(len(self.highlights))
+        writer = None
+        try:
+            highlights_by_page = defaultdict(list)
+            for highlight in self.highlights:
+                highlights_by_page[highlight.page_num].append(highlight)
+            sorted_pages = sorted(highlights_by_page.keys())
+            # 1枚の画像を共有する行のまとまり
+            if self.options.image_export_mode == ImageExportMode.REGION.value:
+                groups = [(page_num, [h]) for page_num in sorted_pages for h in highlights_by_page[page_num]]
+                regions = [(page_num, self._export_clip(page_num, hs[0].rect)) for page_num, hs in groups]
+            else:
+                groups = [(page_num, highlights_by_page[page_num]) for page_num in sorted_pages]
+                regions = [(page_num, None) for page_num in sorted_pages]
+            scale = self.options.excel_image_scale
+            mat = fitz.Matrix(scale, scale)
+            border_width = self.options.image_export_border_width
+            display_rects = self._display_rects(self.highlights)
+
+            def encode_group_image(index, img, origin):
+                draw = ImageDraw.Draw(img)
+                for h in groups[index][1]:
+                    highlight_rect_on_image = display_rects[id(h)] * mat
+                    draw.rectangle((highlight_rect_on_image.x0 - origin[0], highlight_rect_on_image.y0 - origin[1], highlight_rect_on_image.x1 - origin[0], highlight_rect_on_image.y1 - origin[1]), outline="red", width=border_width)
+                return self._encode_excel_image(img), img.width, img.height
+
+            rows_per_part = self.options.excel_rows_per_part
+            part = 0
+            filepaths = []
+            highlight_no = 1
+            group_images = pipeline.map_rendered_regions(self.doc, regions, scale, encode_group_image,
+                                                         cache=self.render_cache)
+            for (page_num, page_highlights), ((data, image_format), width, height) in zip(groups, group_images):
+                num_highlights = len(page_highlights)
+                # 見出し行を除いた行数が上限を超える場合は、ページの途中で分割せずに次へ移る
+                if writer is None or (rows_per_part > 0 and writer.row_count > 1
+                                      and writer.row_count - 1 + num_highlights > rows_per_part):
+                    part += 1
+                    writer = self._start_excel_part(writer, filepath, part, filepaths)
+                height_per_row = height * 0.75 / num_highlights
+                start_row = writer.row_count + 1
+                for i, highlight in enumerate(page_highlights):
+                    writer.append_row([highlight_no, None, page_num + 1 if i == 0 else None, highlight.text],
+                                      height=height_per_row, centered=(3,))
+                    highlight_no += 1
+                if num_highlights > 1:
+                    end_row = start_row + num_highlights - 1
+                    writer.merge_cells(start_row, 2, end_row, 2)
+                    writer.merge_cells(start_row, 3, end_row, 3)
+                writer.add_image(data, image_format, start_row, 2, width, height)
+                writer.widen_column(2, width * 0.14)
+                self.progress.advance(num_highlights, len(data))
+            writer.close()
+        except Exception:
+            if writer is not None:
+                writer.abort()
+            raise
+        message = f"{highlight_no - 1}個のハイライトをExcelファイルにエクスポートしました:\n{filepath}"
+        if len(filepaths) > 1:
+            message += f"\n(ほか{len(filepaths) - 1}ファイル)"
+        return message
+
+    # --- Metadata Export ---
+    def export_csv(self, filepath):
+        """ハイライトのメタデータをCSVファイルとして保存します。
+
+        Args:
+            filepath (str): 保存先のパス。
+
+        Returns:
+            str: 完了時のメッセージ。
+        """
+        self.progress.set_total(len(self.highlights))
+        metadata.write_csv(filepath, self.highlights, self.progress)
+        return f"{self.progress.done}件のハイライトをCSVファイルにエクスポートしました:\n{filepath}"
+
+    def export_jsonl(self, filepath):
+        """ハイライトのメタデータをJSON Linesファイルとして保存します。
+
+        Args:
+            filepath (str): 保存先のパス。
+
+        Returns:
+            str: 完了時のメッセージ。
+        """
+        self.progress.set_total(len(self.highlights))
+        metadata.write_jsonl(filepath, self.highlights, self.progress)
+        return f"{self.progress.done}件のハイライトをJSON Linesファイルにエクスポートしました:\n{filepath}"
+
+    def export_parquet(self, filepath):
+        """ハイライトのメタデータをParquetファイルとして保存します。
+
+        Args:
+            filepath (str): 保存先のパス。
+
+        Returns:
+            str: 完了時のメッセージ。
+        """
+        self.progress.set_total(len(self.highlights))
+        metadata.write_parquet(filepath, self.highlights, self.progress)
+        return f"{self.progress.done}件のハイライトをParquetファイルにエクスポートしました:\n{filepath}"
+
+    def _start_excel_part(self, writer, filepath, part, filepaths):
+        """Excelエクスポートの次の出力先 (シートまたはファイル) を用意します。
+
+        設定 (`excel_split_mode`) がファイルの場合、2つ目以降のファイル名には
+        `_2`, `_3` ... を付けます。どちらの場合も見出し行を書き込みます。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            writer (StreamingXlsxWriter | None): 現在のライター。最初の呼び出しではNone。
+            filepath (str): ユーザーが指定した保存先のパス。
+            part (int): 出力先の番号 (1から)。
+            filepaths (list[str]): 作成したファイルのパスを追加するリスト。
+
+        Returns:
+            StreamingXlsxWriter: 書き込み先のライター。
+        """
+        title = "Highlights"
+        if writer is None or self.options.excel_split_mode == ExcelSplitMode.WORKBOOK.value:
+            if writer is not None:
+                writer.close()
+            root, ext = os.path.splitext(filepath)
+            path = filepath if part == 1 else f"{root}_{part}{ext}"
+            writer = StreamingXlsxWriter(path)
+            filepaths.append(path)
+        else:
+            title = f"Highlights_{part}"
+        writer.add_sheet(title, {1: 5, 3: 10, 4: 50})
+        writer.append_row(["No", "ページ画像", "ページ番号", "テキスト"])
+        return writer
+
+    def _encode_excel_image(self, img):
+        """Excelに貼り付ける画像を、設定された形式でエンコードします。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            img (Image.Image): エンコードする画像。
+
+        Returns:
+            tuple[bytes, str]: エンコードされた画像データと、その形式 ("png" または "jpeg")。
+        """
+        buffer = io.BytesIO()
+        if self.options.excel_image_format == ExcelImageFormat.JPEG.value:
+            img.save(buffer, format="JPEG", quality=self.options.excel_jpeg_quality)
+            return buffer.getvalue(), ExcelImageFormat.JPEG.value
+        img.save(buffer, format="PNG")
+        return buffer.getvalue(), ExcelImageFormat.PNG.value
+
+    def _export_clip(self, page_num, rect):
+        """画像/Excelエクスポートでレンダリングする範囲を返します。
+
+        設定 (`image_export_mode`) が領域のみの場合は、ハイライトの矩形を
+        `image_export_margin` ポイントだけ広げ、ページ内に収めた範囲を返します。
+        ハイライトの矩形は回転前のページ座標のため、回転前のページの範囲に
+        収めてから、レンダリングで使う表示上の座標 (回転後) に変換します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            page_num (int): ページ番号 (0-indexed)。
+            rect (fitz.Rect): ハイライトの矩形 (回転前のページ座標)。
+
+        Returns:
+            fitz.Rect | None: レンダリングする範囲 (表示上のページ座標)。
+                ページ全体の場合はNone。
+        """
+        if self.options.image_export_mode != ImageExportMode.REGION.value:
+            return None
+        margin = self.options.image_export_margin
+        page = self.doc[page_num]
+        bounds = page.rect * page.derotation_matrix
+        clip = fitz.Rect(rect.x0 - margin, rect.y0 - margin, rect.x1 + margin, rect.y1 + margin) & bounds
+        return None if clip.is_empty else clip * page.rotation_matrix
+
+    def _display_rects(self, highlights):
+        """ハイライトの矩形を、ページの画像上の位置 (表示上のページ座標) に変換します。
+
+        抽出したハイライトの矩形は回転前のページ座標のため、回転が指定された
+        ページでは、レンダリングした画像に赤枠を描画する前に変換が必要です。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            highlights (Iterable[Highlight]): 対象のハイライト。
+
+        Returns:
+            dict[int, fitz.Rect]: ハイライトの `id` と、変換した矩形の辞書。
+        """
+        matrices = {}
+        rects = {}
+        for highlight in highlights:
+            matrix = matrices.get(highlight.page_num)
+            if matrix is None:
+                matrix = matrices[highlight.page_num] = self.doc[highlight.page_num].rotation_matrix
+            rects[id(highlight)] = highlight.rect * matrix
+        return rects
+
+def run_export_task(filepath, highlights, options, method_name, target, progress):
+    """PDFファイルを開き、`ExportTask` のメソッドを実行します。
+
+    ジョブのワーカープロセスから呼び出すための関数です。
+
+    Args:
+        filepath (str): PDFファイルのパス。
+        highlights (list[Highlight]): エクスポートするハイライト情報のリスト。
+        options (ExportOptions): エクスポートの設定。
+        method_name (str): 実行する `ExportTask` のメソッド名。
+        target (str): 保存先のパスまたはフォルダ。
+        progress (ExportProgress): 進捗の報告先。
+
+    Returns:
+        str: 完了時のメッセージ。
+    """
+    doc = fitz.open(filepath)
+    try:
+        task = ExportTask(doc, highlights, options, progress)
+        return getattr(task, method_name)(target)
+    finally:
+        doc.close()
@@ -0,0 +1,343 @@
+"""行と画像を逐次書き出す、最小限のxlsxライターを提供します。
+
+openpyxlのWorkbookは保存するまですべてのセルと画像をメモリに保持するため、
+数千件のハイライトを画像付きで出力するとメモリ使用量が大きくなります。
+このライターは画像を受け取った時点でZIPへ書き込み、シートの行は一時ファイルへ
+書き出すため、メモリに残るのは画像の配置位置とセル結合の範囲だけです。
+文字列はインライン文字列として書き込み、共有文字列テーブルは作りません。
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# 1ピクセルあたりのEMU (96dpi換算)
+_EMU_PER_PIXEL = 9525
+
+# XMLに書き込めない制御文字
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# 中央揃えのセルの書式 (styles.xml の cellXfs のインデックス)
+_STYLE_CENTER = 1
+
+_STYLES_XML = (
+    _XML_HEADER
+    + f'<styleSheet xmlns="{_MAIN_NS}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0" applyAlignment="1">'
+    '<alignment horizontal="center" vertical="center"/></xf></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+def _column_letter(column):
+    """列番号 (1から) をExcelの列名 ("A", "B", ..., "AA", ...) に変換します。
+
+    openpyxlの `get_column_letter` と同じ結果を返します。openpyxlは読み込みに
+    時間がかかるため、このモジュールでは使いません。
+
+    Note:
+        この関数は内部利用を想定しています。
+    """
+    letters = ""
+    while column > 0:
+        column, remainder = divmod(column - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+class _Sheet:
+    """書き込み中または書き込み済みのシートの情報。
+
+    Note:
+        このクラスは内部利用を想定しています。
+    """
+
+    def __init__(self, index, title, column_widths):
+        self.index = index
+        self.title = title
+        self.column_widths = dict(column_widths or {})
+        self.body = tempfile.TemporaryFile()
+        self.row_count = 0
+        self.merged = []
+        # (行, 列, 幅, 高さ, ZIP内の画像のパス)
+        self.images = []
+        self.has_drawing = False
+
+class StreamingXlsxWriter:
+    """行と画像を逐次書き出してxlsxファイルを作成するクラス。
+
+    `with` 文で使用でき、例外で抜けた場合は書きかけのファイルを削除します。
+    """
+
+    def __init__(self, filepath):
+        """StreamingXlsxWriterオブジェクトを初期化し、出力先のファイルを作成します。
+
+        Args:
+            filepath (str): 出力先のxlsxファイルのパス。
+        """
+        self.filepath = filepath
+        self._zip = zipfile.ZipFile(filepath, "w", zipfile.ZIP_DEFLATED)
+        self._sheets = []
+        self._sheet = None
+        self._image_count = 0
+        self._image_formats = set()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    @property
+    def row_count(self):
+        """現在のシートに書き込んだ行数を返します。"""
+        return self._sheet.row_count if self._sheet is not None else 0
+
+    def add_sheet(self, title, column_widths=None):
+        """新しいシートを追加し、以降の書き込み先にします。
+
+        Args:
+            title (str): シート名。
+            column_widths (dict[int, float], optional): 列番号 (1から) と列幅 (文字数) の辞書。
+        """
+        if self._sheet is not None:
+            self._finish_sheet()
+        self._sheet = _Sheet(len(self._sheets) + 1, title, column_widths)
+        self._sheets.append(self._sheet)
+
+    def widen_column(self, column, width):
+        """現在のシートの列幅が指定した幅より狭ければ広げます。
+
+        Args:
+            column (int): 列番号 (1から)。
+            width (float): 列幅 (文字数)。
+        """
+        widths = self._sheet.column_widths
+        widths[column] = max(widths.get(column, 0), width)
+
+    def append_row(self, values, height=None, centered=()):
+        """現在のシートの末尾に行を追加します。
+
+        Args:
+            values (Iterable): セルの値。Noneのセルは空欄になります。
+            height (float, optional): 行の高さ (ポイント)。
+            centered (Container[int], optional): 中央揃えにする列番号 (1から)。
+
+        Returns:
+            int: 追加した行の番号 (1から)。
+        """
+        sheet = self._sheet
+        sheet.row_count += 1
+        row = sheet.row_count
+        attrs = f' ht="{height:.2f}" customHeight="1"' if height is not None else ""
+        cells = []
+        for column, value in enumerate(values, start=1):
+            if value is None:
+                continue
+            ref = f"{_column_letter(column)}{row}"
+            style = f' s="{_STYLE_CENTER}"' if column in centered else ""
+            if isinstance(value, bool):
+                cells.append(f'<c r="{ref}"{style} t="b"><v>{int(value)}</v></c>')
+            elif isinstance(value, (int, float)):
+                cells.append(f'<c r="{ref}"{style}><v>{value}</v></c>')
+            else:
+                text = _ILLEGAL_XML_CHARS.sub("", str(value))
+                cells.append(f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>')
+        sheet.body.write(f'<row r="{row}"{attrs}>{"".join(cells)}</row>'.encode("utf-8"))
+        return row
+
+    def merge_cells(self, start_row, start_column, end_row, end_column):
+        """現在のシートのセルを結合します。
+
+        Args:
+            start_row (int): 開始行 (1から)。
+            start_column (int): 開始列 (1から)。
+            end_row (int): 終了行 (1から)。
+            end_column (int): 終了列 (1から)。
+        """
+        self._sheet.merged.append(
+            f"{_column_letter(start_column)}{start_row}:{_column_letter(end_column)}{end_row}")
+
+    def add_image(self, data, image_format, row, column, width, height):
+        """画像をファイルへ書き込み、現在のシートのセルに配置します。
+
+        Args:
+            data (bytes): エンコード済みの画像データ。
+            image_format (str): 画像の形式 ("png" または "jpeg")。
+            row (int): 画像の左上を置く行 (1から)。
+            column (int): 画像の左上を置く列 (1から)。
+            width (int): 画像の幅 (ピクセル)。
+            height (int): 画像の高さ (ピクセル)。
+        """
+        self._image_count += 1
+        self._image_formats.add(image_format)
+        path = f"xl/media/image{self._image_count}.{image_format}"
+        # 画像は圧縮済みのため、ZIPでは圧縮しない
+        self._zip.writestr(path, data, compress_type=zipfile.ZIP_STORED)
+        self._sheet.images.append((row, column, width, height, path))
+
+    def close(self):
+        """書きかけのシートとブックの情報を書き込み、ファイルを閉じます。"""
+        if self._closed:
+            return
+        if self._sheet is None:
+            self.add_sheet("Sheet1")
+        self._finish_sheet()
+        self._write_workbook()
+        self._zip.close()
+        self._closed = True
+
+    def abort(self):
+        """書き込みを中止し、書きかけのファイルを削除します。"""
+        if self._closed:
+            return
+        self._closed = True
+        for sheet in self._sheets:
+            sheet.body.close()
+        self._zip.close()
+        try:
+            os.remove(self.filepath)
+        except OSError:
+            pass
+
+    def _finish_sheet(self):
+        """現在のシートのXML、描画、リレーションシップを書き込みます。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        sheet = self._sheet
+        self._sheet = None
+        index = sheet.index
+        with self._zip.open(f"xl/worksheets/sheet{index}.xml", "w") as fp:
+            fp.write((_XML_HEADER + f'<worksheet xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">').encode("utf-8"))
+            if sheet.column_widths:
+                cols = "".join(
+                    f'<col min="{column}" max="{column}" width="{width:.2f}" customWidth="1"/>'
+                    for column, width in sorted(sheet.column_widths.items()))
+                fp.write(f"<cols>{cols}</cols>".encode("utf-8"))
+            fp.write(b"<sheetData>")
+            sheet.body.seek(0)
+            shutil.copyfileobj(sheet.body, fp)
+            fp.write(b"</sheetData>")
+            if sheet.merged:
+                refs = "".join(f'<mergeCell ref="{ref}"/>' for ref in sheet.merged)
+                fp.write(f'<mergeCells count="{len(sheet.merged)}">{refs}</mergeCells>'.encode("utf-8"))
+            if sheet.images:
+                fp.write(b'<drawing r:id="rId1"/>')
+            fp.write(b"</worksheet>")
+        sheet.body.close()
+        if sheet.images:
+            self._write_drawing(sheet)
+            sheet.has_drawing = True
+            # 画像の配置情報はもう不要なので解放する
+            sheet.images = []
+
+    def _write_drawing(self, sheet):
+        """シートに配置した画像の描画パーツを書き込みます。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        index = sheet.index
+        self._zip.writestr(
+            f"xl/worksheets/_rels/sheet{index}.xml.rels",
+            _XML_HEADER + f'<Relationships xmlns="{_PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/drawing" Target="../drawings/drawing{index}.xml"/>'
+            '</Relationships>')
+        anchors = []
+        rels = []
+        for number, (row, column, width, height, path) in enumerate(sheet.images, start=1):
+            anchors.append(
+                "<xdr:oneCellAnchor>"
+                f"<xdr:from><xdr:col>{column - 1}</xdr:col><xdr:colOff>0</xdr:colOff>"
+                f"<xdr:row>{row - 1}</xdr:row><xdr:rowOff>0</xdr:rowOff></xdr:from>"
+                f'<xdr:ext cx="{width * _EMU_PER_PIXEL}" cy="{height * _EMU_PER_PIXEL}"/>'
+                f'<xdr:pic><xdr:nvPicPr><xdr:cNvPr id="{number + 1}" name="Image {number}"/>'
+                '<xdr:cNvPicPr><a:picLocks noChangeAspect="1"/></xdr:cNvPicPr></xdr:nvPicPr>'
+                f'<xdr:blipFill><a:blip r:embed="rId{number}"/><a:stretch><a:fillRect/></a:stretch></xdr:blipFill>'
+                '<xdr:spPr><a:prstGeom prst="rect"><a:avLst/></a:prstGeom></xdr:spPr></xdr:pic>'
+                "<xdr:clientData/></xdr:oneCellAnchor>")
+            rels.append(
+                f'<Relationship Id="rId{number}" Type="{_REL_NS}/image" '
+                f'Target="../media/{os.path.basename(path)}"/>')
+        self._zip.writestr(
+            f"xl/drawings/drawing{index}.xml",
+            _XML_HEADER
+            + '<xdr:wsDr xmlns:xdr="http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing" '
+            f'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" xmlns:r="{_REL_NS}">'
+            + "".join(anchors) + "</xdr:wsDr>")
+        self._zip.writestr(
+            f"xl/drawings/_rels/drawing{index}.xml.rels",
+            _XML_HEADER + f'<Relationships xmlns="{_PKG_REL_NS}">' + "".join(rels) + "</Relationships>")
+
+    def _write_workbook(self):
+        """ブック全体の構成を表すパーツを書き込みます。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        sheets = "".join(
+            f'<sheet name={quoteattr(sheet.title)} sheetId="{sheet.index}" r:id="rId{sheet.index}"/>'
+            for sheet in self._sheets)
+        self._zip.writestr(
+            "xl/workbook.xml",
+            _XML_HEADER + f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>{sheets}</sheets></workbook>')
+
+        styles_id = len(self._sheets) + 1
+        rels = "".join(
+            f'<Relationship Id="rId{sheet.index}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{sheet.index}.xml"/>'
+            for sheet in self._sheets)
+        rels += f'<Relationship Id="rId{styles_id}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+        self._zip.writestr(
+            "xl/_rels/workbook.xml.rels",
+            _XML_HEADER + f'<Relationships xmlns="{_PKG_REL_NS}">{rels}</Relationships>')
+        self._zip.writestr("xl/styles.xml", _STYLES_XML)
+        self._zip.writestr(
+            "_rels/.rels",
+            _XML_HEADER + f'<Relationships xmlns="{_PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>')
+
+        overrides = [
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>',
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>',
+        ]
+        for sheet in self._sheets:
+            overrides.append(
+                f'<Override PartName="/xl/worksheets/sheet{sheet.index}.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+            if sheet.has_drawing:
+                overrides.append(
+                    f'<Override PartName="/xl/drawings/drawing{sheet.index}.xml" '
+                    'ContentType="application/vnd.openxmlformats-officedocument.drawing+xml"/>')
+        defaults = [
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>',
+            '<Default Extension="xml" ContentType="application/xml"/>',
+        ]
+        for image_format in sorted(self._image_formats):
+            defaults.append(f'<Default Extension="{image_format}" ContentType="image/{image_format}"/>')
+        self._zip.writestr(
+            "[Content_Types].xml",
+            _XML_HEADER + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            + "".join(defaults) + "".join(overrides) + "</Types>")
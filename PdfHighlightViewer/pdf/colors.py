@@ -0,0 +1,276 @@
+"""名前付きの色範囲と、複数の色範囲をまとめて判定する分類器を提供します。
+
+色範囲は設定ファイルに1行ずつ `名前: 指定` の形式で書きます。指定は次の3種類です。
+
+- `rgb R0-R1 G0-G1 B0-B1`: RGBの各成分の範囲 (0-255)。
+- `hsv H0-H1 S0-S1 V0-V1`: 色相 (0-359度)、彩度と明度 (0-100%) の範囲。
+  色相は H0 > H1 の場合に0度をまたぐ範囲 (例: `330-20`) になります。
+- `tol #RRGGBB T`: 基準色から各成分の差がT以内の範囲。
+
+`ColorClassifier` は色範囲を成分ごとのビットマスクの表にまとめます。色範囲iに
+含まれる値の要素にはビットiが立っているため、3つの表を引いた値の論理積が、
+その色を含む色範囲の集合になります。判定の手間は色範囲の数によらず一定で、
+一度判定した色の結果は24ビットの色の値をキーとして再利用します。
+"""
+
+import colorsys
+
+# 色範囲の指定の種類
+RANGE_KINDS = ("rgb", "hsv", "tol")
+
+class ColorRange:
+    """名前付きの色範囲。
+
+    `space` が "rgb" の場合、`low` と `high` はRGBの各成分の下限と上限 (0-255)、
+    "hsv" の場合は色相 (0-359)、彩度と明度 (0-100) の下限と上限です。
+    `tol` の指定はRGBの範囲に変換して保持します。
+    """
+
+    def __init__(self, name, space, low, high):
+        """ColorRangeオブジェクトを初期化します。
+
+        Args:
+            name (str): 色範囲の名前。抽出した領域の色の分類として使います。
+            space (str): 色空間 ("rgb" または "hsv")。
+            low (tuple[int, int, int]): 各成分の下限。
+            high (tuple[int, int, int]): 各成分の上限。
+        """
+        self.name = name
+        self.space = space
+        self.low = tuple(low)
+        self.high = tuple(high)
+
+    def __repr__(self):
+        """ColorRangeオブジェクトの公式な文字列表現を返します。
+
+        Returns:
+            str: オブジェクトのデバッグ用文字列表現。
+        """
+        return f"ColorRange({self.name!r}, {self.space}, {self.low}, {self.high})"
+
+    def image_lut(self):
+        """Pillowの `Image.point` に渡す、この色範囲に含まれる値を255にする表を返します。
+
+        "rgb" の場合はRGB画像、"hsv" の場合はHSV画像 (各成分0-255) に適用します。
+
+        Returns:
+            list[int]: 3成分分 (768要素) の表。
+        """
+        if self.space == "hsv":
+            # PillowのHSV画像は色相、彩度、明度をいずれも0-255で表す
+            scales = (360 / 255, 100 / 255, 100 / 255)
+            limits = (360, 101, 101)
+        else:
+            scales = (1, 1, 1)
+            limits = (256, 256, 256)
+        lut = []
+        for low, high, scale, limit in zip(self.low, self.high, scales, limits):
+            for value in range(256):
+                scaled = round(value * scale) % limit
+                inside = low <= scaled <= high if low <= high else (scaled >= low or scaled <= high)
+                lut.append(255 if inside else 0)
+        return lut
+
+    @classmethod
+    def parse(cls, line):
+        """`名前: 指定` 形式の1行から色範囲を作成します。
+
+        Args:
+            line (str): 色範囲の定義。
+
+        Returns:
+            ColorRange: 作成した色範囲。
+
+        Raises:
+            ValueError: 形式が正しくない場合や、値が範囲外の場合。
+        """
+        name, separator, spec = line.partition(":")
+        name = name.strip()
+        words = spec.split()
+        if not separator or not name or not words:
+            raise ValueError(f"色範囲は「名前: 指定」の形式で入力してください: {line}")
+        kind = words[0].lower()
+        if kind == "tol":
+            if len(words) != 3:
+                raise ValueError(f"tol の指定は「tol #RRGGBB 許容差」の形式で入力してください: {line}")
+            center = _parse_hex_color(words[1], line)
+            tolerance = _parse_int(words[2], 0, 255, line)
+            return cls(name, "rgb", [max(0, c - tolerance) for c in center],
+                       [min(255, c + tolerance) for c in center])
+        if kind not in RANGE_KINDS or len(words) != 4:
+            raise ValueError(f"色範囲の指定は rgb、hsv、tol のいずれかで、3つの範囲が必要です: {line}")
+        limits = (359, 100, 100) if kind == "hsv" else (255, 255, 255)
+        low, high = [], []
+        for word, limit in zip(words[1:], limits):
+            first, dash, last = word.partition("-")
+            if not dash:
+                raise ValueError(f"範囲は「最小-最大」の形式で入力してください: {line}")
+            low.append(_parse_int(first, 0, limit, line))
+            high.append(_parse_int(last, 0, limit, line))
+        for channel in range(3):
+            # 色相だけは0度をまたぐ範囲を指定できる
+            if low[channel] > high[channel] and not (kind == "hsv" and channel == 0):
+                raise ValueError(f"範囲の最小値が最大値を超えています: {line}")
+        return cls(name, kind, low, high)
+
+def parse_color_ranges(lines):
+    """色範囲の定義の行のリストから色範囲のリストを作成します。
+
+    Args:
+        lines (Iterable[str]): 色範囲の定義。空の行は無視します。
+
+    Returns:
+        list[ColorRange]: 作成した色範囲のリスト。
+
+    Raises:
+        ValueError: 形式が正しくない行がある場合や、名前が重複している場合。
+    """
+    ranges = []
+    names = set()
+    for line in lines:
+        if not line.strip():
+            continue
+        color_range = ColorRange.parse(line)
+        if color_range.name in names:
+            raise ValueError(f"色範囲の名前が重複しています: {color_range.name}")
+        names.add(color_range.name)
+        ranges.append(color_range)
+    return ranges
+
+def color_ranges(color_min, color_max, lines=()):
+    """設定の値から色範囲のリストを作成します。
+
+    色範囲の定義がない場合は、従来の1つのRGBの範囲を名前のない色範囲として使います。
+
+    Args:
+        color_min (tuple[int, int, int]): RGBの下限。
+        color_max (tuple[int, int, int]): RGBの上限。
+        lines (Iterable[str], optional): 名前付きの色範囲の定義。
+
+    Returns:
+        list[ColorRange]: 作成した色範囲のリスト。
+
+    Raises:
+        ValueError: 色範囲の定義が正しくない場合。
+    """
+    return parse_color_ranges(lines) or [ColorRange("", "rgb", color_min, color_max)]
+
+def pack_rgb(color):
+    """PyMuPDFの色 (0から1の浮動小数点数の組) を24ビットの整数に変換します。
+
+    Args:
+        color (Sequence[float]): RGBの各成分。
+
+    Returns:
+        int: 0xRRGGBB形式の整数。
+    """
+    r, g, b = [int(c * 255) for c in color]
+    return (r << 16) | (g << 8) | b
+
+class ColorClassifier:
+    """複数の色範囲を、成分ごとのビットマスクの表にまとめた分類器。
+
+    色範囲が重なっている場合は、リストで先にある色範囲に分類します。
+    """
+
+    def __init__(self, ranges):
+        """ColorClassifierオブジェクトを初期化し、判定用の表を作成します。
+
+        Args:
+            ranges (list[ColorRange]): 判定する色範囲のリスト。
+        """
+        self.ranges = list(ranges)
+        self._rgb_tables = ([0] * 256, [0] * 256, [0] * 256)
+        self._hsv_tables = ([0] * 360, [0] * 101, [0] * 101)
+        self._has_hsv = False
+        for bit, color_range in enumerate(self.ranges):
+            if color_range.space == "hsv":
+                tables = self._hsv_tables
+                self._has_hsv = True
+            else:
+                tables = self._rgb_tables
+            for table, low, high in zip(tables, color_range.low, color_range.high):
+                values = range(low, high + 1) if low <= high else [*range(low, len(table)), *range(0, high + 1)]
+                for value in values:
+                    table[value] |= 1 << bit
+        # 判定済みの色 (0xRRGGBB) と、分類した色範囲の名前 (どれにも含まれない場合はNone)
+        self._classes = {}
+
+    @classmethod
+    def from_box(cls, color_min, color_max, lines=()):
+        """設定の値から分類器を作成します (`color_ranges` を参照)。
+
+        Args:
+            color_min (tuple[int, int, int]): RGBの下限。
+            color_max (tuple[int, int, int]): RGBの上限。
+            lines (Iterable[str], optional): 名前付きの色範囲の定義。
+
+        Returns:
+            ColorClassifier: 作成した分類器。
+
+        Raises:
+            ValueError: 色範囲の定義が正しくない場合。
+        """
+        return cls(color_ranges(color_min, color_max, lines))
+
+    def classify(self, color):
+        """色を分類します。
+
+        Args:
+            color (int): 0xRRGGBB形式の色。
+
+        Returns:
+            str | None: 色を含む色範囲の名前。どの色範囲にも含まれない場合はNone。
+        """
+        try:
+            return self._classes[color]
+        except KeyError:
+            pass
+        mask = self._mask(color)
+        name = self.ranges[(mask & -mask).bit_length() - 1].name if mask else None
+        self._classes[color] = name
+        return name
+
+    def _mask(self, color):
+        """色を含む色範囲のビットマスクを返します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        r, g, b = (color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF
+        red, green, blue = self._rgb_tables
+        mask = red[r] & green[g] & blue[b]
+        if self._has_hsv:
+            h, s, v = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+            hue, saturation, value = self._hsv_tables
+            mask |= hue[round(h * 360) % 360] & saturation[round(s * 100)] & value[round(v * 100)]
+        return mask
+
+def _parse_int(text, minimum, maximum, line):
+    """範囲内の整数を読み取ります。
+
+    Note:
+        この関数は内部利用を想定しています。
+    """
+    try:
+        value = int(text)
+    except ValueError:
+        raise ValueError(f"数値を読み取れません ({text}): {line}") from None
+    if not minimum <= value <= maximum:
+        raise ValueError(f"値 {value} は {minimum} から {maximum} の範囲で指定してください: {line}")
+    return value
+
+def _parse_hex_color(text, line):
+    """#RRGGBB 形式の色を読み取ります。
+
+    Note:
+        この関数は内部利用を想定しています。
+    """
+    digits = text.lstrip("#")
+    if len(digits) != 6:
+        raise ValueError(f"色は #RRGGBB の形式で入力してください: {line}")
+    try:
+        value = int(digits, 16)
+    except ValueError:
+        raise ValueError(f"色は #RRGGBB の形式で入力してください: {line}") from None
+    return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
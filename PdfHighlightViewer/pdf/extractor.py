@@ -1,17 +1,36 @@
 import fitz
-from collections import defaultdict
+from collections import defaultdict, deque
+from enum import Enum
+
+from . import raster
+from .colors import ColorClassifier, pack_rgb
+from .text_index import DocumentTextIndex
+
+class ExtractionCondition(Enum):
+    """領域の抽出条件を定義する列挙型。"""
+    HIGHLIGHT = "highlight"
+    TEXT_COLOR = "text_color"
+    KEYWORD = "keyword"
 
 class Highlight:
     """抽出された領域の情報を格納するデータクラス。"""
-    def __init__(self, page_num, rect):
+    def __init__(self, page_num, rect, text="", conditions=(), color_class=""):
         """Highlightオブジェクトを初期化します。
 
         Args:
             page_num (int): 領域が存在するページ番号 (0-indexed)。
             rect (fitz.Rect): 領域の座標。
+            text (str, optional): 領域内の文字列。
+            conditions (tuple[ExtractionCondition, ...], optional): 領域が
+                一致した抽出条件。
+            color_class (str, optional): 領域の色が含まれる色範囲の名前。
+                名前付きの色範囲を使わない場合や、色の条件がない場合は空文字列。
         """
         self.page_num = page_num
         self.rect = rect
+        self.text = text
+        self.conditions = conditions
+        self.color_class = color_class
 
     def __repr__(self):
         """Highlightオブジェクトの公式な文字列表現を返します。
@@ -21,18 +40,37 @@ class Highlight:
         """
         return f"Highlight(Page {self.page_num}, Rect{self.rect})"
 
-def extract_regions(doc, settings):
+def extract_regions(doc, settings, text_index=None, page_nums=None):
     """設定に基づいて、PDFから複数の条件を組み合わせて領域を抽出します。
 
     指定された複数の抽出条件（ハイライト色、文字色、キーワード）をAND条件
-    として扱い、すべての条件を満たす領域を抽出します。
+    として扱い、すべての条件を満たす領域を抽出します。各領域の文字列も
+    抽出時に求めて `Highlight.text` に格納するため、一覧の表示や検索、
+    エクスポートでPDFを解析し直す必要はありません。
+
+    色の条件には名前付きの色範囲を複数指定でき、1回の走査ですべての色範囲を
+    判定して、一致した色範囲の名前を `Highlight.color_class` に格納します。
+    ハイライト色と文字色の両方が条件の場合は、ハイライト色の分類を使います。
+
+    `settings.raster_highlight_detection` が有効な場合は、注釈や図形のハイライトが
+    見つからなかったページを画像として解析し、スキャンしたページの蛍光ペンの跡も
+    ハイライトとして抽出します (`raster` を参照)。
 
     Args:
         doc (fitz.Document): 解析対象のPDFドキュメント。
         settings (Settings): 抽出条件を含むアプリケーション設定オブジェクト。
+        text_index (DocumentTextIndex, optional): 領域内の文字列を求めるための
+            インデックス。抽出中に解析したページのテキストも登録されるため、
+            後で同じインデックスを使う処理はページを解析し直さずに済みます。
+            省略時はこの関数の中でだけ使うインデックスを作成します。
+        page_nums (Iterable[int], optional): 抽出するページ番号 (0-indexed) の
+            昇順のリスト。省略時はすべてのページから抽出します。
 
     Returns:
         list[Highlight]: 抽出された領域を表すHighlightオブジェクトのリスト。
+
+    Raises:
+        ValueError: 名前付きの色範囲の定義が正しくない場合。
     """
     extract_highlights = settings.extract_highlights
     extract_text_color = settings.extract_text_color
@@ -43,9 +81,32 @@ def extract_regions(doc, settings):
     if num_of_conditions == 0:
         return []
 
-    highlight_rects = _extract_colored_regions(doc, settings) if extract_highlights else None
-    text_color_rects = _extract_colored_text_regions(doc, settings) if extract_text_color else None
-    keyword_rects = _extract_keyword_regions(doc, settings.extraction_keyword) if extract_keyword else None
+    # 色範囲の定義の誤りは、ドキュメントを走査する前に報告する
+    highlight_classifier = ColorClassifier.from_box(
+        settings.highlight_color_min, settings.highlight_color_max,
+        settings.highlight_color_ranges) if extract_highlights else None
+    text_classifier = ColorClassifier.from_box(
+        settings.text_color_min, settings.text_color_max, settings.text_color_ranges) if extract_text_color else None
+
+    if text_index is None:
+        text_index = DocumentTextIndex(doc)
+    page_nums = range(doc.page_count) if page_nums is None else list(page_nums)
+    # 文字色の抽出で解析したページを、ほかの条件の文字列の取得でも使えるよう先に実行する
+    text_color_rects = _extract_colored_text_regions(
+        doc, text_classifier, text_index, page_nums) if extract_text_color else None
+    highlight_rects = _extract_colored_regions(
+        doc, highlight_classifier, text_index, page_nums) if extract_highlights else None
+    if extract_highlights and settings.raster_highlight_detection:
+        highlight_rects = _add_raster_regions(doc, highlight_rects, highlight_classifier.ranges,
+                                              settings.raster_detection_dpi, text_index, page_nums)
+    keyword_rects = _extract_keyword_regions(
+        doc, settings.extraction_keyword, text_index, page_nums) if extract_keyword else None
+
+    # 条件はAND条件のため、抽出された領域は有効なすべての条件に一致している
+    conditions = tuple(condition for condition, enabled in (
+        (ExtractionCondition.HIGHLIGHT, extract_highlights),
+        (ExtractionCondition.TEXT_COLOR, extract_text_color),
+        (ExtractionCondition.KEYWORD, extract_keyword)) if enabled)
 
     base_rects = []
     if extract_keyword:
@@ -56,69 +117,153 @@ def extract_regions(doc, settings):
         base_rects = highlight_rects
 
     if num_of_conditions == 1:
-        return [Highlight(page_num, rect) for page_num, rect in base_rects]
+        return [Highlight(page_num, rect, text, conditions, color_class)
+                for page_num, rect, text, color_class in base_rects]
 
     highlights_by_page = defaultdict(list)
     if highlight_rects is not None:
-        for page_num, rect in highlight_rects:
-            highlights_by_page[page_num].append(rect)
+        for page_num, rect, _, color_class in highlight_rects:
+            highlights_by_page[page_num].append((rect, color_class))
 
     text_color_by_page = defaultdict(list)
     if text_color_rects is not None:
-        for page_num, rect in text_color_rects:
-            text_color_by_page[page_num].append(rect)
+        for page_num, rect, _, color_class in text_color_rects:
+            text_color_by_page[page_num].append((rect, color_class))
 
     final_results = []
-    for page_num, base_rect in base_rects:
+    for page_num, base_rect, text, color_class in base_rects:
         is_valid = True
 
-        if extract_highlights and base_rects is not highlight_rects:
-            is_contained_in_highlight = any(h_rect.intersects(base_rect) for h_rect in highlights_by_page[page_num])
-            if not is_contained_in_highlight:
+        if extract_text_color and base_rects is not text_color_rects:
+            colored_text = next((c for c in text_color_by_page[page_num] if base_rect.intersects(c[0])), None)
+            if colored_text is None:
                 is_valid = False
-        
-        if is_valid and extract_text_color and base_rects is not text_color_rects:
-            is_intersecting_colored_text = any(base_rect.intersects(c_rect) for c_rect in text_color_by_page[page_num])
-            if not is_intersecting_colored_text:
+            else:
+                color_class = colored_text[1]
+
+        # ハイライト色の分類を文字色の分類より優先する
+        if is_valid and extract_highlights and base_rects is not highlight_rects:
+            highlight = next((h for h in highlights_by_page[page_num] if h[0].intersects(base_rect)), None)
+            if highlight is None:
                 is_valid = False
-        
+            else:
+                color_class = highlight[1]
+
         if is_valid:
-            final_results.append(Highlight(page_num, base_rect))
+            final_results.append(Highlight(page_num, base_rect, text, conditions, color_class))
             
     return final_results
 
-def _extract_colored_regions(doc, settings):
+def extraction_signature(settings):
+    """抽出結果に影響する設定の値をまとめたタプルを返します。
+
+    前回の抽出結果を再利用できるかどうか (設定が変わっていないか) の判定に使います。
+
+    Args:
+        settings (Settings): アプリケーション設定オブジェクト。
+
+    Returns:
+        tuple: 抽出条件、色の範囲、キーワード、画像からの検出の設定。
+    """
+    return (settings.extract_highlights, settings.extract_text_color, settings.extract_keyword,
+            settings.extraction_keyword, tuple(settings.highlight_color_min), tuple(settings.highlight_color_max),
+            tuple(settings.text_color_min), tuple(settings.text_color_max),
+            tuple(settings.highlight_color_ranges), tuple(settings.text_color_ranges),
+            settings.raster_highlight_detection, settings.raster_detection_dpi)
+
+def update_regions(doc, settings, highlights, old_page_hashes, new_page_hashes, text_index=None):
+    """内容が変わったページだけを抽出し直し、前回の抽出結果とまとめます。
+
+    抽出条件はすべてページ単位で判定されるため、描画内容のハッシュ値
+    (`hashing.page_hash`) が同じページの抽出結果は前回と変わりません。
+    新しいドキュメントの各ページを前回のページとハッシュ値で対応付け
+    (同じハッシュ値のページが複数ある場合は前から順に対応させます)、
+    対応するページがあれば前回の抽出結果をページ番号だけ付け替えて使い、
+    なければそのページから抽出し直します。ページの挿入や削除、並べ替えにも
+    対応します。
+
+    Args:
+        doc (fitz.Document): 更新後のドキュメント。
+        settings (Settings): 前回と同じ抽出条件を含むアプリケーション設定オブジェクト。
+        highlights (list[Highlight]): 前回の抽出結果。
+        old_page_hashes (list[str]): 前回のドキュメントの各ページのハッシュ値。
+        new_page_hashes (list[str]): 更新後のドキュメントの各ページのハッシュ値。
+        text_index (DocumentTextIndex, optional): `extract_regions` を参照。
+
+    Returns:
+        tuple[list[Highlight], dict[Highlight, Highlight], list[int]]: ページ順に
+            並べた更新後の抽出結果、前回の領域から再利用した領域への対応、
+            抽出し直したページ番号のリスト。
+
+    Raises:
+        ValueError: 名前付きの色範囲の定義が正しくない場合。
+    """
+    old_pages = defaultdict(deque)
+    for page_num, page_hash in enumerate(old_page_hashes):
+        old_pages[page_hash].append(page_num)
+    # 更新後のページ番号 -> 前回のページ番号
+    page_map = {}
+    changed_pages = []
+    for page_num, page_hash in enumerate(new_page_hashes):
+        candidates = old_pages.get(page_hash)
+        if candidates:
+            page_map[page_num] = candidates.popleft()
+        else:
+            changed_pages.append(page_num)
+
+    old_by_page = defaultdict(list)
+    for highlight in highlights:
+        old_by_page[highlight.page_num].append(highlight)
+    extracted_by_page = defaultdict(list)
+    if changed_pages:
+        for highlight in extract_regions(doc, settings, text_index, changed_pages):
+            extracted_by_page[highlight.page_num].append(highlight)
+
+    results = []
+    reused = {}
+    for page_num in range(len(new_page_hashes)):
+        if page_num not in page_map:
+            results.extend(extracted_by_page[page_num])
+            continue
+        for old in old_by_page[page_map[page_num]]:
+            highlight = Highlight(page_num, old.rect, old.text, old.conditions, old.color_class)
+            reused[old] = highlight
+            results.append(highlight)
+    return results, reused, changed_pages
+
+def _extract_colored_regions(doc, classifier, text_index, page_nums):
     """PDFから指定された色の図形や注釈領域を抽出します。
 
-    設定で指定された色範囲に一致する、長方形の図形（drawings）や
-    ハイライト注釈（annotations）の領域を検出します。
+    いずれかの色範囲に一致する、長方形の図形（drawings）や
+    ハイライト注釈（annotations）の領域を検出します。ハイライト注釈の文字列は、
+    注釈の外接矩形ではなく、実際にハイライトされた範囲 (QuadPoints) から求めます。
 
     Note:
         この関数は内部利用を想定しています。
 
     Args:
         doc (fitz.Document): 解析対象のPDFドキュメント。
-        settings (Settings): ハイライト色の範囲設定を含むオブジェクト。
+        classifier (ColorClassifier): ハイライト色の分類器。
+        text_index (DocumentTextIndex): 領域内の文字列を求めるためのインデックス。
+        page_nums (Iterable[int]): 処理するページ番号 (0-indexed)。
 
     Returns:
-        list[tuple[int, fitz.Rect]]: ページ番号と領域の座標(Rect)の
-            タプルからなるリスト。
+        list[tuple[int, fitz.Rect, str, str]]: ページ番号、領域の座標(Rect)、
+            領域内の文字列、色範囲の名前のタプルからなるリスト。
     """
     highlights = []
-    h_min_r, h_min_g, h_min_b = settings.highlight_color_min
-    h_max_r, h_max_g, h_max_b = settings.highlight_color_max
 
-    for page_num, page in enumerate(doc):
+    for page_num in page_nums:
+        page = doc[page_num]
         for annot in page.annots():
             if annot.type[0] == 8:
                 colors = annot.colors
                 stroke_color = colors.get('stroke')
                 if stroke_color and len(stroke_color) == 3:
-                    r, g, b = [int(c * 255) for c in stroke_color]
-                    if (h_min_r <= r <= h_max_r and
-                        h_min_g <= g <= h_max_g and
-                        h_min_b <= b <= h_max_b):
-                        highlights.append((page_num, annot.rect))
+                    color_class = classifier.classify(pack_rgb(stroke_color))
+                    if color_class is not None:
+                        highlights.append(
+                            (page_num, annot.rect, _annot_text(annot, page_num, text_index), color_class))
 
         drawings = page.get_drawings()
         for path in drawings:
@@ -126,61 +271,88 @@ def _extract_colored_regions(doc, settings):
             if not is_rect:
                 continue
 
-            is_target_color = False
+            color_class = None
             fill_color = path.get("fill")
             if fill_color and len(fill_color) == 3:
-                r, g, b = [int(c * 255) for c in fill_color]
-                if (h_min_r <= r <= h_max_r and
-                    h_min_g <= g <= h_max_g and
-                    h_min_b <= b <= h_max_b):
-                    is_target_color = True
+                color_class = classifier.classify(pack_rgb(fill_color))
             
-            if not is_target_color:
+            if color_class is None:
                 stroke_color = path.get("color")
                 if stroke_color and len(stroke_color) == 3:
-                    r, g, b = [int(c * 255) for c in stroke_color]
-                    if (h_min_r <= r <= h_max_r and
-                        h_min_g <= g <= h_max_g and
-                        h_min_b <= b <= h_max_b):
-                        is_target_color = True
+                    color_class = classifier.classify(pack_rgb(stroke_color))
             
-            if is_target_color:
-                if path["rect"].width > 1 and path["rect"].height > 1:
-                    highlights.append((page_num, path["rect"]))
+            if color_class is not None:
+                rect = path["rect"]
+                if rect.width > 1 and rect.height > 1:
+                    highlights.append((page_num, rect, text_index.text_in(page_num, rect), color_class))
 
     unique_highlights = []
     seen_rects = set()
-    for page_num, rect in highlights:
+    for page_num, rect, text, color_class in highlights:
         rect_tuple = (page_num, rect.x0, rect.y0, rect.x1, rect.y1)
         if rect_tuple not in seen_rects:
-            unique_highlights.append((page_num, rect))
+            unique_highlights.append((page_num, rect, text, color_class))
             seen_rects.add(rect_tuple)
 
     return unique_highlights
 
-def _extract_colored_text_regions(doc, settings):
+def _add_raster_regions(doc, highlight_rects, ranges, dpi, text_index, page_nums):
+    """注釈や図形のハイライトがないページを画像として解析し、検出した領域を追加します。
+
+    画像からの検出はページのレンダリングを伴うため、注釈や図形のハイライトが
+    見つかったページは解析しません。領域内の文字列は、テキスト (OCRの結果を含む)
+    があるページでのみ求められます。
+
+    Note:
+        この関数は内部利用を想定しています。
+
+    Args:
+        doc (fitz.Document): 解析対象のPDFドキュメント。
+        highlight_rects (list[tuple[int, fitz.Rect, str, str]]): 注釈や図形から
+            抽出した領域。
+        ranges (list[ColorRange]): ハイライト色の色範囲のリスト。
+        dpi (int): 検出に使うレンダリング解像度。
+        text_index (DocumentTextIndex): 領域内の文字列を求めるためのインデックス。
+        page_nums (Iterable[int]): 処理するページ番号 (0-indexed)。
+
+    Returns:
+        list[tuple[int, fitz.Rect, str, str]]: ページ順に並べた、ページ番号、
+            領域の座標(Rect)、領域内の文字列、色範囲の名前のタプルからなるリスト。
+    """
+    pages_with_hits = {page_num for page_num, _, _, _ in highlight_rects}
+    page_nums = [page_num for page_num in page_nums if page_num not in pages_with_hits]
+    raster_rects = [(page_num, rect, text_index.text_in(page_num, rect), color_class)
+                    for page_num, rect, color_class in raster.detect_regions(doc, page_nums, ranges, dpi)]
+    if not raster_rects:
+        return highlight_rects
+    return sorted(highlight_rects + raster_rects, key=lambda item: item[0])
+
+def _extract_colored_text_regions(doc, classifier, text_index, page_nums):
     """PDFから指定された色の文字が含まれる領域を抽出します。
 
-    設定で指定された色範囲に一致する文字（span）を検出し、
-    その文字が含まれる領域を返します。
+    いずれかの色範囲に一致する文字（span）を検出し、
+    その文字が含まれる領域と、spanの文字列を返します。
 
     Note:
         この関数は内部利用を想定しています。
 
     Args:
         doc (fitz.Document): 解析対象のPDFドキュメント。
-        settings (Settings): 文字色の範囲設定を含むオブジェクト。
+        classifier (ColorClassifier): 文字色の分類器。
+        text_index (DocumentTextIndex): 解析したページのテキストを
+            登録するインデックス。
+        page_nums (Iterable[int]): 処理するページ番号 (0-indexed)。
 
     Returns:
-        list[tuple[int, fitz.Rect]]: ページ番号と領域の座標(Rect)の
-            タプルからなるリスト。
+        list[tuple[int, fitz.Rect, str, str]]: ページ番号、領域の座標(Rect)、
+            領域内の文字列、色範囲の名前のタプルからなるリスト。
     """
     text_regions = []
-    t_min_r, t_min_g, t_min_b = settings.text_color_min
-    t_max_r, t_max_g, t_max_b = settings.text_color_max
 
-    for page_num, page in enumerate(doc):
+    for page_num in page_nums:
+        page = doc[page_num]
         page_dict = page.get_text("rawdict")
+        text_index.add_page(page_num, page_dict)
         for block in page_dict.get("blocks", []):
             for line in block.get("lines", []):
                 for span in line.get("spans", []):
@@ -188,29 +360,24 @@ def _extract_colored_text_regions(doc, settings):
                     if color_int is None:
                         continue
 
-                    r = (color_int >> 16) & 0xFF
-                    g = (color_int >> 8) & 0xFF
-                    b = color_int & 0xFF
-
-                    if (t_min_r <= r <= t_max_r and
-                        t_min_g <= g <= t_max_g and
-                        t_min_b <= b <= t_max_b):
-                        
+                    color_class = classifier.classify(color_int & 0xFFFFFF)
+                    if color_class is not None:
                         rect = fitz.Rect(span["bbox"])
                         if rect.width > 1 and rect.height > 1:
-                            text_regions.append((page_num, rect))
+                            text = "".join(char["c"] for char in span.get("chars", [])).strip()
+                            text_regions.append((page_num, rect, text, color_class))
 
     unique_regions = []
     seen_rects = set()
-    for page_num, rect in text_regions:
+    for page_num, rect, text, color_class in text_regions:
         rect_tuple = (page_num, rect.x0, rect.y0, rect.x1, rect.y1)
         if rect_tuple not in seen_rects:
-            unique_regions.append((page_num, rect))
+            unique_regions.append((page_num, rect, text, color_class))
             seen_rects.add(rect_tuple)
 
     return unique_regions
 
-def _extract_keyword_regions(doc, keyword):
+def _extract_keyword_regions(doc, keyword, text_index, page_nums):
     """PDFから指定されたキーワードが含まれる領域を抽出します。
 
     PyMuPDFの `search_for` メソッドを利用して、指定されたキーワードが
@@ -222,18 +389,51 @@ def _extract_keyword_regions(doc, keyword):
     Args:
         doc (fitz.Document): 解析対象のPDFドキュメント。
         keyword (str): 検索するキーワード。空文字列の場合は何も返しません。
+        text_index (DocumentTextIndex): 領域内の文字列を求めるためのインデックス。
+            `search_for` は大文字と小文字を区別しないため、文字列はページ上の
+            実際の表記から求めます。
+        page_nums (Iterable[int]): 処理するページ番号 (0-indexed)。
 
     Returns:
-        list[tuple[int, fitz.Rect]]: ページ番号と領域の座標(Rect)の
-            タプルからなるリスト。
+        list[tuple[int, fitz.Rect, str, str]]: ページ番号、領域の座標(Rect)、
+            領域内の文字列、色範囲の名前 (常に空文字列) のタプルからなるリスト。
     """
     keyword_regions = []
     if not keyword:
         return keyword_regions
 
-    for page_num, page in enumerate(doc):
+    for page_num in page_nums:
+        page = doc[page_num]
         rects = page.search_for(keyword)
         for rect in rects:
-            keyword_regions.append((page_num, rect))
+            keyword_regions.append((page_num, rect, text_index.text_in(page_num, rect), ""))
 
     return keyword_regions
+
+def _annot_text(annot, page_num, text_index):
+    """ハイライト注釈でハイライトされている文字列を返します。
+
+    注釈の外接矩形には前後の行の文字が含まれることがあるため、
+    QuadPointsの各四角形ごとに文字列を求め、改行でつなげます。
+    QuadPointsがない場合は外接矩形を使います。
+
+    Note:
+        この関数は内部利用を想定しています。
+
+    Args:
+        annot (fitz.Annot): ハイライト注釈。
+        page_num (int): 注釈のあるページ番号 (0-indexed)。
+        text_index (DocumentTextIndex): 文字列を求めるためのインデックス。
+
+    Returns:
+        str: ハイライトされている文字列。
+    """
+    vertices = annot.vertices
+    if not vertices or len(vertices) % 4:
+        return text_index.text_in(page_num, annot.rect)
+    lines = []
+    for i in range(0, len(vertices), 4):
+        text = text_index.text_in(page_num, fitz.Quad(vertices[i:i + 4]).rect)
+        if text:
+            lines.append(text)
+    return "\n".join(lines)
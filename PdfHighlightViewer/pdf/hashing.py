@@ -0,0 +1,65 @@
+"""ファイル内容のハッシュ計算を提供します。"""
+
+import hashlib
+
+def file_hash(filepath, chunk_size=1 << 20):
+    """ファイルの内容からハッシュ値を計算します。
+
+    キャッシュのキーとして使うため、ファイル名や更新日時ではなく
+    内容のみに依存する値を返します。
+
+    Args:
+        filepath (str): 対象のファイルパス。
+        chunk_size (int, optional): 一度に読み込むバイト数。
+
+    Returns:
+        str: 16進数表記のハッシュ値。
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def data_hash(data):
+    """メモリ上のファイルの内容から、`file_hash` と同じハッシュ値を計算します。
+
+    Args:
+        data (bytes): ファイルの内容。
+
+    Returns:
+        str: 16進数表記のハッシュ値。
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def page_hash(page):
+    """ページの描画内容からハッシュ値を計算します。
+
+    ページの大きさと回転、コンテンツストリーム、ページが参照する画像と
+    フォームXObjectのストリーム、注釈の種類と位置と色を対象にします。
+    オブジェクト番号は保存のたびに変わることがあるため含めません。
+    そのため、ほかのページの変更や、ファイルの保存し直しでは値が変わりません
+    (フォントだけが差し替えられた場合も変わりません)。
+
+    Args:
+        page (fitz.Page): 対象のページ。
+
+    Returns:
+        str: 16進数表記のハッシュ値。
+    """
+    doc = page.parent
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((tuple(page.rect), page.rotation)).encode())
+    # コンテンツストリームのない白紙のページでは read_contents が使えない
+    if page.get_contents():
+        h.update(page.read_contents())
+    xrefs = {image[0] for image in page.get_images(full=True)}
+    xrefs.update(xobject[0] for xobject in page.get_xobjects())
+    # オブジェクト番号の順序にも依存しないよう、ストリームごとのハッシュ値を並べ替えて加える
+    for digest in sorted(hashlib.blake2b(doc.xref_stream_raw(xref) or b"", digest_size=16).digest()
+                         for xref in xrefs if xref > 0):
+        h.update(digest)
+    for annot in page.annots():
+        h.update(repr((annot.type[0], tuple(annot.rect), annot.colors, annot.opacity,
+                       annot.vertices, annot.info.get("content", ""))).encode())
+    return h.hexdigest()
@@ -0,0 +1,201 @@
+"""スキャンしたPDFのための、ページ画像からのハイライト検出を提供します。
+
+スキャンしたページの蛍光ペンの跡は注釈や図形ではないため、ページを低い解像度で
+レンダリングした画像から検出します。色範囲ごとに、Pillowの `Image.point` で
+各成分の表を引いて二値のマスク画像を作り (処理はPillowの内部で行われます)、
+行ごとの連続した区間 (ランレングス) をつなげて領域の外接矩形を求めます。
+ハイライト上の文字による隙間は、同じ行の近い区間を1つの区間として扱うことで
+埋めます (上下に並んだ別の行のハイライトはつながりません)。
+ページ数が多い場合は、ページをまとめてプロセスプールで処理します。
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+from PIL import Image, ImageChops
+
+# 検出に使うレンダリング解像度の既定値
+DEFAULT_DPI = 60
+
+# 並列処理に使うワーカー数の既定値
+DEFAULT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+# 1つのタスクで処理するページ数
+PAGES_PER_TASK = 16
+
+# 検出する領域の最小の幅と高さ (ポイント)
+MIN_REGION_SIZE = 4.0
+
+def detect_regions(doc, page_nums, ranges, dpi=DEFAULT_DPI, workers_count=None):
+    """ページ画像から、色範囲に一致する領域を検出します。
+
+    ワーカー数が1以下の場合、処理するページが少ない場合、ファイルから開かれて
+    いないドキュメントやパスワードで保護されたドキュメントの場合は、
+    呼び出し元のプロセスで順に処理します。どちらの場合も結果は同じです。
+
+    Args:
+        doc (fitz.Document): 解析対象のドキュメント。
+        page_nums (Iterable[int]): 処理するページ番号 (0-indexed)。
+        ranges (list[ColorRange]): 検出する色範囲のリスト。重なっている場合は
+            リストで先にある色範囲に分類します。
+        dpi (int, optional): 検出に使うレンダリング解像度。
+        workers_count (int, optional): ワーカー数。省略時は `DEFAULT_WORKERS`。
+
+    Yields:
+        tuple[int, fitz.Rect, str]: ページ順に並んだ、ページ番号、領域の座標
+            (回転前のページ座標)、色範囲の名前。
+    """
+    if workers_count is None:
+        workers_count = DEFAULT_WORKERS
+    page_nums = list(page_nums)
+    filepath = doc.name
+    if (workers_count <= 1 or len(page_nums) <= PAGES_PER_TASK or not filepath
+            or not os.path.isfile(filepath) or doc.needs_pass):
+        for page_num in page_nums:
+            for rect, name in detect_page(doc[page_num], ranges, dpi):
+                yield page_num, rect, name
+        return
+
+    from . import workers
+
+    pool = ProcessPoolExecutor(max_workers=workers_count)
+    futures = [pool.submit(workers.detect_raster_regions, filepath, page_nums[i:i + PAGES_PER_TASK], ranges, dpi)
+               for i in range(0, len(page_nums), PAGES_PER_TASK)]
+    try:
+        for future in futures:
+            for page_num, rect, name in future.result():
+                yield page_num, fitz.Rect(rect), name
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def detect_page(page, ranges, dpi=DEFAULT_DPI):
+    """1ページの画像から、色範囲に一致する領域を検出します。
+
+    Args:
+        page (fitz.Page): 解析対象のページ。
+        ranges (list[ColorRange]): 検出する色範囲のリスト。
+        dpi (int, optional): 検出に使うレンダリング解像度。
+
+    Returns:
+        list[tuple[fitz.Rect, str]]: 領域の座標 (回転前のページ座標) と
+            色範囲の名前のリスト。
+    """
+    scale = dpi / 72
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), colorspace=fitz.csRGB, alpha=False)
+    img = Image.frombuffer("RGB", (pix.width, pix.height), pix.samples, "raw", "RGB", pix.stride, 1)
+    # 画像の座標 -> 表示上のページ座標 -> 回転前のページ座標
+    to_page = fitz.Matrix(1 / scale, 1 / scale) * page.derotation_matrix
+    results = []
+    for (x0, y0, x1, y1), name in detect_image(img, ranges, _max_gap(dpi)):
+        rect = fitz.Rect(x0 + pix.x, y0 + pix.y, x1 + pix.x, y1 + pix.y) * to_page
+        if rect.width >= MIN_REGION_SIZE and rect.height >= MIN_REGION_SIZE:
+            results.append((rect, name))
+    return results
+
+def detect_image(img, ranges, max_gap=4):
+    """RGB画像から、色範囲に一致する領域の外接矩形を求めます。
+
+    Args:
+        img (Image.Image): RGB画像。
+        ranges (list[ColorRange]): 検出する色範囲のリスト。
+        max_gap (int, optional): 同じ行で1つの区間として扱う隙間の最大のピクセル数。
+
+    Returns:
+        list[tuple[tuple[int, int, int, int], str]]: 外接矩形 (右端と下端を含まない
+            ピクセル座標) と色範囲の名前のリスト。
+    """
+    hsv = None
+    claimed = None
+    results = []
+    for color_range in ranges:
+        if color_range.space == "hsv":
+            if hsv is None:
+                hsv = img.convert("HSV")
+            source = hsv
+        else:
+            source = img
+        red, green, blue = source.point(color_range.image_lut()).split()
+        mask = ImageChops.multiply(ImageChops.multiply(red, green), blue)
+        # 先の色範囲に分類された画素は除く
+        if claimed is not None:
+            mask = ImageChops.subtract(mask, claimed)
+        claimed = mask if claimed is None else ImageChops.lighter(claimed, mask)
+        results.extend((box, color_range.name) for box in mask_boxes(mask, max_gap))
+    return results
+
+def mask_boxes(mask, max_gap=0):
+    """二値のマスク画像 ("L"、0または255) で、つながった領域の外接矩形を求めます。
+
+    各行の値が255の連続した区間を求め、前の行の区間と (斜めも含めて) 接して
+    いれば同じ領域としてつなげます。画素ではなく区間の単位で処理するため、
+    手間は区間の数に比例します。
+
+    Args:
+        mask (Image.Image): マスク画像。
+        max_gap (int, optional): 同じ行で、隙間がこのピクセル数以下の区間は
+            1つの区間として扱います。
+
+    Returns:
+        list[tuple[int, int, int, int]]: 外接矩形 (右端と下端を含まない) のリスト。
+    """
+    width, height = mask.size
+    data = mask.tobytes()
+    boxes = []
+    parent = []
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    previous = []
+    for y in range(height):
+        row = data[y * width:(y + 1) * width]
+        current = []
+        first = 0
+        start = row.find(255)
+        while start >= 0:
+            end = row.find(0, start)
+            while 0 <= end:
+                following = row.find(255, end)
+                if following < 0 or following - end > max_gap:
+                    break
+                end = row.find(0, following)
+            if end < 0:
+                end = width
+            # 前の行で、この区間の左上から右上までと接する区間をつなげる
+            while first < len(previous) and previous[first][1] < start:
+                first += 1
+            index = None
+            other = first
+            while other < len(previous) and previous[other][0] <= end:
+                root = find(previous[other][2])
+                if index is None:
+                    index = root
+                elif root != index:
+                    parent[root] = index
+                    box, merged = boxes[index], boxes[root]
+                    boxes[index] = [min(box[0], merged[0]), min(box[1], merged[1]),
+                                    max(box[2], merged[2]), max(box[3], merged[3])]
+                other += 1
+            if index is None:
+                index = len(boxes)
+                parent.append(index)
+                boxes.append([start, y, end, y + 1])
+            else:
+                box = boxes[index]
+                boxes[index] = [min(box[0], start), box[1], max(box[2], end), y + 1]
+            current.append((start, end, index))
+            start = row.find(255, end)
+        previous = current
+    return [tuple(box) for index, box in enumerate(boxes) if find(index) == index]
+
+def _max_gap(dpi):
+    """解像度に応じた、同じ行で1つの区間として扱う隙間の大きさを返します (60dpiで4ピクセル)。
+
+    Note:
+        この関数は内部利用を想定しています。
+    """
+    return max(2, round(dpi / 15))
@@ -0,0 +1,262 @@
+"""ドキュメントの内容をキーとした、レンダリング結果のディスクキャッシュを提供します。
+
+同じドキュメントの同じページを同じ倍率、範囲、色空間でレンダリングした結果を
+圧縮して保存し、エクスポートやプレビューで再利用します。キーにはファイル名ではなく
+ドキュメントの内容のハッシュ値を使うため、ファイルが更新されれば自動的に
+別のエントリになります。キャッシュ全体の大きさには上限があり、超えた場合は
+最後に使われたのが古いエントリから削除します (最終使用時刻はファイルの
+更新日時で管理します)。
+
+ワーカープロセスからも使うため、インスタンスはpickle可能です。PyMuPDFは
+アプリケーションの起動を遅くしないよう、最初にレンダリングする時点で読み込みます。
+"""
+
+import hashlib
+import os
+import struct
+import zlib
+
+from .hashing import file_hash
+
+# 圧縮レベル (展開の速さを優先する)
+COMPRESS_LEVEL = 1
+
+# 上限を超えたときに、上限に対してこの割合まで削除する
+EVICT_TARGET_RATIO = 0.8
+
+# エントリの先頭に置くヘッダー (左上のx座標とy座標、幅、高さ、1行あたりのバイト数)
+_HEADER = struct.Struct("<iiiii")
+
+# プロセスごとに計算済みのドキュメントのハッシュ値
+_document_hashes = {}
+
+def document_hash(filepath):
+    """ドキュメントの内容のハッシュ値を返します。
+
+    同じプロセスでは、ファイルが更新されるまで計算結果を再利用します。
+
+    Args:
+        filepath (str): PDFファイルのパス。
+
+    Returns:
+        str: 16進数表記のハッシュ値。
+    """
+    stat = os.stat(filepath)
+    key = (filepath, stat.st_mtime_ns, stat.st_size)
+    doc_hash = _document_hashes.get(key)
+    if doc_hash is None:
+        _document_hashes.clear()
+        doc_hash = _document_hashes[key] = file_hash(filepath)
+    return doc_hash
+
+def cacheable(doc):
+    """ドキュメントのレンダリング結果をキャッシュできるかどうかを返します。
+
+    ファイルから開かれていないドキュメントは内容のハッシュ値を計算できず、
+    パスワードで保護されたドキュメントは内容を平文でディスクに残さないよう、
+    どちらもキャッシュしません。
+
+    Args:
+        doc (fitz.Document): 対象のドキュメント。
+
+    Returns:
+        bool: キャッシュできる場合はTrue。
+    """
+    return bool(doc.name) and os.path.isfile(doc.name) and not doc.needs_pass
+
+class RenderCache:
+    """レンダリング結果 (ピクセルデータ) を圧縮して保存するディスクキャッシュ。
+
+    1つのエントリは1つのファイルで、ファイル名はキーのハッシュ値です。
+    複数のプロセスから同時に使われても、書き込み途中のファイルが読まれることは
+    ありません。
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        """RenderCacheオブジェクトを初期化します。
+
+        Args:
+            cache_dir (str): キャッシュファイルを保存するディレクトリ。
+            max_bytes (int): キャッシュ全体の大きさの上限 (バイト)。
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # このプロセスで把握しているキャッシュ全体の大きさ (未計算の場合はNone)
+        self._size = None
+
+    @classmethod
+    def from_settings(cls, settings):
+        """設定からキャッシュを作成します。
+
+        Args:
+            settings (Settings | ExportOptions): `cache_dir` と
+                `render_cache_size_mb` を持つ設定オブジェクト。
+
+        Returns:
+            RenderCache | None: 作成したキャッシュ。上限が0の場合はNone。
+        """
+        if settings.render_cache_size_mb <= 0:
+            return None
+        return cls(os.path.join(settings.cache_dir, "renders"), settings.render_cache_size_mb * 1024 * 1024)
+
+    def key(self, filepath, page_num, scale, clip=None, gray=False):
+        """レンダリング条件からキャッシュのキーを作成します。
+
+        Args:
+            filepath (str): PDFファイルのパス。
+            page_num (int): ページ番号 (0-indexed)。
+            scale (float): レンダリング倍率。
+            clip (Sequence[float] | None, optional): レンダリングする範囲 (ページ座標)。
+            gray (bool, optional): グレースケールでレンダリングする場合はTrue。
+
+        Returns:
+            str: キャッシュのキー。
+        """
+        clip_text = "page" if clip is None else ",".join(f"{value:.3f}" for value in clip)
+        colorspace = "gray" if gray else "rgb"
+        text = f"{document_hash(filepath)}|{page_num}|{scale:.6f}|{clip_text}|{colorspace}"
+        return hashlib.blake2b(text.encode("ascii"), digest_size=16).hexdigest()
+
+    def get(self, key):
+        """キャッシュからレンダリング結果を読み込みます。
+
+        Args:
+            key (str): `key` で作成したキー。
+
+        Returns:
+            tuple[int, int, int, int, int, bytes] | None: 左上のx座標とy座標、幅、高さ、
+                1行あたりのバイト数、サンプルデータ。キャッシュにない場合はNone。
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            header = _HEADER.unpack_from(data)
+            samples = zlib.decompress(memoryview(data)[_HEADER.size:])
+        except (OSError, struct.error, zlib.error):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return (*header, samples)
+
+    def put(self, key, rendered):
+        """レンダリング結果をキャッシュに保存します。
+
+        すべてのレンダリング結果を保存し、ディスクの使用量はキャッシュ全体の
+        上限と、最後に使われたのが古いエントリからの削除で抑えます。
+        上限より大きい1つのエントリは保存しません。
+
+        Args:
+            key (str): `key` で作成したキー。
+            rendered (tuple[int, int, int, int, int, bytes]): `get` と同じ形式の
+                レンダリング結果。
+        """
+        data = _HEADER.pack(*rendered[:5]) + zlib.compress(rendered[5], COMPRESS_LEVEL)
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        if self._size is None:
+            self._size = self._scan()[1]
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _path(self, key):
+        """キャッシュファイルのパスを返します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        return os.path.join(self.cache_dir, f"{key}.bin")
+
+    def _scan(self):
+        """キャッシュファイルの一覧と合計の大きさを返します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Returns:
+            tuple[list[tuple[float, int, str]], int]: 最終使用時刻、大きさ、パスの
+                リストと、大きさの合計。
+        """
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".bin"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            pass
+        return entries, sum(size for _, size, _ in entries)
+
+    def _evict(self):
+        """最後に使われたのが古いエントリから削除し、上限の `EVICT_TARGET_RATIO` 倍まで減らします。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        entries, total = self._scan()
+        target = self.max_bytes * EVICT_TARGET_RATIO
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # ほかのプロセスが先に削除した場合も含め、合計からは除く
+                pass
+            total -= size
+        self._size = total
+
+def render_samples(get_page, filepath, page_num, scale, clip=None, gray=False, cache=None):
+    """キャッシュを確認してからページをレンダリングし、サンプルデータを返します。
+
+    Args:
+        get_page (Callable[[], fitz.Page]): レンダリングするページを返す関数。
+            キャッシュにあった場合は呼び出されません。
+        filepath (str): PDFファイルのパス (キャッシュのキーに使います)。
+        page_num (int): ページ番号 (0-indexed)。
+        scale (float): レンダリング倍率。
+        clip (Sequence[float] | None, optional): レンダリングする範囲 (ページ座標)。
+            Noneの場合はページ全体。
+        gray (bool, optional): Trueの場合はグレースケールでレンダリングします。
+        cache (RenderCache, optional): 利用するキャッシュ。Noneの場合は常にレンダリングします。
+
+    Returns:
+        tuple[int, int, int, int, int, bytes]: ページ全体を描画した場合の画像上での
+            左上のx座標とy座標、幅、高さ、1行あたりのバイト数、サンプルデータ。
+    """
+    import fitz
+
+    key = None
+    if cache is not None:
+        key = cache.key(filepath, page_num, scale, clip, gray)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    colorspace = fitz.csGRAY if gray else fitz.csRGB
+    pix = get_page().get_pixmap(matrix=fitz.Matrix(scale, scale), clip=clip, colorspace=colorspace, alpha=False)
+    rendered = (pix.x, pix.y, pix.width, pix.height, pix.stride, pix.samples)
+    if cache is not None:
+        cache.put(key, rendered)
+    return rendered
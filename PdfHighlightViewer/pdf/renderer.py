@@ -1,26 +1,109 @@
-"""PDFページのレンダリング機能を提供します。"""
+"""PDFページのレンダリング機能を提供します。
 
-import fitz
-from PIL import Image, ImageTk
+PyMuPDFとPillowは読み込みに時間がかかるため、アプリケーションの起動時には
+読み込まず、最初にページをレンダリングする時点で読み込みます。
+"""
 
-def render_page_to_image(page, scale=1.0):
-    """fitz.PageオブジェクトをTkinterで表示可能なPhotoImageに変換します。
+def render_pixmap(page, scale=1.0, clip=None, gray=False):
+    """fitz.Pageオブジェクトを指定倍率のRGB Pixmapにレンダリングします。
 
     Args:
         page (fitz.Page): レンダリング対象のページ。
         scale (float, optional): 表示倍率。デフォルトは1.0。
+        clip (fitz.Rect, optional): レンダリングする範囲 (ページ座標)。
+            省略時はページ全体。Pixmapの `x`, `y` には、ページ全体を
+            レンダリングした場合の画像上での左上の位置が入ります。
+        gray (bool, optional): Trueの場合はグレースケールでレンダリングします。
 
     Returns:
-        (Image.Image, ImageTk.PhotoImage): PillowイメージとTkinterイメージのタプル。
-            Pillowイメージは後続の処理で、Tkinterイメージは表示に利用できます。
+        fitz.Pixmap: アルファチャンネルを持たないRGB (またはグレースケール) のPixmap。
     """
-    # 指定された倍率でレンダリングするためのMatrixを作成
+    import fitz
+
     matrix = fitz.Matrix(scale, scale)
-    pix = page.get_pixmap(matrix=matrix)
-    
-    # PyMuPDFのPixmapオブジェクトからPillowのImageオブジェクトを作成
-    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-    
-    # PillowのImageオブジェクトをTkinterのPhotoImageオブジェクトに変換
-    photo = ImageTk.PhotoImage(img)
-    return img, photo
+    colorspace = fitz.csGRAY if gray else fitz.csRGB
+    return page.get_pixmap(matrix=matrix, clip=clip, colorspace=colorspace, alpha=False)
+
+def pixmap_to_image(pix):
+    """PixmapのサンプルをコピーせずにPillowイメージとして参照します。
+
+    `pix.samples` はアクセスのたびに bytes へのコピーを作るため、
+    メモリビュー (`samples_mv`) を `Image.frombuffer` に直接渡します。
+
+    Note:
+        戻り値のイメージはPixmapのバッファを共有します。
+        イメージを使い終わるまでPixmapを破棄しないでください。
+
+    Args:
+        pix (fitz.Pixmap): アルファチャンネルを持たないRGBまたはグレースケールのPixmap。
+
+    Returns:
+        Image.Image: Pixmapのバッファを共有するPillowイメージ。
+    """
+    from PIL import Image
+
+    mode = "L" if pix.n == 1 else "RGB"
+    return Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, "raw", mode, pix.stride, 1)
+
+def samples_to_photo(width, height, stride, samples, photo=None):
+    """RGBのサンプルデータをTkinterで表示可能なPhotoImageに変換します。
+
+    同じサイズの `photo` が渡された場合は、新しいPhotoImageを作らずに
+    その内容を書き換えます。
+
+    Args:
+        width (int): 画像の幅。
+        height (int): 画像の高さ。
+        stride (int): 1行あたりのバイト数。
+        samples (bytes | memoryview): RGBのサンプルデータ。
+        photo (ImageTk.PhotoImage, optional): 再利用するPhotoImage。
+            サイズが一致しない場合は無視されます。
+
+    Returns:
+        ImageTk.PhotoImage: 画像の内容を保持するPhotoImage。
+    """
+    from PIL import Image, ImageTk
+
+    img = Image.frombuffer("RGB", (width, height), samples, "raw", "RGB", stride, 1)
+    if photo is not None and photo.width() == width and photo.height() == height:
+        photo.paste(img)
+        return photo
+    return ImageTk.PhotoImage(img)
+
+def render_page_to_photo(page, scale=1.0, photo=None):
+    """fitz.PageオブジェクトをTkinterで表示可能なPhotoImageに変換します。
+
+    PPMへのエンコードとTkによる再パースを経由せず、Pixmapのバッファを
+    Pillow経由でPhotoImageへ直接転送します。同じサイズの `photo` が
+    渡された場合は、新しいPhotoImageを作らずにその内容を書き換えます。
+
+    Args:
+        page (fitz.Page): レンダリング対象のページ。
+        scale (float, optional): 表示倍率。デフォルトは1.0。
+        photo (ImageTk.PhotoImage, optional): 再利用するPhotoImage。
+            サイズが一致しない場合は無視されます。
+
+    Returns:
+        ImageTk.PhotoImage: ページの内容を保持するPhotoImage。
+    """
+    pix = render_pixmap(page, scale)
+    return samples_to_photo(pix.width, pix.height, pix.stride, pix.samples_mv, photo=photo)
+
+def scale_photo(photo, width, height):
+    """PhotoImageを指定サイズに拡大縮小した仮表示用のPhotoImageを作成します。
+
+    再レンダリングが終わるまでの間に表示するためのものなので、
+    画質よりも速度を優先して最近傍補間を使います。
+
+    Args:
+        photo (ImageTk.PhotoImage): 元のPhotoImage。
+        width (int): 変換後の幅。
+        height (int): 変換後の高さ。
+
+    Returns:
+        ImageTk.PhotoImage: 拡大縮小されたPhotoImage。
+    """
+    from PIL import Image, ImageTk
+
+    img = ImageTk.getimage(photo)
+    return ImageTk.PhotoImage(img.resize((max(1, width), max(1, height)), Image.NEAREST))
@@ -0,0 +1,181 @@
+"""UIで開いているPDFドキュメントを管理するセッションを提供します。
+
+`DocumentSessionManager` は同時に1つのドキュメントだけを開いたままにし、
+別のファイルを開くときやアプリケーションの終了時に、前のドキュメントを
+確実に閉じます。同じファイルを開き直す場合は、ファイルの内容のハッシュ値が
+変わっていなければ開いているドキュメントをそのまま使います。
+
+設定した大きさ以下のファイルは、一度に読み込んだ内容からメモリ上で開きます。
+ネットワークドライブ上のファイルでも、ページの解析やレンダリングのたびに
+ファイルを少しずつ読みに行くことがなくなります。PyMuPDFはアプリケーションの
+起動を遅くしないよう、最初にファイルを開く時点で読み込みます。
+"""
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .hashing import data_hash, file_hash
+
+class DocumentSession:
+    """開いている1つのドキュメントと、その元のファイルの状態。"""
+
+    def __init__(self, filepath, doc, stat_key, in_memory, hash_future):
+        """DocumentSessionオブジェクトを初期化します。
+
+        Args:
+            filepath (str): PDFファイルの絶対パス。
+            doc (fitz.Document): 開いたドキュメント。
+            stat_key (tuple[int, int]): 開いた時点のファイルの更新日時 (ns) と大きさ。
+            in_memory (bool): ファイルの内容をメモリに読み込んで開いた場合はTrue。
+            hash_future (Future[str]): ファイルの内容のハッシュ値の計算結果。
+        """
+        self.filepath = filepath
+        self.doc = doc
+        self.stat_key = stat_key
+        self.in_memory = in_memory
+        self.hash_future = hash_future
+
+    @property
+    def doc_hash(self):
+        """ファイルの内容のハッシュ値を返します (計算中の場合は完了を待ちます)。"""
+        return self.hash_future.result()
+
+class DocumentSessionManager:
+    """UIで開いているドキュメントのセッションを管理するクラス。
+
+    ファイルの内容のハッシュ値は、UIを止めないようバックグラウンドのスレッドで
+    計算します。計算結果はサムネイルのキャッシュなどでも使えます。
+    ページごとのハッシュ値はPyMuPDFを使うため、ワーカープロセスで計算します。
+    """
+
+    def __init__(self):
+        """DocumentSessionManagerオブジェクトを初期化します。"""
+        self.session = None
+        self._hash_executor = None
+        self._page_hash_executor = None
+
+    @property
+    def doc(self):
+        """開いているドキュメントを返します。開いていない場合はNone。"""
+        return self.session.doc if self.session is not None else None
+
+    @property
+    def filepath(self):
+        """開いているドキュメントのファイルのパスを返します。開いていない場合はNone。"""
+        return self.session.filepath if self.session is not None else None
+
+    def open(self, filepath, in_memory_max_bytes=0, known_hash=None):
+        """ファイルを開き、そのセッションを返します。
+
+        開いているファイルと同じファイルで、内容のハッシュ値が変わっていない
+        場合は、開いているドキュメントを再利用します (更新日時と大きさが
+        変わっていなければハッシュ値も計算しません)。それ以外の場合は、
+        開いているドキュメントを閉じてから開きます。開いているドキュメントの
+        ハッシュ値の計算が終わっていない場合は、待たずに内容が変わったものとして
+        扱います。
+
+        Args:
+            filepath (str): PDFファイルのパス。
+            in_memory_max_bytes (int, optional): この大きさ以下のファイルは、
+                内容をメモリに読み込んで開きます。0の場合は常にファイルから開きます。
+            known_hash (tuple[tuple[int, int], str], optional): ワーカープロセスなどで
+                計算済みのファイルの更新日時 (ns) と大きさ、内容のハッシュ値。
+                ファイルの状態が一致する場合は、ハッシュ値を計算し直さずにこの値を使います。
+
+        Returns:
+            DocumentSession: 開いたドキュメントのセッション。
+
+        Raises:
+            OSError: ファイルを読み込めない場合。
+            RuntimeError: PyMuPDFがファイルを開けない場合。
+        """
+        import fitz
+
+        filepath = os.path.abspath(filepath)
+        stat = os.stat(filepath)
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        in_memory = 0 < stat.st_size <= in_memory_max_bytes
+
+        doc_hash = known_hash[1] if known_hash is not None and known_hash[0] == stat_key else None
+        data = None
+        session = self.session
+        if (session is not None and session.filepath == filepath and session.in_memory == in_memory
+                and not session.doc.is_closed):
+            if session.stat_key == stat_key:
+                return session
+            if session.hash_future.done():
+                if doc_hash is None:
+                    if in_memory:
+                        data = _read_file(filepath)
+                        doc_hash = data_hash(data)
+                    else:
+                        doc_hash = file_hash(filepath)
+                if doc_hash == session.doc_hash:
+                    session.stat_key = stat_key
+                    return session
+
+        self.close()
+        if in_memory:
+            if data is None:
+                data = _read_file(filepath)
+            # 名前は拡張子からファイルの種類を判定するためだけに使われる
+            doc = fitz.open(filepath, stream=data)
+        else:
+            doc = fitz.open(filepath)
+        if doc_hash is not None:
+            hash_future = Future()
+            hash_future.set_result(doc_hash)
+        else:
+            if self._hash_executor is None:
+                self._hash_executor = ThreadPoolExecutor(max_workers=1)
+            if in_memory:
+                hash_future = self._hash_executor.submit(data_hash, data)
+            else:
+                hash_future = self._hash_executor.submit(file_hash, filepath)
+        self.session = DocumentSession(filepath, doc, stat_key, in_memory, hash_future)
+        return self.session
+
+    def submit_page_hashes(self, filepath):
+        """ファイルの各ページのハッシュ値の計算をワーカープロセスで開始します。
+
+        開いているドキュメントは使わずにファイルを開き直すため、ファイルが
+        更新された後、開き直す前に新しい内容のハッシュ値を求められます。
+
+        Args:
+            filepath (str): PDFファイルのパス。
+
+        Returns:
+            Future[tuple[tuple[int, int], str, list[str]] | None]:
+                `workers.document_page_hashes` の計算結果。
+        """
+        from . import workers
+
+        if self._page_hash_executor is None:
+            self._page_hash_executor = ProcessPoolExecutor(max_workers=1)
+        return self._page_hash_executor.submit(workers.document_page_hashes, filepath)
+
+    def close(self):
+        """開いているドキュメントを閉じます。"""
+        session = self.session
+        self.session = None
+        if session is not None and not session.doc.is_closed:
+            session.doc.close()
+
+    def shutdown(self):
+        """開いているドキュメントを閉じ、ハッシュ値の計算用のスレッドとプロセスを終了します。"""
+        self.close()
+        if self._hash_executor is not None:
+            self._hash_executor.shutdown(wait=False, cancel_futures=True)
+            self._hash_executor = None
+        if self._page_hash_executor is not None:
+            self._page_hash_executor.shutdown(wait=False, cancel_futures=True)
+            self._page_hash_executor = None
+
+def _read_file(filepath):
+    """ファイルの内容をすべて読み込みます。
+
+    Note:
+        この関数は内部利用を想定しています。
+    """
+    with open(filepath, "rb") as f:
+        return f.read()
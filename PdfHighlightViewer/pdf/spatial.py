@@ -0,0 +1,87 @@
+"""矩形の空間検索のための、一様グリッドによるインデックスを提供します。"""
+
+from collections import defaultdict
+
+class GridIndex:
+    """ページ座標を一定サイズのセルに分割し、矩形を検索するインデックス。
+
+    各矩形は重なるすべてのセルに登録されるため、点や矩形による検索では
+    周辺のセルに登録された矩形だけを調べれば済みます。
+    """
+
+    def __init__(self, cell_size=32.0):
+        """GridIndexオブジェクトを初期化します。
+
+        Args:
+            cell_size (float, optional): セルの一辺の長さ (ポイント)。
+        """
+        self.cell_size = cell_size
+        self._entries = []
+        self._cells = defaultdict(list)
+
+    def __len__(self):
+        """登録されている矩形の数を返します。"""
+        return len(self._entries)
+
+    def insert(self, bbox, value):
+        """矩形と、それに対応する値を登録します。
+
+        Args:
+            bbox (fitz.Rect | tuple[float, float, float, float]): 矩形の座標。
+            value (Any): 検索結果として返す値。
+        """
+        x0, y0, x1, y1 = bbox
+        entry_id = len(self._entries)
+        self._entries.append((x0, y0, x1, y1, value))
+        for cell in self._cells_for(x0, y0, x1, y1):
+            self._cells[cell].append(entry_id)
+
+    def query_point(self, x, y):
+        """指定された点を含む矩形の値を返します。
+
+        Args:
+            x (float): x座標。
+            y (float): y座標。
+
+        Returns:
+            list: 点を含む矩形の値のリスト。面積の小さい矩形から順に並びます。
+        """
+        cell = (int(x // self.cell_size), int(y // self.cell_size))
+        hits = []
+        for entry_id in self._cells.get(cell, ()):
+            x0, y0, x1, y1, value = self._entries[entry_id]
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                hits.append(((x1 - x0) * (y1 - y0), entry_id, value))
+        hits.sort(key=lambda h: (h[0], h[1]))
+        return [value for _, _, value in hits]
+
+    def query_rect(self, bbox):
+        """指定された矩形と重なる矩形の値を、登録順に返します。
+
+        Args:
+            bbox (fitz.Rect | tuple[float, float, float, float]): 検索範囲。
+
+        Returns:
+            list: 範囲と重なる矩形の値のリスト。
+        """
+        qx0, qy0, qx1, qy1 = bbox
+        found = set()
+        for cell in self._cells_for(qx0, qy0, qx1, qy1):
+            for entry_id in self._cells.get(cell, ()):
+                if entry_id in found:
+                    continue
+                x0, y0, x1, y1, _ = self._entries[entry_id]
+                if x0 < qx1 and qx0 < x1 and y0 < qy1 and qy0 < y1:
+                    found.add(entry_id)
+        return [self._entries[entry_id][4] for entry_id in sorted(found)]
+
+    def _cells_for(self, x0, y0, x1, y1):
+        """矩形と重なるセルの座標を列挙します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        size = self.cell_size
+        for cx in range(int(x0 // size), int(x1 // size) + 1):
+            for cy in range(int(y0 // size), int(y1 // size) + 1):
+                yield (cx, cy)
@@ -0,0 +1,114 @@
+"""矩形内の文字列を、ページのテキストを解析し直さずに取り出すためのインデックスを提供します。
+
+`page.get_text("text", clip=rect)` は呼び出すたびにページ全体のテキスト構造を
+作り直すため、文字の多いページで該当箇所が多いと処理時間が大きく増えます。
+ここではページごとに `rawdict` を1回だけ解析して行単位の空間インデックスを作り、
+各矩形の文字列はそのインデックスから求めます。
+"""
+
+from .spatial import GridIndex
+
+class PageTextIndex:
+    """1ページ分の文字を行ごとに保持し、矩形内の文字列を返すインデックス。
+
+    文字の中心が矩形内にある文字を、ページ上の読み順に並べて返します。
+    行ごとに改行で区切られるため、該当箇所の全体を覆う矩形については
+    `page.get_text("text", clip=rect).strip()` と同じ文字列になります。
+    """
+
+    def __init__(self, page_dict):
+        """PageTextIndexオブジェクトを初期化します。
+
+        Args:
+            page_dict (dict): `page.get_text("rawdict")` の戻り値。
+        """
+        self._index = GridIndex()
+        for block in page_dict.get("blocks", []):
+            for line in block.get("lines", []):
+                chars = []
+                for span in line.get("spans", []):
+                    for char in span.get("chars", []):
+                        x0, y0, x1, y1 = char["bbox"]
+                        chars.append(((x0 + x1) / 2, (y0 + y1) / 2, char["c"]))
+                if chars:
+                    self._index.insert(line["bbox"], chars)
+
+    @classmethod
+    def from_page(cls, page):
+        """ページのテキストを解析してインデックスを作成します。
+
+        Args:
+            page (fitz.Page): 対象のページ。
+
+        Returns:
+            PageTextIndex: 作成されたインデックス。
+        """
+        return cls(page.get_text("rawdict"))
+
+    def text_in(self, rect):
+        """矩形内の文字列を返します。
+
+        Args:
+            rect (fitz.Rect | tuple[float, float, float, float]): ページ座標での範囲。
+
+        Returns:
+            str: 行ごとに改行で区切った文字列。前後の空白は取り除かれます。
+        """
+        x0, y0, x1, y1 = rect
+        lines = []
+        for chars in self._index.query_rect(rect):
+            text = "".join(c for cx, cy, c in chars if x0 <= cx <= x1 and y0 <= cy <= y1)
+            if text:
+                lines.append(text)
+        return "\n".join(lines).strip()
+
+class DocumentTextIndex:
+    """ドキュメントのページごとの `PageTextIndex` を、必要になった時点で作成して保持するクラス。"""
+
+    def __init__(self, doc):
+        """DocumentTextIndexオブジェクトを初期化します。
+
+        Args:
+            doc (fitz.Document): 対象のドキュメント。
+        """
+        self.doc = doc
+        self._pages = {}
+
+    def add_page(self, page_num, page_dict):
+        """解析済みの `rawdict` からページのインデックスを登録します。
+
+        抽出処理などで既に `rawdict` を取得している場合に、同じページを
+        解析し直さずに済むようにするためのものです。
+
+        Args:
+            page_num (int): ページ番号 (0-indexed)。
+            page_dict (dict): `page.get_text("rawdict")` の戻り値。
+        """
+        if page_num not in self._pages:
+            self._pages[page_num] = PageTextIndex(page_dict)
+
+    def page(self, page_num):
+        """ページのインデックスを返します。未作成の場合は作成します。
+
+        Args:
+            page_num (int): ページ番号 (0-indexed)。
+
+        Returns:
+            PageTextIndex: ページのインデックス。
+        """
+        index = self._pages.get(page_num)
+        if index is None:
+            index = self._pages[page_num] = PageTextIndex.from_page(self.doc[page_num])
+        return index
+
+    def text_in(self, page_num, rect):
+        """ページ上の矩形内の文字列を返します。
+
+        Args:
+            page_num (int): ページ番号 (0-indexed)。
+            rect (fitz.Rect | tuple[float, float, float, float]): ページ座標での範囲。
+
+        Returns:
+            str: 矩形内の文字列。
+        """
+        return self.page(page_num).text_in(rect)
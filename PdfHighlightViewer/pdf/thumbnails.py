@@ -0,0 +1,179 @@
+"""ページサムネイルのバックグラウンド生成とディスクキャッシュを提供します。"""
+
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .hashing import file_hash
+
+# サムネイルのレンダリング倍率 (72dpi基準で18dpi相当)
+THUMBNAIL_SCALE = 0.25
+
+# 1つのタスクでレンダリングするページ数
+PAGES_PER_TASK = 8
+
+class ThumbnailCache:
+    """ドキュメントのハッシュ値をキーとしたサムネイルのディスクキャッシュ。
+
+    1つのドキュメントのサムネイルは、無圧縮のZIPファイル1つにまとめて
+    保存されます (PNG自体が圧縮済みのため)。
+    """
+
+    def __init__(self, cache_dir):
+        """ThumbnailCacheオブジェクトを初期化します。
+
+        Args:
+            cache_dir (str): キャッシュファイルを保存するディレクトリ。
+        """
+        self.cache_dir = cache_dir
+
+    def _path(self, doc_hash):
+        """キャッシュファイルのパスを返します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        return os.path.join(self.cache_dir, f"{doc_hash}-{int(THUMBNAIL_SCALE * 100)}.zip")
+
+    def load(self, doc_hash):
+        """キャッシュからサムネイルを読み込みます。
+
+        Args:
+            doc_hash (str): ドキュメントのハッシュ値。
+
+        Returns:
+            dict[int, bytes] | None: ページ番号とPNGデータの辞書。
+                キャッシュが存在しない場合はNone。
+        """
+        path = self._path(doc_hash)
+        if not os.path.exists(path):
+            return None
+        try:
+            with zipfile.ZipFile(path) as zf:
+                return {int(os.path.splitext(name)[0]): zf.read(name) for name in zf.namelist()}
+        except (OSError, ValueError, zipfile.BadZipFile):
+            return None
+
+    def save(self, doc_hash, thumbnails):
+        """サムネイルをキャッシュに保存します。
+
+        書き込み途中のファイルが読まれないよう、一時ファイルに書き込んでから
+        置き換えます。
+
+        Args:
+            doc_hash (str): ドキュメントのハッシュ値。
+            thumbnails (dict[int, bytes]): ページ番号とPNGデータの辞書。
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(doc_hash)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED) as zf:
+            for page_num, png in sorted(thumbnails.items()):
+                zf.writestr(f"{page_num}.png", png)
+        os.replace(tmp_path, path)
+
+class ThumbnailBuilder:
+    """ドキュメントのサムネイルをバックグラウンドで生成するクラス。
+
+    ハッシュ値の計算はスレッドで、レンダリングはプロセスプールで行います。
+    呼び出し側 (Tkのイベントループ) は `poll` を定期的に呼び出して、
+    完成したサムネイルを受け取ります。どのメソッドもブロックしません。
+    """
+
+    def __init__(self, filepath, page_count, cache, max_workers=None, hash_future=None):
+        """ThumbnailBuilderオブジェクトを初期化します。
+
+        Args:
+            filepath (str): PDFファイルのパス。
+            page_count (int): ドキュメントのページ数。
+            cache (ThumbnailCache): 利用するキャッシュ。
+            max_workers (int, optional): ワーカープロセス数。
+                省略時はCPU数 (最大4) になります。
+            hash_future (Future[str], optional): 計算済み (または計算中) の
+                ファイルのハッシュ値。省略時は `start` で計算を開始します。
+        """
+        self.filepath = filepath
+        self.page_count = page_count
+        self.cache = cache
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.thumbnails = {}
+        self.done = False
+        self._doc_hash = None
+        self._hash_executor = None
+        self._hash_future = hash_future
+        self._pool = None
+        self._futures = []
+
+    def start(self):
+        """ハッシュ値の計算を開始します。"""
+        if self._hash_future is not None:
+            return
+        self._hash_executor = ThreadPoolExecutor(max_workers=1)
+        self._hash_future = self._hash_executor.submit(file_hash, self.filepath)
+
+    def poll(self):
+        """前回の呼び出し以降に完成したサムネイルを返します。
+
+        キャッシュが存在した場合は、最初に完成した時点ですべてのページが
+        返されます。
+
+        Returns:
+            list[tuple[int, bytes]]: ページ番号とPNGデータのタプルのリスト。
+        """
+        if self.done:
+            return []
+        if self._doc_hash is None:
+            if not self._hash_future.done():
+                return []
+            if self._hash_executor is not None:
+                self._hash_executor.shutdown(wait=False)
+            self._doc_hash = self._hash_future.result()
+            cached = self.cache.load(self._doc_hash)
+            if cached is not None and len(cached) == self.page_count:
+                self.thumbnails = cached
+                self.done = True
+                return sorted(cached.items())
+            self._submit_render_tasks()
+
+        completed = []
+        pending = []
+        for future in self._futures:
+            if future.done():
+                completed.extend(future.result())
+            else:
+                pending.append(future)
+        self._futures = pending
+        self.thumbnails.update(completed)
+
+        if not pending:
+            self.done = True
+            self._pool.shutdown(wait=False)
+            try:
+                self.cache.save(self._doc_hash, self.thumbnails)
+            except OSError:
+                # キャッシュに保存できなくても、サムネイルの表示には影響しない
+                pass
+        return completed
+
+    def cancel(self):
+        """未完了のサムネイル生成をキャンセルします。"""
+        self.done = True
+        if self._hash_executor is not None:
+            self._hash_executor.shutdown(wait=False, cancel_futures=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_render_tasks(self):
+        """ページを一定数ずつまとめて、レンダリングタスクを投入します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        # PyMuPDFを読み込むため、起動時ではなくここで読み込む
+        from . import workers
+
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        for start in range(0, self.page_count, PAGES_PER_TASK):
+            page_nums = list(range(start, min(start + PAGES_PER_TASK, self.page_count)))
+            self._futures.append(
+                self._pool.submit(workers.render_thumbnails, self.filepath, page_nums, THUMBNAIL_SCALE))
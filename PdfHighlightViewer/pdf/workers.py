@@ -0,0 +1,151 @@
+"""ワーカープロセスで実行されるPDF処理を提供します。
+
+PyMuPDFはスレッドからの並行利用に対応していないため、重いレンダリング処理は
+プロセスプールで実行します。ここに置く関数は `ProcessPoolExecutor` から
+呼び出されるため、モジュールのトップレベルに定義し、引数と戻り値は
+pickle可能な値に限ります。
+"""
+
+import os
+import fitz
+
+from . import raster, render_cache
+from .hashing import file_hash, page_hash
+
+# ワーカープロセスごとに開いたままにしておくドキュメント
+_documents = {}
+
+def _open_document(filepath):
+    """ワーカープロセス内でドキュメントを開き、以降の呼び出しで再利用します。
+
+    ファイルが更新された場合は開き直します。
+
+    Note:
+        この関数は内部利用を想定しています。
+
+    Args:
+        filepath (str): PDFファイルのパス。
+
+    Returns:
+        fitz.Document: 開かれたドキュメント。
+    """
+    stat = os.stat(filepath)
+    key = (filepath, stat.st_mtime_ns, stat.st_size)
+    doc = _documents.get(key)
+    if doc is None:
+        for old_doc in _documents.values():
+            old_doc.close()
+        _documents.clear()
+        doc = fitz.open(filepath)
+        _documents[key] = doc
+    return doc
+
+def open_document(filepath):
+    """ワーカープロセスで事前にドキュメントを開いておきます。
+
+    最初のレンダリング要求の待ち時間を短くするために使います。
+
+    Args:
+        filepath (str): PDFファイルのパス。
+
+    Returns:
+        int: ドキュメントのページ数。
+    """
+    return _open_document(filepath).page_count
+
+def render_page_samples(filepath, page_num, scale, cache=None):
+    """ページをレンダリングし、RGBのサンプルデータを返します。
+
+    Args:
+        filepath (str): PDFファイルのパス。
+        page_num (int): ページ番号 (0-indexed)。
+        scale (float): レンダリング倍率。
+        cache (RenderCache, optional): 利用するレンダリングキャッシュ。
+
+    Returns:
+        tuple[int, int, int, bytes]: 幅、高さ、1行あたりのバイト数、サンプルデータ。
+    """
+    return render_region_samples(filepath, page_num, scale, None, cache=cache)[2:]
+
+def render_region_samples(filepath, page_num, scale, clip, gray=False, cache=None):
+    """ページの一部の範囲をレンダリングし、RGBのサンプルデータを返します。
+
+    Args:
+        filepath (str): PDFファイルのパス。
+        page_num (int): ページ番号 (0-indexed)。
+        scale (float): レンダリング倍率。
+        clip (tuple[float, float, float, float] | None): レンダリングする範囲
+            (ページ座標)。Noneの場合はページ全体。
+        gray (bool, optional): Trueの場合はグレースケールのサンプルデータを返します。
+        cache (RenderCache, optional): 利用するレンダリングキャッシュ。
+
+    Returns:
+        tuple[int, int, int, int, int, bytes]: ページ全体を描画した場合の画像上での
+            左上のx座標とy座標、幅、高さ、1行あたりのバイト数、サンプルデータ。
+    """
+    return render_cache.render_samples(
+        lambda: _open_document(filepath)[page_num], filepath, page_num, scale, clip, gray, cache)
+
+def render_thumbnails(filepath, page_nums, scale):
+    """指定されたページをサムネイルとしてレンダリングします。
+
+    Args:
+        filepath (str): PDFファイルのパス。
+        page_nums (list[int]): レンダリングするページ番号 (0-indexed) のリスト。
+        scale (float): レンダリング倍率。
+
+    Returns:
+        list[tuple[int, bytes]]: ページ番号とPNGデータのタプルのリスト。
+    """
+    doc = _open_document(filepath)
+    matrix = fitz.Matrix(scale, scale)
+    results = []
+    for page_num in page_nums:
+        pix = doc[page_num].get_pixmap(matrix=matrix, alpha=False)
+        results.append((page_num, pix.tobytes("png")))
+    return results
+
+def detect_raster_regions(filepath, page_nums, ranges, dpi):
+    """指定されたページの画像から、色範囲に一致する領域を検出します。
+
+    Args:
+        filepath (str): PDFファイルのパス。
+        page_nums (list[int]): 処理するページ番号 (0-indexed) のリスト。
+        ranges (list[ColorRange]): 検出する色範囲のリスト。
+        dpi (int): 検出に使うレンダリング解像度。
+
+    Returns:
+        list[tuple[int, tuple[float, float, float, float], str]]: ページ番号、
+            領域の座標、色範囲の名前のタプルのリスト。
+    """
+    doc = _open_document(filepath)
+    return [(page_num, tuple(rect), name)
+            for page_num in page_nums for rect, name in raster.detect_page(doc[page_num], ranges, dpi)]
+
+def document_page_hashes(filepath):
+    """ドキュメントの各ページの描画内容と、ファイル全体の内容のハッシュ値を計算します。
+
+    ファイル全体のハッシュ値も求めておくことで、開き直すときにUIのスレッドで
+    ファイルを読み直して計算せずに済みます。計算中にファイルが更新された場合は、
+    更新前と更新後の内容が混ざった値になるため結果を返しません。
+
+    Args:
+        filepath (str): PDFファイルのパス。
+
+    Returns:
+        tuple[tuple[int, int], str, list[str]] | None: 計算したファイルの更新日時 (ns)
+            と大きさ、ファイル全体のハッシュ値、各ページのハッシュ値。計算中に
+            ファイルが更新された場合はNone。
+    """
+    stat = os.stat(filepath)
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+    doc = fitz.open(filepath)
+    try:
+        page_hashes = [page_hash(page) for page in doc]
+    finally:
+        doc.close()
+    doc_hash = file_hash(filepath)
+    stat = os.stat(filepath)
+    if (stat.st_mtime_ns, stat.st_size) != stat_key:
+        return None
+    return stat_key, doc_hash, page_hashes
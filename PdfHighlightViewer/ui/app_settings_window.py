@@ -2,7 +2,11 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 
 from ..config.settings import Settings
-from ..export.formats import ExportFormat, PdfExportMode
+from ..export.encoding import IMAGE_ENCODER_PRESETS
+from ..export.formats import (
+    ExcelImageFormat, ExcelSplitMode, ExportFormat, ImageArchiveMode, ImageColorMode, ImageEncodeFormat,
+    ImageEncoderPreset, ImageExportMode, PdfExportMode, PdfSavePreset,
+)
 
 class AppSettingsWindow(tk.Toplevel):
     """アプリケーション全体の設定ウィンドウを表示、管理するクラス。"""
@@ -17,7 +21,7 @@ class AppSettingsWindow(tk.Toplevel):
         self.parent = parent
         self.settings = settings
         self.title("アプリケーション設定")
-        self.geometry("450x500") # 高さをさらに増やす
+        self.geometry("450x1065") # 高さをさらに増やす
         self.transient(parent)
         self.grab_set()
 
@@ -33,6 +37,21 @@ class AppSettingsWindow(tk.Toplevel):
         self.excel_image_scale_var = tk.DoubleVar(value=self.settings.excel_image_scale)
         self.image_export_border_width_var = tk.IntVar(value=self.settings.image_export_border_width)
         self.pdf_export_border_width_var = tk.DoubleVar(value=self.settings.pdf_export_border_width)
+        self.pdf_save_preset_var = tk.StringVar(value=self.settings.pdf_save_preset)
+        self.image_export_mode_var = tk.StringVar(value=self.settings.image_export_mode)
+        self.image_export_margin_var = tk.DoubleVar(value=self.settings.image_export_margin)
+        self.excel_image_format_var = tk.StringVar(value=self.settings.excel_image_format)
+        self.excel_jpeg_quality_var = tk.IntVar(value=self.settings.excel_jpeg_quality)
+        self.excel_rows_per_part_var = tk.IntVar(value=self.settings.excel_rows_per_part)
+        self.excel_split_mode_var = tk.StringVar(value=self.settings.excel_split_mode)
+        self.image_encode_format_var = tk.StringVar(value=self.settings.image_encode_format)
+        self.png_compress_level_var = tk.IntVar(value=self.settings.png_compress_level)
+        self.image_quality_var = tk.IntVar(value=self.settings.image_quality)
+        self.image_color_mode_var = tk.StringVar(value=self.settings.image_color_mode)
+        self.image_export_dpi_var = tk.IntVar(value=self.settings.image_export_dpi)
+        self.image_archive_mode_var = tk.StringVar(value=self.settings.image_archive_mode)
+        self.image_archive_manifest_var = tk.BooleanVar(value=self.settings.image_archive_manifest)
+        self.incremental_image_export_var = tk.BooleanVar(value=self.settings.incremental_image_export)
 
         self.setup_ui()
 
@@ -64,10 +83,18 @@ class AppSettingsWindow(tk.Toplevel):
         mode_frame.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
         ttk.Radiobutton(mode_frame, text="1ページずつ", variable=self.pdf_export_mode_var, value=PdfExportMode.ONE_PAGE.value).pack(side=tk.LEFT, pady=2)
         ttk.Radiobutton(mode_frame, text="ページ統合", variable=self.pdf_export_mode_var, value=PdfExportMode.MERGE.value).pack(side=tk.LEFT, padx=10, pady=2)
+        ttk.Radiobutton(mode_frame, text="注釈付きコピー", variable=self.pdf_export_mode_var, value=PdfExportMode.ANNOTATED_COPY.value).pack(side=tk.LEFT, pady=2)
 
         ttk.Label(pdf_export_frame, text="PDFエクスポート枠線太さ:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
         ttk.Spinbox(pdf_export_frame, from_=0.5, to_=5.0, increment=0.1, textvariable=self.pdf_export_border_width_var, width=5, format="%.1f").grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
 
+        ttk.Label(pdf_export_frame, text="保存方法:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
+        preset_frame = ttk.Frame(pdf_export_frame)
+        preset_frame.grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Radiobutton(preset_frame, text="速度優先", variable=self.pdf_save_preset_var, value=PdfSavePreset.FAST.value).pack(side=tk.LEFT, pady=2)
+        ttk.Radiobutton(preset_frame, text="標準", variable=self.pdf_save_preset_var, value=PdfSavePreset.BALANCED.value).pack(side=tk.LEFT, padx=10, pady=2)
+        ttk.Radiobutton(preset_frame, text="サイズ優先", variable=self.pdf_save_preset_var, value=PdfSavePreset.SMALL.value).pack(side=tk.LEFT, pady=2)
+
         # --- 画像/Excelエクスポート設定 ---
         img_excel_export_frame = ttk.LabelFrame(export_frame, text="画像/Excelエクスポート")
         img_excel_export_frame.pack(pady=5, padx=5, fill=tk.X)
@@ -78,6 +105,77 @@ class AppSettingsWindow(tk.Toplevel):
         ttk.Label(img_excel_export_frame, text="画像/Excel枠線太さ:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
         ttk.Spinbox(img_excel_export_frame, from_=1, to_=10, textvariable=self.image_export_border_width_var, width=5).grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
 
+        ttk.Label(img_excel_export_frame, text="出力範囲:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
+        range_frame = ttk.Frame(img_excel_export_frame)
+        range_frame.grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Radiobutton(range_frame, text="ページ全体", variable=self.image_export_mode_var, value=ImageExportMode.PAGE.value).pack(side=tk.LEFT, pady=2)
+        ttk.Radiobutton(range_frame, text="該当領域のみ", variable=self.image_export_mode_var, value=ImageExportMode.REGION.value).pack(side=tk.LEFT, padx=10, pady=2)
+
+        ttk.Label(img_excel_export_frame, text="領域の余白 (pt):").grid(row=3, column=0, sticky=tk.W, padx=5, pady=5)
+        ttk.Spinbox(img_excel_export_frame, from_=0, to_=200, increment=5, textvariable=self.image_export_margin_var, width=5, format="%.0f").grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(img_excel_export_frame, text="Excel画像形式:").grid(row=4, column=0, sticky=tk.W, padx=5, pady=5)
+        format_frame = ttk.Frame(img_excel_export_frame)
+        format_frame.grid(row=4, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Radiobutton(format_frame, text="PNG", variable=self.excel_image_format_var, value=ExcelImageFormat.PNG.value).pack(side=tk.LEFT, pady=2)
+        ttk.Radiobutton(format_frame, text="JPEG", variable=self.excel_image_format_var, value=ExcelImageFormat.JPEG.value).pack(side=tk.LEFT, padx=10, pady=2)
+
+        ttk.Label(img_excel_export_frame, text="JPEG品質:").grid(row=5, column=0, sticky=tk.W, padx=5, pady=5)
+        ttk.Spinbox(img_excel_export_frame, from_=10, to_=100, increment=5, textvariable=self.excel_jpeg_quality_var, width=5).grid(row=5, column=1, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(img_excel_export_frame, text="分割する行数 (0で分割なし):").grid(row=6, column=0, sticky=tk.W, padx=5, pady=5)
+        ttk.Spinbox(img_excel_export_frame, from_=0, to_=100000, increment=100, textvariable=self.excel_rows_per_part_var, width=7).grid(row=6, column=1, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(img_excel_export_frame, text="分割先:").grid(row=7, column=0, sticky=tk.W, padx=5, pady=5)
+        split_frame = ttk.Frame(img_excel_export_frame)
+        split_frame.grid(row=7, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Radiobutton(split_frame, text="シート", variable=self.excel_split_mode_var, value=ExcelSplitMode.SHEET.value).pack(side=tk.LEFT, pady=2)
+        ttk.Radiobutton(split_frame, text="ファイル", variable=self.excel_split_mode_var, value=ExcelSplitMode.WORKBOOK.value).pack(side=tk.LEFT, padx=10, pady=2)
+
+        # 画像エクスポート
+        image_export_frame = ttk.LabelFrame(export_frame, text="画像エクスポート")
+        image_export_frame.pack(pady=5, padx=5, fill=tk.X)
+
+        ttk.Label(image_export_frame, text="プリセット:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        encoder_preset_frame = ttk.Frame(image_export_frame)
+        encoder_preset_frame.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Button(encoder_preset_frame, text="高速", command=lambda: self.apply_image_encoder_preset(ImageEncoderPreset.FAST)).pack(side=tk.LEFT, pady=2)
+        ttk.Button(encoder_preset_frame, text="標準", command=lambda: self.apply_image_encoder_preset(ImageEncoderPreset.STANDARD)).pack(side=tk.LEFT, padx=5, pady=2)
+        ttk.Button(encoder_preset_frame, text="小サイズ", command=lambda: self.apply_image_encoder_preset(ImageEncoderPreset.SMALL)).pack(side=tk.LEFT, pady=2)
+
+        ttk.Label(image_export_frame, text="形式:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
+        encode_format_frame = ttk.Frame(image_export_frame)
+        encode_format_frame.grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Radiobutton(encode_format_frame, text="PNG", variable=self.image_encode_format_var, value=ImageEncodeFormat.PNG.value).pack(side=tk.LEFT, pady=2)
+        ttk.Radiobutton(encode_format_frame, text="JPEG", variable=self.image_encode_format_var, value=ImageEncodeFormat.JPEG.value).pack(side=tk.LEFT, padx=10, pady=2)
+        ttk.Radiobutton(encode_format_frame, text="WebP", variable=self.image_encode_format_var, value=ImageEncodeFormat.WEBP.value).pack(side=tk.LEFT, pady=2)
+
+        ttk.Label(image_export_frame, text="PNG圧縮レベル (0-9):").grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
+        ttk.Spinbox(image_export_frame, from_=0, to_=9, textvariable=self.png_compress_level_var, width=5).grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(image_export_frame, text="JPEG/WebP品質:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=5)
+        ttk.Spinbox(image_export_frame, from_=10, to_=100, increment=5, textvariable=self.image_quality_var, width=5).grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(image_export_frame, text="色:").grid(row=4, column=0, sticky=tk.W, padx=5, pady=5)
+        color_mode_frame = ttk.Frame(image_export_frame)
+        color_mode_frame.grid(row=4, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Radiobutton(color_mode_frame, text="カラー", variable=self.image_color_mode_var, value=ImageColorMode.RGB.value).pack(side=tk.LEFT, pady=2)
+        ttk.Radiobutton(color_mode_frame, text="グレースケール", variable=self.image_color_mode_var, value=ImageColorMode.GRAY.value).pack(side=tk.LEFT, padx=10, pady=2)
+        ttk.Radiobutton(color_mode_frame, text="減色", variable=self.image_color_mode_var, value=ImageColorMode.PALETTE.value).pack(side=tk.LEFT, pady=2)
+
+        ttk.Label(image_export_frame, text="解像度 (DPI):").grid(row=5, column=0, sticky=tk.W, padx=5, pady=5)
+        ttk.Spinbox(image_export_frame, from_=72, to_=600, increment=25, textvariable=self.image_export_dpi_var, width=5).grid(row=5, column=1, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(image_export_frame, text="一括保存先:").grid(row=6, column=0, sticky=tk.W, padx=5, pady=5)
+        archive_mode_frame = ttk.Frame(image_export_frame)
+        archive_mode_frame.grid(row=6, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Radiobutton(archive_mode_frame, text="フォルダ", variable=self.image_archive_mode_var, value=ImageArchiveMode.FOLDER.value).pack(side=tk.LEFT, pady=2)
+        ttk.Radiobutton(archive_mode_frame, text="ZIP", variable=self.image_archive_mode_var, value=ImageArchiveMode.ZIP.value).pack(side=tk.LEFT, padx=10, pady=2)
+        ttk.Radiobutton(archive_mode_frame, text="tar", variable=self.image_archive_mode_var, value=ImageArchiveMode.TAR.value).pack(side=tk.LEFT, pady=2)
+
+        ttk.Checkbutton(image_export_frame, text="アーカイブに一覧 (manifest.csv) を含める", variable=self.image_archive_manifest_var).grid(row=7, column=0, columnspan=2, sticky=tk.W, padx=5, pady=5)
+        ttk.Checkbutton(image_export_frame, text="フォルダへの保存では前回から変わった画像だけを書き出す", variable=self.incremental_image_export_var).grid(row=8, column=0, columnspan=2, sticky=tk.W, padx=5, pady=5)
+
         # --- ボタン ---
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(pady=15, anchor="e")
@@ -88,6 +186,15 @@ class AppSettingsWindow(tk.Toplevel):
         self.cancel_button = ttk.Button(button_frame, text="キャンセル", command=self.on_close)
         self.cancel_button.pack(side=tk.LEFT, padx=5)
 
+    def apply_image_encoder_preset(self, preset):
+        """画像エクスポートの各項目に、プリセットの値を設定します。
+
+        Args:
+            preset (ImageEncoderPreset): 適用するプリセット。
+        """
+        for name, value in IMAGE_ENCODER_PRESETS[preset.value].items():
+            getattr(self, f"{name}_var").set(value)
+
     def save_settings(self):
         """UIの現在の状態をSettingsオブジェクトに保存し、ファイルを更新します。"""
         try:
@@ -100,6 +207,21 @@ class AppSettingsWindow(tk.Toplevel):
             self.settings.excel_image_scale = self.excel_image_scale_var.get()
             self.settings.image_export_border_width = self.image_export_border_width_var.get()
             self.settings.pdf_export_border_width = self.pdf_export_border_width_var.get()
+            self.settings.pdf_save_preset = self.pdf_save_preset_var.get()
+            self.settings.image_export_mode = self.image_export_mode_var.get()
+            self.settings.image_export_margin = self.image_export_margin_var.get()
+            self.settings.excel_image_format = self.excel_image_format_var.get()
+            self.settings.excel_jpeg_quality = self.excel_jpeg_quality_var.get()
+            self.settings.excel_rows_per_part = self.excel_rows_per_part_var.get()
+            self.settings.excel_split_mode = self.excel_split_mode_var.get()
+            self.settings.image_encode_format = self.image_encode_format_var.get()
+            self.settings.png_compress_level = self.png_compress_level_var.get()
+            self.settings.image_quality = self.image_quality_var.get()
+            self.settings.image_color_mode = self.image_color_mode_var.get()
+            self.settings.image_export_dpi = self.image_export_dpi_var.get()
+            self.settings.image_archive_mode = self.image_archive_mode_var.get()
+            self.settings.image_archive_manifest = self.image_archive_manifest_var.get()
+            self.settings.incremental_image_export = self.incremental_image_export_var.get()
 
             self.settings.save()
             self.on_close()
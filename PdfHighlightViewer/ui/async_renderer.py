@@ -0,0 +1,123 @@
+from concurrent.futures import ProcessPoolExecutor
+
+class AsyncPageRenderer:
+    """ページのレンダリングをワーカープロセスで行い、結果をTkのイベントループで受け取るクラス。
+
+    要求はキーごとに1つだけ保持され、同じキーで新しい要求を出すと古い要求は
+    キャンセルされます。まだ開始していない要求はプールから取り除かれ、
+    実行中の要求は完了しても結果が破棄されます。
+    ワーカーの関数 (`pdf.workers`) はPyMuPDFを読み込むため、起動を遅くしないよう
+    最初にドキュメントを設定する時点で読み込みます。
+    """
+
+    POLL_INTERVAL_MS = 20
+
+    def __init__(self, widget, cache=None):
+        """AsyncPageRendererオブジェクトを初期化します。
+
+        Args:
+            widget (tk.Widget): `after` によるポーリングに使うウィジェット。
+            cache (RenderCache, optional): ワーカープロセスで利用するレンダリングキャッシュ。
+        """
+        self.widget = widget
+        self.cache = cache
+        self.filepath = None
+        # レンダリングに失敗したときに例外を受け取るコールバック
+        self.on_error = None
+        self._executor = None
+        self._requests = {}
+        self._poll_job = None
+
+    def set_document(self, filepath):
+        """レンダリング対象のドキュメントを設定します。
+
+        未完了の要求はすべてキャンセルされ、ワーカープロセスでは新しい
+        ドキュメントを先に開いておきます。
+
+        Args:
+            filepath (str): PDFファイルのパス。
+        """
+        from ..pdf import workers
+
+        self.cancel_all()
+        self.filepath = filepath
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        self._executor.submit(workers.open_document, filepath)
+
+    def request(self, key, page_num, scale, callback):
+        """ページのレンダリングを要求します。
+
+        Args:
+            key (Hashable): 要求を識別するキー。
+            page_num (int): ページ番号 (0-indexed)。
+            scale (float): レンダリング倍率。
+            callback (Callable[[int, int, int, bytes], None]): 完了時に
+                幅、高さ、1行あたりのバイト数、サンプルデータを受け取る関数。
+        """
+        if self._executor is None or self.filepath is None:
+            return
+        from ..pdf import workers
+
+        self.cancel(key)
+        future = self._executor.submit(workers.render_page_samples, self.filepath, page_num, scale, self.cache)
+        self._requests[key] = (future, callback)
+        if self._poll_job is None:
+            self._poll_job = self.widget.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def is_pending(self, key):
+        """指定されたキーの要求が未完了かどうかを返します。
+
+        Args:
+            key (Hashable): 要求を識別するキー。
+
+        Returns:
+            bool: 未完了の要求がある場合はTrue。
+        """
+        return key in self._requests
+
+    def cancel(self, key):
+        """指定されたキーの要求をキャンセルします。
+
+        Args:
+            key (Hashable): 要求を識別するキー。
+        """
+        entry = self._requests.pop(key, None)
+        if entry is not None:
+            entry[0].cancel()
+
+    def cancel_all(self):
+        """すべての要求をキャンセルします。"""
+        for key in list(self._requests):
+            self.cancel(key)
+
+    def shutdown(self):
+        """すべての要求をキャンセルし、ワーカープロセスを停止します。"""
+        self.cancel_all()
+        if self._poll_job is not None:
+            self.widget.after_cancel(self._poll_job)
+            self._poll_job = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _poll(self):
+        """完了した要求のコールバックを呼び出し、未完了の要求があれば再度ポーリングします。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        self._poll_job = None
+        for key, (future, callback) in list(self._requests.items()):
+            if not future.done():
+                continue
+            del self._requests[key]
+            try:
+                result = future.result()
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(e)
+                continue
+            callback(*result)
+        if self._requests:
+            self._poll_job = self.widget.after(self.POLL_INTERVAL_MS, self._poll)
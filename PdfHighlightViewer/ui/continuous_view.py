@@ -0,0 +1,320 @@
+import tkinter as tk
+from bisect import bisect_right
+from collections import defaultdict
+
+from ..pdf import renderer
+from .highlight_overlay import HighlightOverlay
+
+class ContinuousView:
+    """全ページを1つのスクロール領域に縦に並べて表示する連続スクロールモード。
+
+    スクロール領域は全ページ分の大きさで確保しますが、画像をレンダリングして
+    保持するのは表示範囲とその前後 `KEEP_MARGIN` ページのみです。範囲外に
+    出たページの画像は解放され、PhotoImageは次のレンダリングで再利用されます。
+    抽出結果の枠はページごとの `HighlightOverlay` として描画されます。
+
+    ページのレンダリングは `AsyncPageRenderer` を通じてワーカープロセスで行い、
+    完了するまではページの枠 (白紙) または拡大縮小した仮の画像を表示します。
+    """
+
+    PAGE_GAP = 10
+    KEEP_MARGIN = 1
+    MAX_FREE_PHOTOS = 4
+    OVERLAY_COLOR = "#ff6666"
+
+    def __init__(self, canvas, async_renderer):
+        """ContinuousViewオブジェクトを初期化します。
+
+        Args:
+            canvas (tk.Canvas): 描画先のキャンバス。
+            async_renderer (AsyncPageRenderer): ページのレンダリングに使うレンダラー。
+        """
+        self.canvas = canvas
+        self.async_renderer = async_renderer
+        self.doc = None
+        self.scale = 1.0
+        self.highlights = []
+        self.loaded = False
+        # Trueの間は新しいレンダリングを要求しない (ズーム操作の連続入力中など)
+        self.render_paused = False
+        # 表示範囲の中央にあるページが変わったときに呼ばれるコールバック
+        self.on_page_change = None
+
+        self._tops = []
+        self._sizes = []
+        self._hits_by_page = defaultdict(list)
+        self._photos = {}
+        self._image_items = {}
+        self._overlays = {}
+        self._free_photos = []
+        self._stale = set()
+        self._center_page = None
+        self._refresh_job = None
+
+    def load(self, doc, scale, highlights):
+        """ページのレイアウトを計算し、スクロール領域とページの枠を配置します。
+
+        ページの大きさは、回転 (/Rotate) を適用した表示上の大きさ (`page.rect`) です。
+
+        Args:
+            doc (fitz.Document): 表示するドキュメント。
+            scale (float): 表示倍率。
+            highlights (list[Highlight]): 重ねて表示する抽出結果。
+        """
+        self.clear()
+        self.doc = doc
+        self.scale = scale
+        self.highlights = highlights
+        for index, highlight in enumerate(highlights):
+            self._hits_by_page[highlight.page_num].append(index)
+
+        self._layout()
+        self.canvas.yview_moveto(0)
+        self.loaded = True
+        self.render_paused = False
+        self.schedule_refresh()
+
+    def set_scale(self, scale):
+        """表示倍率を変更し、再レンダリングを保留した状態にします。
+
+        ページのレイアウトを計算し直し、表示中のページ画像は拡大縮小した
+        仮の画像に置き換えます。描画済みの枠は作り直さずに、新しい位置と
+        倍率に合わせて変換します。新しい倍率でのレンダリングは `resume` を
+        呼び出すまで要求されません。
+
+        Args:
+            scale (float): 新しい表示倍率。
+        """
+        if not self.loaded:
+            return
+        self.scale = scale
+        self.render_paused = True
+        self.canvas.delete("page_frame")
+        self._layout()
+        self.canvas.tag_lower("page_frame")
+        for page_num, photo in list(self._photos.items()):
+            self.async_renderer.cancel(("page", page_num))
+            width, height = self._sizes[page_num]
+            placeholder = renderer.scale_photo(photo, width, height)
+            self._photos[page_num] = placeholder
+            item = self._image_items[page_num]
+            self.canvas.coords(item, 0, self._tops[page_num])
+            self.canvas.itemconfigure(item, image=placeholder)
+            self._stale.add(page_num)
+        for page_num, overlay in self._overlays.items():
+            overlay.rescale(self.page_origin(page_num), scale)
+
+    def resume(self):
+        """保留していたレンダリングを再開します。"""
+        self.render_paused = False
+        self.schedule_refresh()
+
+    def _layout(self):
+        """ページの配置位置を計算し、スクロール領域とページの枠を配置します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        self._tops = []
+        self._sizes = []
+        y = 0
+        max_width = 0
+        for page_num in range(self.doc.page_count):
+            rect = self.doc[page_num].rect
+            width, height = int(rect.width * self.scale), int(rect.height * self.scale)
+            self._tops.append(y)
+            self._sizes.append((width, height))
+            self.canvas.create_rectangle(0, y, width, y + height, fill="white", outline="", tags="page_frame")
+            max_width = max(max_width, width)
+            y += height + self.PAGE_GAP
+        self.canvas.config(scrollregion=(0, 0, max_width, max(0, y - self.PAGE_GAP)))
+
+    def clear(self):
+        """キャンバス上の連続スクロール表示をすべて破棄します。"""
+        self.canvas.delete("all")
+        self.doc = None
+        self.highlights = []
+        self.loaded = False
+        self._tops = []
+        self._sizes = []
+        self._hits_by_page.clear()
+        self._photos.clear()
+        self._image_items.clear()
+        for page_num in self._overlays:
+            self.async_renderer.cancel(("page", page_num))
+        self._overlays.clear()
+        self._free_photos.clear()
+        self._stale.clear()
+        self._center_page = None
+
+    def page_origin(self, page_num):
+        """ページ左上のキャンバス座標を返します。
+
+        Args:
+            page_num (int): ページ番号 (0-indexed)。
+
+        Returns:
+            tuple[int, int]: キャンバス上のx座標とy座標。
+        """
+        return (0, self._tops[page_num])
+
+    def page_at(self, y):
+        """キャンバスのy座標にあるページ番号を返します。
+
+        Args:
+            y (float): キャンバス上のy座標。
+
+        Returns:
+            int: ページ番号 (0-indexed)。ページがない場合は-1。
+        """
+        return bisect_right(self._tops, y) - 1
+
+    def scroll_to_page(self, page_num):
+        """指定されたページの先頭が表示範囲の上端に来るようにスクロールします。
+
+        Args:
+            page_num (int): ページ番号 (0-indexed)。
+        """
+        if not (0 <= page_num < len(self._tops)):
+            return
+        total = self._total_height()
+        if total > 0:
+            self.canvas.yview_moveto(self._tops[page_num] / total)
+        self.schedule_refresh()
+
+    def hit_at(self, x, y):
+        """キャンバス座標の位置にある抽出結果のインデックスを返します。
+
+        Args:
+            x (float): キャンバス上のx座標。
+            y (float): キャンバス上のy座標。
+
+        Returns:
+            int | None: 抽出結果のインデックス。該当がない場合はNone。
+        """
+        overlay = self._overlays.get(self.page_at(y))
+        if overlay is None:
+            return None
+        return overlay.hit_at(x, y)
+
+    def schedule_refresh(self):
+        """表示範囲のページ更新を、アイドル時に1回だけ実行するよう予約します。"""
+        if self._refresh_job is None:
+            self._refresh_job = self.canvas.after_idle(self.refresh)
+
+    def refresh(self):
+        """表示範囲付近のページのレンダリングを要求し、範囲外のページを解放します。"""
+        self._refresh_job = None
+        if not self.loaded or not self._tops:
+            return
+        height = self.canvas.winfo_height()
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(height)
+        first = max(0, self.page_at(top) - self.KEEP_MARGIN)
+        last = min(len(self._tops) - 1, self.page_at(bottom) + self.KEEP_MARGIN)
+        keep = range(first, last + 1)
+
+        for page_num in list(self._overlays):
+            if page_num not in keep:
+                self._release_page(page_num)
+        for page_num in keep:
+            self._ensure_overlay(page_num)
+            needs_render = page_num not in self._photos or page_num in self._stale
+            if needs_render and not self.render_paused and not self.async_renderer.is_pending(("page", page_num)):
+                self._request_render(page_num)
+
+        # 選択中の赤枠を抽出結果の枠より手前に表示する
+        self.canvas.tag_raise("highlight_rect")
+
+        center_page = self.page_at(self.canvas.canvasy(height / 2))
+        if center_page != self._center_page:
+            self._center_page = center_page
+            if self.on_page_change is not None and center_page >= 0:
+                self.on_page_change(center_page)
+
+    def _ensure_overlay(self, page_num):
+        """ページの抽出結果の枠がまだ描画されていなければ描画します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if page_num in self._overlays:
+            return
+        overlay = HighlightOverlay(self.canvas, f"overlay_p{page_num}", color=self.OVERLAY_COLOR)
+        hits = [(index, self.highlights[index].rect) for index in self._hits_by_page.get(page_num, [])]
+        overlay.draw(page_num, hits, self.page_origin(page_num), self.scale, self.doc[page_num].rotation_matrix)
+        self._overlays[page_num] = overlay
+
+    def _request_render(self, page_num):
+        """現在の倍率でのページのレンダリングを要求します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        scale = self.scale
+        self.async_renderer.request(
+            ("page", page_num), page_num, scale,
+            lambda *result: self._on_page_rendered(page_num, scale, *result))
+
+    def _on_page_rendered(self, page_num, scale, width, height, stride, samples):
+        """レンダリング結果をキャンバスへ配置します。
+
+        倍率が変わった後に届いた結果や、すでに解放されたページの結果は破棄します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if not self.loaded or scale != self.scale or page_num not in self._overlays:
+            return
+        # 同じサイズの仮の画像やプールしたPhotoImageがあれば、内容を書き換えて使う
+        recycled = self._photos.get(page_num)
+        if recycled is None or recycled.width() != width or recycled.height() != height:
+            recycled = None
+            for i, photo in enumerate(self._free_photos):
+                if photo.width() == width and photo.height() == height:
+                    recycled = self._free_photos.pop(i)
+                    break
+        photo = renderer.samples_to_photo(width, height, stride, samples, photo=recycled)
+        self._stale.discard(page_num)
+        self._photos[page_num] = photo
+        item = self._image_items.get(page_num)
+        if item is None:
+            item = self.canvas.create_image(0, self._tops[page_num], anchor=tk.NW, image=photo, tags="page_image")
+            self._image_items[page_num] = item
+            self.canvas.tag_lower(item)
+            self.canvas.tag_lower("page_frame")
+        else:
+            self.canvas.itemconfigure(item, image=photo)
+
+    def _release_image(self, page_num):
+        """ページの画像を破棄し、PhotoImageを再利用のために保持します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        self.canvas.delete(self._image_items.pop(page_num))
+        photo = self._photos.pop(page_num)
+        if len(self._free_photos) < self.MAX_FREE_PHOTOS:
+            self._free_photos.append(photo)
+
+    def _release_page(self, page_num):
+        """ページの画像と枠を破棄します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        self.async_renderer.cancel(("page", page_num))
+        self._stale.discard(page_num)
+        if page_num in self._photos:
+            self._release_image(page_num)
+        self._overlays.pop(page_num).clear()
+
+    def _total_height(self):
+        """スクロール領域全体の高さを返します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if not self._tops:
+            return 0
+        return self._tops[-1] + self._sizes[-1][1]
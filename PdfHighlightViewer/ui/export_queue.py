@@ -0,0 +1,185 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from queue import Empty
+
+from ..export import jobs
+from ..export.jobs import ExportCancelled, ExportJob, ExportJobStatus
+
+class ExportJobQueue:
+    """エクスポートジョブをワーカープロセスで順に実行し、進捗をTkのイベントループで受け取るクラス。
+
+    ジョブは登録された順に1つずつ実行されます。実行中もTkのスレッドは
+    止まらないため、ユーザーはエクスポートの完了を待たずに操作を続けられます。
+    """
+
+    POLL_INTERVAL_MS = 100
+
+    def __init__(self, widget):
+        """ExportJobQueueオブジェクトを初期化します。
+
+        Args:
+            widget (tk.Widget): `after` によるポーリングに使うウィジェット。
+        """
+        self.widget = widget
+        # 進捗が更新されたときに、実行中のジョブ (なければNone) と待機中のジョブ数を受け取るコールバック
+        self.on_update = None
+        # ジョブが完了、失敗、キャンセルされたときにそのジョブを受け取るコールバック
+        self.on_finished = None
+        self._executor = None
+        self._progress_queue = None
+        self._cancel_flag = None
+        self._jobs = []
+        self._next_id = 1
+        self._poll_job = None
+
+    def submit(self, title, error_message, func, *args):
+        """ジョブをキューに登録します。
+
+        Args:
+            title (str): 進捗の表示に使うジョブの名前。
+            error_message (str): 失敗したときに表示するメッセージ。
+            func (Callable[..., str]): ワーカープロセスで実行する関数。`args` に続けて
+                `ExportProgress` を受け取り、完了時のメッセージを返します。
+                pickle可能なトップレベルの関数である必要があります。
+            *args: `func` に渡す引数。pickle可能な値に限ります。
+
+        Returns:
+            ExportJob: 登録されたジョブ。
+        """
+        if self._executor is None:
+            self._progress_queue = multiprocessing.Queue()
+            self._cancel_flag = multiprocessing.Value('i', 0)
+            self._executor = ProcessPoolExecutor(
+                max_workers=1, initializer=jobs.init_worker,
+                initargs=(self._progress_queue, self._cancel_flag))
+        job = ExportJob(self._next_id, title, error_message)
+        self._next_id += 1
+        job.future = self._executor.submit(jobs.run_job, job.job_id, func, args)
+        self._jobs.append(job)
+        self._notify()
+        if self._poll_job is None:
+            self._poll_job = self.widget.after(self.POLL_INTERVAL_MS, self._poll)
+        return job
+
+    @property
+    def current(self):
+        """実行中のジョブを返します。
+
+        Returns:
+            ExportJob | None: 実行中のジョブ。なければNone。
+        """
+        for job in self._jobs:
+            if job.status is ExportJobStatus.RUNNING:
+                return job
+        return None
+
+    @property
+    def pending_count(self):
+        """実行を待っているジョブの数を返します。
+
+        Returns:
+            int: 待機中のジョブ数。
+        """
+        return sum(1 for job in self._jobs if job.status is ExportJobStatus.QUEUED)
+
+    def cancel(self, job):
+        """ジョブをキャンセルします。
+
+        開始前のジョブはキューから取り除かれ、実行中のジョブは次に
+        進捗を報告する時点で中断されます。
+
+        Args:
+            job (ExportJob): キャンセルするジョブ。
+        """
+        if job not in self._jobs:
+            return
+        if job.future.cancel():
+            job.status = ExportJobStatus.CANCELLED
+            self._jobs.remove(job)
+            self._notify()
+            if self.on_finished is not None:
+                self.on_finished(job)
+            return
+        self._cancel_flag.value = job.job_id
+
+    def cancel_current(self):
+        """実行中のジョブをキャンセルします。
+
+        Returns:
+            bool: キャンセルしたジョブがあればTrue。
+        """
+        job = self.current
+        if job is None:
+            return False
+        self.cancel(job)
+        return True
+
+    def cancel_all(self):
+        """すべてのジョブをキャンセルします。"""
+        # 実行中のジョブが終わった直後に次のジョブが始まらないよう、後ろから取り消す
+        for job in reversed(list(self._jobs)):
+            self.cancel(job)
+
+    def shutdown(self):
+        """すべてのジョブをキャンセルし、ワーカープロセスを停止します。"""
+        self.cancel_all()
+        if self._poll_job is not None:
+            self.widget.after_cancel(self._poll_job)
+            self._poll_job = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _poll(self):
+        """ワーカープロセスからの進捗を反映し、完了したジョブを処理します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        self._poll_job = None
+        jobs_by_id = {job.job_id: job for job in self._jobs}
+        while True:
+            try:
+                job_id, done, total, bytes_written = self._progress_queue.get_nowait()
+            except Empty:
+                break
+            job = jobs_by_id.get(job_id)
+            if job is None:
+                continue
+            if job.status is ExportJobStatus.QUEUED:
+                job.status = ExportJobStatus.RUNNING
+                job.started_at = time.monotonic()
+            job.done, job.total, job.bytes_written = done, total, bytes_written
+
+        finished = []
+        for job in list(self._jobs):
+            if not job.future.done():
+                continue
+            try:
+                job.message = job.future.result()
+                job.status = ExportJobStatus.DONE
+            except ExportCancelled:
+                job.status = ExportJobStatus.CANCELLED
+            except Exception as e:
+                job.error = e
+                job.status = ExportJobStatus.FAILED
+            self._jobs.remove(job)
+            finished.append(job)
+
+        self._notify()
+        if self._jobs:
+            self._poll_job = self.widget.after(self.POLL_INTERVAL_MS, self._poll)
+        # 完了の通知でダイアログが表示されても、ポーリングが止まらないよう最後に呼び出す
+        if self.on_finished is not None:
+            for job in finished:
+                self.on_finished(job)
+
+    def _notify(self):
+        """進捗の更新を `on_update` に通知します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if self.on_update is not None:
+            self.on_update(self.current, self.pending_count)
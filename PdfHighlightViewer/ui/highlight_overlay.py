@@ -0,0 +1,103 @@
+from ..pdf.spatial import GridIndex
+
+class HighlightOverlay:
+    """1ページ分の抽出結果の枠を、キャンバス上に重ねて表示するレイヤー。
+
+    枠はTclスクリプトにまとめて1回の呼び出しで描画し、クリック位置の
+    判定にはページ座標のグリッドインデックスを使います。抽出結果の矩形は
+    回転前のページ座標のため、回転したページでは表示上の座標 (レンダリングした
+    画像の座標) に変換してから描画とインデックスへの登録を行います。表示倍率の変更時は
+    枠を作り直さず、`canvas.scale` で座標だけを変換します。
+    """
+
+    def __init__(self, canvas, tag, color="#ff6666", width=1):
+        """HighlightOverlayオブジェクトを初期化します。
+
+        Args:
+            canvas (tk.Canvas): 描画先のキャンバス。
+            tag (str): このレイヤーの枠に付けるタグ。レイヤーごとに一意にします。
+            color (str, optional): 枠の色。
+            width (int, optional): 枠の太さ。
+        """
+        self.canvas = canvas
+        self.tag = tag
+        self.color = color
+        self.width = width
+        self.page_num = None
+        self.origin = (0, 0)
+        self.scale = 1.0
+        self._index = GridIndex()
+
+    def draw(self, page_num, hits, origin, scale, matrix=None):
+        """ページの抽出結果の枠をまとめて描画します。
+
+        Args:
+            page_num (int): ページ番号 (0-indexed)。
+            hits (list[tuple[int, fitz.Rect]]): 抽出結果のインデックスと矩形
+                (回転前のページ座標) のリスト。
+            origin (tuple[float, float]): ページ左上のキャンバス座標。
+            scale (float): 表示倍率。
+            matrix (fitz.Matrix, optional): 矩形を表示上のページ座標に変換する行列
+                (`page.rotation_matrix`)。省略時は変換しません。
+        """
+        self.clear()
+        self.page_num = page_num
+        self.origin = origin
+        self.scale = scale
+        if not hits:
+            return
+        ox, oy = origin
+        path = str(self.canvas)
+        options = f"-outline {{{self.color}}} -width {self.width} -tags {{overlay {self.tag}}}"
+        commands = []
+        for index, rect in hits:
+            if matrix is not None:
+                rect = rect * matrix
+            self._index.insert(rect, index)
+            commands.append(
+                f"{path} create rectangle "
+                f"{ox + rect.x0 * scale:.2f} {oy + rect.y0 * scale:.2f} "
+                f"{ox + rect.x1 * scale:.2f} {oy + rect.y1 * scale:.2f} {options}")
+        # create_rectangleを項目ごとに呼ぶと引数の変換が毎回発生するため、
+        # 1つのスクリプトにまとめて評価する
+        self.canvas.tk.eval("\n".join(commands))
+
+    def rescale(self, origin, scale):
+        """枠を作り直さずに、新しい配置位置と表示倍率に合わせて移動します。
+
+        Args:
+            origin (tuple[float, float]): 新しいページ左上のキャンバス座標。
+            scale (float): 新しい表示倍率。
+        """
+        if self.page_num is None:
+            return
+        ox, oy = self.origin
+        factor = scale / self.scale
+        self.canvas.scale(self.tag, ox, oy, factor, factor)
+        self.canvas.move(self.tag, origin[0] - ox, origin[1] - oy)
+        self.origin = origin
+        self.scale = scale
+
+    def hit_at(self, x, y):
+        """キャンバス座標の位置にある抽出結果のインデックスを返します。
+
+        複数の枠が重なっている場合は、面積の最も小さい枠を優先します。
+
+        Args:
+            x (float): キャンバス上のx座標。
+            y (float): キャンバス上のy座標。
+
+        Returns:
+            int | None: 抽出結果のインデックス。該当がない場合はNone。
+        """
+        if self.page_num is None:
+            return None
+        ox, oy = self.origin
+        hits = self._index.query_point((x - ox) / self.scale, (y - oy) / self.scale)
+        return hits[0] if hits else None
+
+    def clear(self):
+        """描画した枠とインデックスを破棄します。"""
+        self.canvas.delete(self.tag)
+        self.page_num = None
+        self._index = GridIndex()
@@ -1,21 +1,51 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, font
-import fitz
-from typing import Optional
+import os
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING, Optional
 
 from ..config.settings import Settings
-from ..pdf import extractor, renderer
-from ..export.exporter import Exporter
+from ..pdf import renderer
+from ..pdf.hashing import page_hash
+from ..pdf.render_cache import RenderCache
+from ..pdf.session import DocumentSessionManager
+from ..pdf.thumbnails import THUMBNAIL_SCALE, ThumbnailBuilder, ThumbnailCache
 from ..export.formats import ExportFormat
+from ..export import metadata
 from .ui_builder import UIBuilder
 from .settings_window import SettingsWindow
 from .app_settings_window import AppSettingsWindow
 from .tooltip import Tooltip
+from .continuous_view import ContinuousView
+from .highlight_overlay import HighlightOverlay
+from .async_renderer import AsyncPageRenderer
+from .export_queue import ExportJobQueue
+from ..export.jobs import ExportJobStatus
+
+# PyMuPDFとエクスポート処理 (openpyxlなど) は読み込みに時間がかかるため、起動時には
+# 読み込まず、最初の抽出やエクスポートの時点で読み込む
+if TYPE_CHECKING:
+    import fitz
 
 class MainWindow(tk.Tk):
     """アプリケーションのメインウィンドウとUIロジックを管理するクラス。
     """
 
+    # プレビュー画像をキャッシュしておく最大ページ数
+    MAX_CACHED_PAGES = 8
+    # 表示倍率の範囲と、ズーム操作をまとめて再レンダリングするまでの待ち時間
+    MIN_SCALE = 0.2
+    MAX_SCALE = 5.0
+    ZOOM_DEBOUNCE_MS = 200
+    # リストボックスの項目に表示する文字列の最大文字数
+    LABEL_TEXT_LENGTH = 40
+    # 開いているファイルの更新を確認する間隔
+    FILE_WATCH_INTERVAL_MS = 1000
+    # 抽出後にページのハッシュ値を計算するとき、一度に処理するページ数
+    PAGE_HASH_BATCH = 32
+    # 更新後のファイルのページのハッシュ値の計算が終わったかを確認する間隔
+    PAGE_HASH_POLL_MS = 100
+
     def __init__(self):
         """MainWindowオブジェクトを初期化します。
 
@@ -31,8 +61,7 @@ class MainWindow(tk.Tk):
         # --- スタイルとフォントの設定 ---
         default_font_family = 'Yu Gothic UI' 
         # フォントが存在しない場合に備えてフォールバックを設定
-        available_fonts = font.families()
-        if default_font_family not in available_fonts:
+        if not self._font_exists(default_font_family):
             default_font_family = 'TkDefaultFont'
 
         # ttkウィジェットのデフォルトフォントを設定
@@ -43,17 +72,47 @@ class MainWindow(tk.Tk):
         self.option_add('*Font', (default_font_family, self.settings.font_size))
 
         # --- 状態変数 ---
-        self.doc: Optional[fitz.Document] = None
+        # 開いているドキュメントは `documents` が管理し、`doc` はその参照
+        self.documents = DocumentSessionManager()
+        self.doc: Optional["fitz.Document"] = None
         self.file_path_var = tk.StringVar()
         self.highlights = []
-        self.page_images = {}
+        self.page_images = OrderedDict()
         self.current_page_num = -1
         self.scale = 1.0
+        self._zoom_job = None
+        self._zoom_placeholder = None
         self.export_format = tk.StringVar(value=ExportFormat.PNG.value)
+        self.group_by_page_var = tk.BooleanVar(value=False)
+        self.search_var = tk.StringVar()
+        self.continuous_var = tk.BooleanVar(value=False)
         self.platform = self.tk.call('tk', 'windowingsystem')
+        self.thumbnail_builder: Optional[ThumbnailBuilder] = None
+        self.thumbnail_cache = ThumbnailCache(os.path.join(self.settings.cache_dir, 'thumbnails'))
 
         # UIの構築と機能の割り当て
         self.builder = UIBuilder(self)
+        self.async_renderer = AsyncPageRenderer(self, RenderCache.from_settings(self.settings))
+        self.async_renderer.on_error = self._on_render_error
+        self.export_jobs = ExportJobQueue(self)
+        self.export_jobs.on_update = self._on_export_progress
+        self.export_jobs.on_finished = self._on_export_finished
+        self.continuous_view = ContinuousView(self.builder.widgets.canvas, self.async_renderer)
+        self.continuous_view.on_page_change = self._on_continuous_page_change
+        self.page_overlay = HighlightOverlay(self.builder.widgets.canvas, "overlay_page",
+                                             color=ContinuousView.OVERLAY_COLOR)
+        self.hits_by_page = {}
+        # 抽出したときのドキュメントの各ページのハッシュ値と、抽出に使った設定
+        self.page_hashes = []
+        self._page_hash_job = None
+        self._extraction_signature = None
+        # 更新を検知したファイルの状態 (書き込みが終わるまで待つために使う) と、
+        # 処理に失敗したファイルの状態 (再び更新されるまで処理し直さない)
+        self._changed_stat = None
+        self._failed_stat = None
+        self._watch_job = None
+        # 更新後のファイルのページのハッシュ値の計算結果 (計算中でなければNone)
+        self._page_hash_future = None
         self._bind_widgets()
 
         # 抽出ボタンにツールチップを設定
@@ -61,6 +120,27 @@ class MainWindow(tk.Tk):
             self.builder.widgets.btn_extract, "抽出条件を1つ以上選択してください"
         )
         self.update_extract_button_state()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self._watch_job = self.after(self.FILE_WATCH_INTERVAL_MS, self._watch_file)
+
+    def _font_exists(self, family):
+        """指定されたファミリーのフォントが使えるかどうかを返します。
+
+        `font.families()` はインストールされているすべてのフォントを列挙するため、
+        フォントが多い環境では起動が遅くなります。ここでは指定されたファミリーで
+        フォントを作成し、Tkが実際に選んだファミリーと比較します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            family (str): フォントのファミリー名。
+
+        Returns:
+            bool: フォントが使える場合はTrue。
+        """
+        actual = font.Font(root=self, family=family).actual("family")
+        return actual.casefold() == family.casefold()
 
     def _bind_widgets(self):
         """UIウィジェットにイベントハンドラや変数を割り当てます。
@@ -77,15 +157,21 @@ class MainWindow(tk.Tk):
         self.builder.widgets.file_menu.add_command(label="抽出条件設定...", command=self.open_settings_window)
         self.builder.widgets.file_menu.add_command(label="アプリケーション設定...", command=self.open_app_settings_window)
         self.builder.widgets.file_menu.add_separator()
-        self.builder.widgets.file_menu.add_command(label="終了", command=self.quit)
+        self.builder.widgets.file_menu.add_command(label="終了", command=self.on_close)
 
         for fmt in ExportFormat:
+            # pyarrowがない環境ではParquet形式を選択肢に出さない
+            if fmt is ExportFormat.PARQUET and not metadata.parquet_available():
+                continue
             self.builder.widgets.format_menu.add_radiobutton(
                 label=fmt.value, variable=self.export_format, value=fmt.value)
 
         self.builder.widgets.export_menu.add_separator()
         self.builder.widgets.export_menu.add_command(label="選択中の領域をエクスポート...", command=self.export_selected)
         self.builder.widgets.export_menu.add_command(label="すべての領域をエクスポート...", command=self.export_all)
+        self.builder.widgets.export_menu.add_separator()
+        self.builder.widgets.export_menu.add_command(label="実行中のエクスポートを中止", command=self.cancel_export)
+        self.builder.widgets.export_menu.add_command(label="すべてのエクスポートを中止", command=self.export_jobs.cancel_all)
 
         # --- トップフレームのウィジェット ---
         self.builder.widgets.btn_extract.config(command=self.run_extraction)
@@ -94,17 +180,31 @@ class MainWindow(tk.Tk):
 
         # --- リストボックス ---
         self.builder.widgets.listbox.bind("<<ListboxSelect>>", self.on_highlight_selected)
+        self.builder.widgets.group_check.config(variable=self.group_by_page_var, command=self.toggle_group_by_page)
+        self.builder.widgets.entry_search.config(textvariable=self.search_var)
+        self.builder.widgets.entry_search.bind("<Return>", lambda e: self.find_next_highlight())
+        self.builder.widgets.btn_search.config(command=self.find_next_highlight)
+
+        # --- サムネイル ---
+        self.builder.widgets.thumbnail_strip.on_page_click = self.show_page
 
         # --- ズームボタン ---
         self.builder.widgets.zoom_in_btn.config(command=self.zoom_in)
         self.builder.widgets.zoom_out_btn.config(command=self.zoom_out)
+        self.builder.widgets.continuous_check.config(variable=self.continuous_var, command=self.toggle_continuous)
 
         # --- キャンバスのスクロールイベント ---
         canvas = self.builder.widgets.canvas
+        canvas.configure(yscrollcommand=self._on_canvas_yscroll)
+        canvas.bind("<Configure>", lambda e: self._refresh_continuous_view())
+        canvas.bind("<Button-1>", self._on_canvas_click)
         canvas.bind("<MouseWheel>", self._on_vertical_scroll)
         canvas.bind("<Shift-MouseWheel>", self._on_horizontal_scroll)
         canvas.bind("<Button-4>", self._on_vertical_scroll) # for Linux
         canvas.bind("<Button-5>", self._on_vertical_scroll) # for Linux
+        canvas.bind("<Control-MouseWheel>", self._on_zoom_wheel)
+        canvas.bind("<Control-Button-4>", self._on_zoom_wheel) # for Linux
+        canvas.bind("<Control-Button-5>", self._on_zoom_wheel) # for Linux
         # Linuxでの水平スクロール(Shift+Button-4/5)は環境依存性が高いため、
         # 一般的なShift+MouseWheelでカバーします。
 
@@ -137,17 +237,24 @@ class MainWindow(tk.Tk):
 
         # 既存のハイライト描画をクリア
         self.builder.widgets.canvas.delete("highlight_rect")
+        self.continuous_view.clear()
 
         try:
-            self.doc = fitz.open(filepath)
+            from ..pdf import extractor
+
+            # 別のファイルを開く場合や内容が変わった場合は前のドキュメントが閉じられるため、
+            # 開き終わるまで参照を外しておく
+            self.doc = None
+            session = self.documents.open(filepath, self.settings.in_memory_open_max_mb * 1024 * 1024)
+            self.doc = session.doc
+            self.async_renderer.set_document(filepath)
             self.builder.widgets.status_bar.config(text=f"処理中: {filepath}")
             self.update()
 
             self.highlights = extractor.extract_regions(self.doc, self.settings)
-            self.highlights.sort(key=lambda h: (h.page_num, h.rect.y0))
-
-            self.page_images.clear()
-            self.builder.widgets.listbox.delete(0, tk.END)
+            self._extraction_signature = extractor.extraction_signature(self.settings)
+            self._load_results(session)
+            self._start_page_hashes()
 
             if not self.highlights:
                 messagebox.showinfo("情報", "指定された条件に一致する項目は見つかりませんでした。")
@@ -155,9 +262,8 @@ class MainWindow(tk.Tk):
                     self.display_page(0)
                 else:
                     self.builder.widgets.canvas.delete("all")
+                    self.page_overlay.clear()
             else:
-                for i, highlight in enumerate(self.highlights):
-                    self.builder.widgets.listbox.insert(tk.END, f"項目 {i+1} (Page {highlight.page_num + 1})")
                 self.builder.widgets.listbox.select_set(0)
 
             self.builder.widgets.status_bar.config(text="準備完了")
@@ -166,6 +272,309 @@ class MainWindow(tk.Tk):
             messagebox.showerror("エラー", f"ファイルの処理中にエラーが発生しました: {e}")
             self.builder.widgets.status_bar.config(text="エラー")
 
+    def _load_results(self, session):
+        """抽出結果を並べ替え、リストボックス、サムネイル、連続表示に反映します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            session (DocumentSession): 抽出したドキュメントのセッション。
+        """
+        self.highlights.sort(key=lambda h: (h.page_num, h.rect.y0))
+        self.hits_by_page = {}
+        for i, highlight in enumerate(self.highlights):
+            self.hits_by_page.setdefault(highlight.page_num, []).append((i, highlight.rect))
+        self.page_overlay.clear()
+
+        self.page_images.clear()
+        self.builder.widgets.listbox.delete(0, tk.END)
+        self._start_thumbnails(session.filepath, session.hash_future)
+        if self.continuous_var.get():
+            self.continuous_view.load(self.doc, self.scale, self.highlights)
+
+        if self.highlights:
+            self.builder.widgets.listbox.set_items(
+                len(self.highlights),
+                self._highlight_label,
+                group_key=lambda i: self.highlights[i].page_num,
+                group_label=lambda page_num, count: f"Page {page_num + 1} ({count}件)"
+            )
+
+    def _start_page_hashes(self):
+        """抽出したドキュメントの各ページのハッシュ値の計算を開始します。
+
+        ファイルが更新されたときに変更されたページを判定するため、更新前の
+        ドキュメントが閉じられる前に計算しておきます。UIを止めないよう、
+        `PAGE_HASH_BATCH` ページずつアイドル時に計算します。ファイルから開いた
+        ドキュメントはページの内容を必要になった時点でファイルから読むため、
+        計算の途中でファイルが更新された場合は、更新後の内容が混ざらないよう
+        計算をやめます (その場合、次の更新ではすべてのページから抽出し直します)。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if self._page_hash_job is not None:
+            self.after_cancel(self._page_hash_job)
+            self._page_hash_job = None
+        self.page_hashes = []
+        if self.doc is not None:
+            self._page_hash_job = self.after_idle(self._hash_next_pages, self.doc)
+
+    def _hash_next_pages(self, doc):
+        """次の `PAGE_HASH_BATCH` ページのハッシュ値を計算し、残りがあれば続きを予約します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            doc (fitz.Document): 計算を開始したときのドキュメント。
+        """
+        self._page_hash_job = None
+        session = self.documents.session
+        if session is None or doc is not session.doc or doc is not self.doc or doc.is_closed:
+            return
+        start = len(self.page_hashes)
+        end = min(start + self.PAGE_HASH_BATCH, doc.page_count)
+        page_hashes = [page_hash(doc[page_num]) for page_num in range(start, end)]
+        if not session.in_memory:
+            try:
+                stat = os.stat(session.filepath)
+                changed = (stat.st_mtime_ns, stat.st_size) != session.stat_key
+            except OSError:
+                changed = True
+            if changed:
+                self.page_hashes = []
+                return
+        self.page_hashes.extend(page_hashes)
+        if end < doc.page_count:
+            self._page_hash_job = self.after(1, self._hash_next_pages, doc)
+
+    def _watch_file(self):
+        """開いているファイルが更新されていないか確認し、更新されていれば抽出し直します。
+
+        更新日時と大きさを `FILE_WATCH_INTERVAL_MS` ごとに確認します。書き込み中の
+        ファイルを開かないよう、更新を検知してから次の確認まで状態が変わらなければ
+        書き込みが終わったとみなします。更新後のファイルの各ページのハッシュ値は、
+        UIを止めないようワーカープロセスで計算します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        self._watch_job = self.after(self.FILE_WATCH_INTERVAL_MS, self._watch_file)
+        session = self.documents.session
+        if self._page_hash_future is not None:
+            return
+        if session is None or not self.settings.auto_reextract:
+            self._changed_stat = None
+            return
+        try:
+            stat = os.stat(session.filepath)
+        except OSError:
+            # 保存のために一時的に削除や名前の変更をされている場合がある
+            self._changed_stat = None
+            return
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        if stat_key == session.stat_key or stat_key == self._failed_stat:
+            self._changed_stat = None
+            return
+        if stat_key != self._changed_stat:
+            self._changed_stat = stat_key
+            return
+        self._changed_stat = None
+        self.builder.widgets.status_bar.config(text=f"ファイルの更新を検知しました: {session.filepath}")
+        future = self._page_hash_future = self.documents.submit_page_hashes(session.filepath)
+        self.after(self.PAGE_HASH_POLL_MS, self._poll_page_hashes, session, future, stat_key)
+
+    def _poll_page_hashes(self, session, future, stat_key):
+        """更新後のファイルのページのハッシュ値の計算が終わっていれば、抽出し直します。
+
+        計算中にファイルがさらに更新された場合は結果を使わず、次の確認で
+        改めて更新を検知します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            session (DocumentSession): 更新を検知したときのドキュメントのセッション。
+            future (Future): `DocumentSessionManager.submit_page_hashes` の戻り値。
+            stat_key (tuple[int, int]): 更新を検知したときのファイルの更新日時と大きさ。
+        """
+        if future is not self._page_hash_future:
+            return
+        if not future.done():
+            self.after(self.PAGE_HASH_POLL_MS, self._poll_page_hashes, session, future, stat_key)
+            return
+        self._page_hash_future = None
+        if session is not self.documents.session:
+            # 計算中に別のファイルを開いた
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            self._failed_stat = stat_key
+            self.builder.widgets.status_bar.config(text=f"更新されたファイルの処理中にエラーが発生しました: {e}")
+            return
+        if result is not None:
+            self._reextract_changed_pages(*result)
+
+    def _reextract_changed_pages(self, stat_key, doc_hash, new_page_hashes):
+        """更新されたファイルを開き直し、内容が変わったページだけを抽出し直します。
+
+        前回の抽出結果は `extractor.update_regions` で更新後のページに対応付け、
+        選択中の項目と表示中のページはできるだけ維持します。前回の抽出から
+        抽出条件が変わっている場合、前回のページのハッシュ値の計算が終わって
+        いない場合、ハッシュ値を計算した後にファイルがさらに更新された場合は、
+        すべてのページから抽出し直します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            stat_key (tuple[int, int]): ハッシュ値を計算したファイルの更新日時と大きさ。
+            doc_hash (str): 更新後のファイル全体の内容のハッシュ値。
+            new_page_hashes (list[str]): 更新後のファイルの各ページのハッシュ値。
+        """
+        from ..pdf import extractor
+
+        old_session = self.documents.session
+        old_doc = self.doc
+        old_highlights = self.highlights
+        old_page_hashes = self.page_hashes
+        page_count = old_doc.page_count if old_doc is not None and not old_doc.is_closed else -1
+        listbox = self.builder.widgets.listbox
+        selection = listbox.curselection()
+        selected = old_highlights[selection[0]] if selection else None
+        current_page_num = self.current_page_num
+
+        try:
+            self.doc = None
+            session = self.documents.open(old_session.filepath,
+                                          self.settings.in_memory_open_max_mb * 1024 * 1024,
+                                          known_hash=(stat_key, doc_hash))
+            self.doc = session.doc
+            if session is old_session:
+                # 更新日時だけが変わり、内容は同じだった
+                self.builder.widgets.status_bar.config(text="準備完了")
+                return
+            self.builder.widgets.status_bar.config(text=f"処理中: {session.filepath}")
+            self.update_idletasks()
+
+            if session.stat_key != stat_key:
+                new_page_hashes = None
+            if (new_page_hashes is not None and len(old_page_hashes) == page_count
+                    and self._extraction_signature == extractor.extraction_signature(self.settings)):
+                self.highlights, reused, changed_pages = extractor.update_regions(
+                    self.doc, self.settings, old_highlights, old_page_hashes, new_page_hashes)
+            else:
+                self.highlights = extractor.extract_regions(self.doc, self.settings)
+                self._extraction_signature = extractor.extraction_signature(self.settings)
+                reused, changed_pages = {}, list(range(self.doc.page_count))
+        except Exception as e:
+            self._failed_stat = stat_key
+            self.highlights = []
+            self.hits_by_page = {}
+            self.page_hashes = []
+            self.builder.widgets.canvas.delete("all")
+            self.continuous_view.clear()
+            self.page_overlay.clear()
+            self.builder.widgets.listbox.delete(0, tk.END)
+            self.builder.widgets.status_bar.config(text=f"更新されたファイルの処理中にエラーが発生しました: {e}")
+            return
+
+        if new_page_hashes is not None:
+            if self._page_hash_job is not None:
+                self.after_cancel(self._page_hash_job)
+                self._page_hash_job = None
+            self.page_hashes = new_page_hashes
+        else:
+            self._start_page_hashes()
+        self._cancel_pending_zoom()
+        self.async_renderer.set_document(session.filepath)
+        self.builder.widgets.canvas.delete("all")
+        self.continuous_view.clear()
+        self._load_results(session)
+
+        # 選択中の項目を更新後の抽出結果で選択し直す。ページが変わった場合は、
+        # 同じページで選択中の領域と最も重なる項目を選ぶ
+        index = None
+        if selected is not None:
+            new_selected = reused.get(selected)
+            if new_selected is None and selected.page_num < self.doc.page_count:
+                candidates = [(i, rect) for i, rect in self.hits_by_page.get(selected.page_num, [])
+                              if rect.intersects(selected.rect)]
+                if candidates:
+                    index = max(candidates, key=lambda c: abs(c[1] & selected.rect))[0]
+            elif new_selected is not None:
+                index = self.highlights.index(new_selected)
+
+        if self.doc.page_count > 0:
+            if index is not None:
+                current_page_num = self.highlights[index].page_num
+            self.current_page_num = min(max(current_page_num, 0), self.doc.page_count - 1)
+            self.display_page(self.current_page_num)
+            if index is not None:
+                listbox.select_set(index)
+                listbox.see(index)
+                highlight = self.highlights[index]
+                self.draw_highlight_rect(highlight.rect, highlight.page_num)
+        else:
+            self.current_page_num = -1
+        self.builder.widgets.status_bar.config(
+            text=f"ファイルの更新を反映しました ({len(changed_pages)}ページを抽出し直しました)")
+
+    def _highlight_label(self, index):
+        """リストボックスに表示する項目の文字列を返します。
+
+        リストボックスは表示範囲の行についてのみ、この関数を呼び出します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            index (int): ハイライトのインデックス。
+
+        Returns:
+            str: 表示用の文字列。
+        """
+        highlight = self.highlights[index]
+        label = f"項目 {index+1} (Page {highlight.page_num + 1})"
+        if highlight.color_class:
+            label = f"{label} [{highlight.color_class}]"
+        text = " ".join(highlight.text.split())
+        if not text:
+            return label
+        if len(text) > self.LABEL_TEXT_LENGTH:
+            text = text[:self.LABEL_TEXT_LENGTH] + "…"
+        return f"{label} {text}"
+
+    def find_next_highlight(self):
+        """検索欄の文字列を含む次の項目を選択します。
+
+        現在の選択位置の次の項目から順に、抽出時に取得した各項目の文字列を
+        大文字と小文字を区別せずに検索し、末尾まで見つからなければ先頭に戻ります。
+        """
+        query = self.search_var.get().strip().casefold()
+        if not query or not self.highlights:
+            return
+        listbox = self.builder.widgets.listbox
+        selection = listbox.curselection()
+        start = selection[0] + 1 if selection else 0
+        count = len(self.highlights)
+        for offset in range(count):
+            index = (start + offset) % count
+            if query in self.highlights[index].text.casefold():
+                listbox.select_set(index)
+                listbox.see(index)
+                self.on_highlight_selected(None)
+                return
+        self.builder.widgets.status_bar.config(text=f"「{self.search_var.get().strip()}」は見つかりませんでした。")
+
+    def toggle_group_by_page(self):
+        """リストボックスのページごとのグループ表示を切り替えます。
+        """
+        self.builder.widgets.listbox.set_grouped(self.group_by_page_var.get())
+
     def on_highlight_selected(self, event):
         """リストボックスで項目が選択されたときに呼び出されるイベントハンドラ。
 
@@ -189,8 +598,8 @@ class MainWindow(tk.Tk):
                 self.current_page_num = highlight.page_num
                 self.display_page(self.current_page_num)
             
-            self.draw_highlight_rect(highlight.rect)
-            self.scroll_to_rect(highlight.rect)
+            self.draw_highlight_rect(highlight.rect, highlight.page_num)
+            self.scroll_to_rect(highlight.rect, highlight.page_num)
 
         self.after(1, _update_display)
 
@@ -199,6 +608,9 @@ class MainWindow(tk.Tk):
 
         ページの画像がキャッシュにあればそれを使用し、なければ新しく
         レンダリングして表示します。表示倍率(scale)も考慮されます。
+        連続スクロールモードでは、そのページの先頭までスクロールします。
+        キャッシュは `MAX_CACHED_PAGES` ページまで保持され、溢れたページの
+        PhotoImageは次のレンダリングで再利用されます。
 
         Args:
             page_num (int): 表示するページの番号 (0-indexed)。
@@ -206,38 +618,171 @@ class MainWindow(tk.Tk):
         if self.doc is None:
             return
 
-        if page_num not in self.page_images:
-            pix = self.doc[page_num].get_pixmap(matrix=fitz.Matrix(self.scale, self.scale))
-            self.page_images[page_num] = tk.PhotoImage(data=pix.tobytes("ppm"))
-        
-        self.builder.widgets.canvas.delete("all")
-        self.builder.widgets.canvas.create_image(0, 0, anchor=tk.NW, image=self.page_images[page_num])
-        self.builder.widgets.canvas.config(scrollregion=self.builder.widgets.canvas.bbox("all"))
+        if self.continuous_var.get():
+            if not self.continuous_view.loaded:
+                self.continuous_view.load(self.doc, self.scale, self.highlights)
+            self.continuous_view.scroll_to_page(page_num)
+            self.builder.widgets.scale_label.config(text=f"{self.scale*100:.0f}%")
+            self.builder.widgets.thumbnail_strip.set_current_page(page_num)
+            return
+
+        # ここで同期的に描画するので、ズーム後の再レンダリング待ちは不要になる
+        self._cancel_pending_zoom()
+        if page_num in self.page_images:
+            self.page_images.move_to_end(page_num)
+        else:
+            # キャッシュが上限に達したら最も古いページのPhotoImageを再利用する
+            recycled = None
+            if len(self.page_images) >= self.MAX_CACHED_PAGES:
+                _, recycled = self.page_images.popitem(last=False)
+            self.page_images[page_num] = renderer.render_page_to_photo(
+                self.doc[page_num], self.scale, photo=recycled)
+
+        canvas = self.builder.widgets.canvas
+        canvas.delete("page_image")
+        canvas.create_image(0, 0, anchor=tk.NW, image=self.page_images[page_num], tags="page_image")
+        canvas.tag_lower("page_image")
+
+        # ページが変わったときだけ枠を描き直し、倍率の変更では枠を変換する
+        if self.page_overlay.page_num != page_num:
+            canvas.delete("highlight_rect")
+            self.page_overlay.draw(page_num, self.hits_by_page.get(page_num, []), (0, 0), self.scale,
+                                   self.doc[page_num].rotation_matrix)
+        elif self.page_overlay.scale != self.scale:
+            self.page_overlay.rescale((0, 0), self.scale)
+        canvas.config(scrollregion=canvas.bbox("page_image"))
         self.builder.widgets.scale_label.config(text=f"{self.scale*100:.0f}%")
+        self.builder.widgets.thumbnail_strip.set_current_page(page_num)
+
+    def show_page(self, page_num):
+        """指定されたページに移動して、ページの先頭から表示します。
+
+        サムネイルがクリックされたときに呼び出されます。選択中の領域が
+        そのページにある場合は、赤枠も描画します。
+
+        Args:
+            page_num (int): 表示するページの番号 (0-indexed)。
+        """
+        if self.doc is None:
+            return
+        self.current_page_num = page_num
+        self.display_page(page_num)
+        if not self.continuous_var.get():
+            self.builder.widgets.canvas.yview_moveto(0)
+        selection = self.builder.widgets.listbox.curselection()
+        if selection and self.highlights[selection[0]].page_num == page_num:
+            self.draw_highlight_rect(self.highlights[selection[0]].rect, page_num)
+
+    def _start_thumbnails(self, filepath, hash_future=None):
+        """サムネイルパネルを初期化し、バックグラウンドでのサムネイル生成を開始します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            filepath (str): PDFファイルのパス。
+            hash_future (Future[str], optional): ドキュメントのセッションで計算中の
+                ファイルのハッシュ値。
+        """
+        if self.thumbnail_builder is not None:
+            self.thumbnail_builder.cancel()
+        page_sizes = []
+        for page_num in range(self.doc.page_count):
+            rect = self.doc[page_num].rect
+            page_sizes.append((rect.width, rect.height))
+        hit_counts = Counter(h.page_num for h in self.highlights)
+        self.builder.widgets.thumbnail_strip.load(page_sizes, THUMBNAIL_SCALE, hit_counts)
+
+        self.thumbnail_builder = ThumbnailBuilder(filepath, self.doc.page_count, self.thumbnail_cache,
+                                                  hash_future=hash_future)
+        self.thumbnail_builder.start()
+        self._poll_thumbnails(self.thumbnail_builder)
+
+    def _poll_thumbnails(self, builder):
+        """完成したサムネイルをパネルに反映し、未完了なら再度ポーリングを予約します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            builder (ThumbnailBuilder): ポーリング対象のビルダー。
+        """
+        if builder is not self.thumbnail_builder:
+            return
+        try:
+            for page_num, png in builder.poll():
+                self.builder.widgets.thumbnail_strip.set_thumbnail(page_num, png)
+        except Exception as e:
+            builder.cancel()
+            self.builder.widgets.status_bar.config(text=f"サムネイルの生成に失敗しました: {e}")
+            return
+        if not builder.done:
+            self.after(100, self._poll_thumbnails, builder)
+
+    def _page_origin(self, page_num):
+        """ページ左上のキャンバス座標を返します。
+
+        通常のモードでは常に原点、連続スクロールモードではページの配置位置です。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            page_num (int | None): ページ番号 (0-indexed)。
+
+        Returns:
+            tuple[int, int]: キャンバス上のx座標とy座標。
+        """
+        if page_num is None or not self.continuous_view.loaded:
+            return (0, 0)
+        return self.continuous_view.page_origin(page_num)
+
+    def _display_rect(self, rect, page_num):
+        """回転前のページ座標の矩形を、表示上のページ座標に変換します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            rect (fitz.Rect): 回転前のページ座標の矩形。
+            page_num (int | None): 矩形のあるページ番号。Noneの場合は変換しません。
+
+        Returns:
+            fitz.Rect: レンダリングしたページの画像上の位置 (倍率1のとき) の矩形。
+        """
+        if page_num is None or self.doc is None:
+            return rect
+        return rect * self.doc[page_num].rotation_matrix
 
-    def draw_highlight_rect(self, rect):
+    def draw_highlight_rect(self, rect, page_num=None):
         """指定された矩形領域にハイライト用の赤枠を描画します。
 
         既存の赤枠がある場合は一度削除してから、新しい枠を描画します。
 
         Args:
-            rect (fitz.Rect): 赤枠を描画する座標。
+            rect (fitz.Rect): 赤枠を描画する座標 (回転前のページ座標)。
+            page_num (int, optional): 矩形のあるページ番号。回転したページでの
+                表示上の位置と、連続スクロールモードでのページの配置位置を
+                求めるために使います。
         """
+        rect = self._display_rect(rect, page_num)
+        x, y = self._page_origin(page_num)
         self.builder.widgets.canvas.delete("highlight_rect")
         self.builder.widgets.canvas.create_rectangle(
-            rect.x0 * self.scale, rect.y0 * self.scale,
-            rect.x1 * self.scale, rect.y1 * self.scale,
+            x + rect.x0 * self.scale, y + rect.y0 * self.scale,
+            x + rect.x1 * self.scale, y + rect.y1 * self.scale,
             outline="red", width=self.settings.highlight_border_width, tags="highlight_rect"
         )
 
-    def scroll_to_rect(self, rect):
+    def scroll_to_rect(self, rect, page_num=None):
         """指定された矩形領域がプレビュー画面の中央に来るようにスクロールします。
 
         Args:
             rect (fitz.Rect): スクロール先の目標となる座標。
+            page_num (int, optional): 矩形のあるページ番号。
         """
         canvas_height = self.builder.widgets.canvas.winfo_height()
-        y_pos = rect.y0 * self.scale
+        y_pos = self._page_origin(page_num)[1] + self._display_rect(rect, page_num).y0 * self.scale
         scroll_region = self.builder.widgets.canvas.bbox("all")
         if scroll_region and scroll_region[3] > 0:
             total_height = scroll_region[3]
@@ -259,10 +804,13 @@ class MainWindow(tk.Tk):
             messagebox.showerror("内部エラー", f"不明なエクスポート形式です: {format_str}")
             return
 
+        from ..export.exporter import Exporter
         exporter = Exporter(
             doc=self.doc,
             highlights=self.highlights,
-            app_settings=self.settings
+            app_settings=self.settings,
+            job_queue=self.export_jobs,
+            filepath=self.documents.filepath
         )
         exporter.export_selected(export_format=export_format, listbox=self.builder.widgets.listbox)
 
@@ -276,34 +824,282 @@ class MainWindow(tk.Tk):
             messagebox.showerror("内部エラー", f"不明なエクスポート形式です: {format_str}")
             return
             
+        from ..export.exporter import Exporter
         exporter = Exporter(
             doc=self.doc,
             highlights=self.highlights,
-            app_settings=self.settings
+            app_settings=self.settings,
+            job_queue=self.export_jobs,
+            filepath=self.documents.filepath
         )
         exporter.export_all(export_format=export_format)
         
     def zoom_in(self):
         """PDFプレビューの表示倍率を上げて再描画します。
         """
-        if not self.doc or self.current_page_num == -1: return
-        if self.scale >= 5.0: return
-        self.scale += 0.1
-        self.page_images.clear()
-        self.display_page(self.current_page_num)
-        if self.highlights and self.builder.widgets.listbox.curselection():
-            self.draw_highlight_rect(self.highlights[self.builder.widgets.listbox.curselection()[0]].rect)
+        self.request_zoom(self.scale + 0.1)
 
     def zoom_out(self):
         """PDFプレビューの表示倍率を下げて再描画します。
         """
+        self.request_zoom(self.scale - 0.1)
+
+    def request_zoom(self, scale):
+        """表示倍率の変更を要求します。
+
+        現在の画像を拡大縮小した仮の画像をすぐに表示し、新しい倍率での
+        レンダリングは、ズーム操作が `ZOOM_DEBOUNCE_MS` ミリ秒途切れた
+        時点で1回だけワーカープロセスに要求します。
+
+        Args:
+            scale (float): 新しい表示倍率。範囲外の値は丸められます。
+        """
         if not self.doc or self.current_page_num == -1: return
-        if self.scale <= 0.2: return
-        self.scale -= 0.1
-        self.page_images.clear()
-        self.display_page(self.current_page_num)
-        if self.highlights and self.builder.widgets.listbox.curselection():
-            self.draw_highlight_rect(self.highlights[self.builder.widgets.listbox.curselection()[0]].rect)
+        scale = round(min(max(scale, self.MIN_SCALE), self.MAX_SCALE), 2)
+        if scale == self.scale: return
+        self.scale = scale
+        self.builder.widgets.scale_label.config(text=f"{self.scale*100:.0f}%")
+        self._show_zoom_placeholder()
+
+        if self._zoom_job is not None:
+            self.after_cancel(self._zoom_job)
+        self._zoom_job = self.after(self.ZOOM_DEBOUNCE_MS, self._render_after_zoom)
+
+    def _show_zoom_placeholder(self):
+        """現在の画像と枠を新しい倍率に合わせて拡大縮小し、仮表示します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        canvas = self.builder.widgets.canvas
+        x_fraction, y_fraction = canvas.xview()[0], canvas.yview()[0]
+        if self.continuous_var.get():
+            self.continuous_view.set_scale(self.scale)
+        else:
+            self.async_renderer.cancel("single")
+            photo = self._zoom_placeholder or self.page_images.get(self.current_page_num)
+            self.page_images.clear()
+            rect = self.doc[self.current_page_num].rect
+            width, height = int(rect.width * self.scale), int(rect.height * self.scale)
+            if photo is not None:
+                self._zoom_placeholder = renderer.scale_photo(photo, width, height)
+                canvas.itemconfigure("page_image", image=self._zoom_placeholder)
+            self.page_overlay.rescale((0, 0), self.scale)
+            canvas.config(scrollregion=(0, 0, width, height))
+        canvas.xview_moveto(x_fraction)
+        canvas.yview_moveto(y_fraction)
+        self._redraw_selected_rect()
+
+    def _render_after_zoom(self):
+        """ズーム操作が途切れた後に、新しい倍率でのレンダリングを要求します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        self._zoom_job = None
+        if self.continuous_var.get():
+            self.continuous_view.resume()
+            return
+        page_num, scale = self.current_page_num, self.scale
+        self.async_renderer.request(
+            "single", page_num, scale,
+            lambda *result: self._on_zoom_rendered(page_num, scale, *result))
+
+    def _cancel_pending_zoom(self):
+        """ズーム後の再レンダリングの予約と要求を取り消します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if self._zoom_job is not None:
+            self.after_cancel(self._zoom_job)
+            self._zoom_job = None
+        self.async_renderer.cancel("single")
+        self._zoom_placeholder = None
+
+    def _on_zoom_rendered(self, page_num, scale, width, height, stride, samples):
+        """新しい倍率でのレンダリング結果で、仮表示の画像を置き換えます。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if scale != self.scale or self.continuous_var.get():
+            return
+        photo = renderer.samples_to_photo(width, height, stride, samples, photo=self._zoom_placeholder)
+        self._zoom_placeholder = None
+        self.page_images[page_num] = photo
+        if page_num == self.current_page_num:
+            canvas = self.builder.widgets.canvas
+            canvas.itemconfigure("page_image", image=photo)
+            canvas.config(scrollregion=canvas.bbox("page_image"))
+
+    def _redraw_selected_rect(self):
+        """選択中の領域の赤枠を、現在の倍率で描き直します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        selection = self.builder.widgets.listbox.curselection()
+        if self.highlights and selection:
+            highlight = self.highlights[selection[0]]
+            self.draw_highlight_rect(highlight.rect, highlight.page_num)
+
+    def _on_zoom_wheel(self, event):
+        """Ctrl+マウスホイールで表示倍率を変更します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            event (tk.Event): マウスホイールイベント。
+        """
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.zoom_in()
+        elif event.num == 5 or getattr(event, "delta", 0) < 0:
+            self.zoom_out()
+
+    def cancel_export(self):
+        """実行中のエクスポートジョブをキャンセルします。
+        """
+        if not self.export_jobs.cancel_current():
+            self.builder.widgets.status_bar.config(text="実行中のエクスポートはありません。")
+
+    def _on_export_progress(self, job, pending_count):
+        """エクスポートジョブの進捗をステータスバーに表示します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            job (ExportJob | None): 実行中のジョブ。
+            pending_count (int): 待機中のジョブ数。
+        """
+        if job is None:
+            if pending_count:
+                self.builder.widgets.status_bar.config(text=f"エクスポート待機中 ({pending_count}件)")
+            return
+        text = f"{job.title}中: {job.done}/{job.total}件, {job.bytes_written / (1024 * 1024):.1f}MB"
+        eta = job.eta()
+        if eta is not None:
+            minutes, seconds = divmod(int(eta), 60)
+            text += f", 残り約{minutes}分{seconds:02d}秒" if minutes else f", 残り約{seconds}秒"
+        if pending_count:
+            text += f" (待機中 {pending_count}件)"
+        self.builder.widgets.status_bar.config(text=text)
+
+    def _on_export_finished(self, job):
+        """エクスポートジョブの結果を表示します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            job (ExportJob): 終了したジョブ。
+        """
+        if job.status is ExportJobStatus.CANCELLED:
+            self.builder.widgets.status_bar.config(text=f"{job.title}を中止しました。")
+        elif job.status is ExportJobStatus.FAILED:
+            self.builder.widgets.status_bar.config(text=f"{job.title}に失敗しました。")
+            messagebox.showerror("エクスポートエラー", f"{job.error_message}:\n{job.error}")
+        else:
+            self.builder.widgets.status_bar.config(text=f"{job.title}が完了しました。")
+            messagebox.showinfo("成功", job.message)
+
+    def _on_render_error(self, error):
+        """バックグラウンドでのレンダリングに失敗したことをステータスバーに表示します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            error (Exception): 発生した例外。
+        """
+        self.builder.widgets.status_bar.config(text=f"プレビューの描画に失敗しました: {error}")
+
+    def toggle_continuous(self):
+        """連続スクロールモードと1ページ表示モードを切り替えます。
+        """
+        if self.doc is None:
+            return
+        self._cancel_pending_zoom()
+        self.builder.widgets.canvas.delete("all")
+        self.continuous_view.clear()
+        self.page_overlay.clear()
+        page_num = max(self.current_page_num, 0)
+        if self.continuous_var.get():
+            self.continuous_view.load(self.doc, self.scale, self.highlights)
+        self.current_page_num = page_num
+        self.display_page(page_num)
+        selection = self.builder.widgets.listbox.curselection()
+        if self.highlights and selection:
+            highlight = self.highlights[selection[0]]
+            if highlight.page_num == page_num:
+                self.draw_highlight_rect(highlight.rect, highlight.page_num)
+                self.scroll_to_rect(highlight.rect, highlight.page_num)
+
+    def _refresh_continuous_view(self):
+        """連続スクロールモードであれば、表示範囲のページ更新を予約します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if self.continuous_view.loaded:
+            self.continuous_view.schedule_refresh()
+
+    def _on_canvas_yscroll(self, first, last):
+        """キャンバスの縦スクロールに合わせてスクロールバーと連続表示を更新します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            first (str): 表示範囲の先頭の割合。
+            last (str): 表示範囲の末尾の割合。
+        """
+        self.builder.widgets.canvas_vsb.set(first, last)
+        self._refresh_continuous_view()
+
+    def _on_continuous_page_change(self, page_num):
+        """連続スクロールで表示中のページが変わったときに、現在のページを更新します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            page_num (int): 表示範囲の中央にあるページ番号 (0-indexed)。
+        """
+        self.current_page_num = page_num
+        self.builder.widgets.thumbnail_strip.set_current_page(page_num)
+
+    def _on_canvas_click(self, event):
+        """キャンバスがクリックされたときに、カーソル位置の抽出結果を選択します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Args:
+            event (tk.Event): マウスクリックイベント。
+        """
+        canvas = self.builder.widgets.canvas
+        x, y = canvas.canvasx(event.x), canvas.canvasy(event.y)
+        if self.continuous_view.loaded:
+            index = self.continuous_view.hit_at(x, y)
+        else:
+            index = self.page_overlay.hit_at(x, y)
+        if index is not None:
+            self.select_highlight(index)
+
+    def select_highlight(self, index):
+        """指定された抽出結果をリストボックスで選択し、プレビューに表示します。
+
+        Args:
+            index (int): 抽出結果のインデックス。
+        """
+        listbox = self.builder.widgets.listbox
+        listbox.selection_clear(0, tk.END)
+        listbox.select_set(index)
+        listbox.see(index)
+        self.on_highlight_selected(None)
 
     def update_extract_button_state(self):
         """抽出ボタンの有効/無効状態を、現在の抽出条件に応じて更新します。
@@ -366,6 +1162,20 @@ class MainWindow(tk.Tk):
         """
         AppSettingsWindow(self, self.settings)
 
+    def on_close(self):
+        """ウィンドウが閉じる際に、バックグラウンド処理を停止してから破棄します。
+        """
+        for job in (self._watch_job, self._page_hash_job):
+            if job is not None:
+                self.after_cancel(job)
+        if self.thumbnail_builder is not None:
+            self.thumbnail_builder.cancel()
+        self.async_renderer.shutdown()
+        self.export_jobs.on_finished = None
+        self.export_jobs.shutdown()
+        self.documents.shutdown()
+        self.destroy()
+
 
 if __name__ == '__main__':
     app = MainWindow()
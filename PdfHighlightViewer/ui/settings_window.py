@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, colorchooser, messagebox
 
+from ..pdf.colors import parse_color_ranges
+
 class SettingsWindow(tk.Toplevel):
     """設定ウィンドウを表示、管理するクラス。"""
     def __init__(self, parent, settings):
@@ -15,7 +17,7 @@ class SettingsWindow(tk.Toplevel):
         self.settings = settings
         self.title("抽出条件設定")
         # ウィンドウサイズを広げる
-        self.geometry("520x360") 
+        self.geometry("520x620") 
         self.transient(parent)
         self.grab_set()
 
@@ -27,6 +29,8 @@ class SettingsWindow(tk.Toplevel):
         self.extract_text_color_var = tk.BooleanVar(value=self.settings.extract_text_color)
         self.extract_keyword_var = tk.BooleanVar(value=self.settings.extract_keyword)
         self.extraction_keyword_var = tk.StringVar(value=self.settings.extraction_keyword)
+        self.raster_detection_var = tk.BooleanVar(value=self.settings.raster_highlight_detection)
+        self.auto_reextract_var = tk.BooleanVar(value=self.settings.auto_reextract)
 
         self.h_min_r, self.h_min_g, self.h_min_b = [tk.StringVar(value=v) for v in self.settings.highlight_color_min]
         self.h_max_r, self.h_max_g, self.h_max_b = [tk.StringVar(value=v) for v in self.settings.highlight_color_max]
@@ -63,6 +67,21 @@ class SettingsWindow(tk.Toplevel):
                                                                (self.t_max_r, self.t_max_g, self.t_max_b))
         self.text_color_frame.grid(row=1, column=1, padx=10, pady=5)
 
+        # 名前付きの色範囲 (指定した場合は上のRGB範囲の代わりに使う)
+        ranges_frame = ttk.LabelFrame(main_frame, text="名前付きの色範囲 (1行に1つ、指定した場合は上の範囲の代わりに使用)")
+        ranges_frame.pack(pady=5, padx=5, fill=tk.BOTH, expand=True)
+        ranges_frame.columnconfigure(1, weight=1)
+        ttk.Label(ranges_frame, text="例: 黄: rgb 200-255 200-255 0-50 / 緑: hsv 90-150 30-100 40-100 / "
+                                     "桃: tol #FF80C0 30").grid(row=0, column=0, columnspan=2, sticky=tk.W, padx=5)
+        ttk.Label(ranges_frame, text="ハイライト:").grid(row=1, column=0, sticky=tk.NW, padx=5, pady=2)
+        self.highlight_ranges_text = tk.Text(ranges_frame, height=4, width=40)
+        self.highlight_ranges_text.grid(row=1, column=1, sticky=tk.EW, padx=5, pady=2)
+        self.highlight_ranges_text.insert("1.0", "\n".join(self.settings.highlight_color_ranges))
+        ttk.Label(ranges_frame, text="文字色:").grid(row=2, column=0, sticky=tk.NW, padx=5, pady=2)
+        self.text_ranges_text = tk.Text(ranges_frame, height=4, width=40)
+        self.text_ranges_text.grid(row=2, column=1, sticky=tk.EW, padx=5, pady=2)
+        self.text_ranges_text.insert("1.0", "\n".join(self.settings.text_color_ranges))
+
         keyword_frame = ttk.Frame(target_frame)
         keyword_frame.grid(row=2, column=0, columnspan=2, sticky=tk.W, padx=10, pady=5)
 
@@ -73,6 +92,16 @@ class SettingsWindow(tk.Toplevel):
         self.keyword_entry = ttk.Entry(keyword_frame, textvariable=self.extraction_keyword_var)
         self.keyword_entry.pack(side=tk.LEFT, expand=True, fill=tk.X)
 
+        self.raster_check = ttk.Checkbutton(
+            target_frame, text="ハイライトが見つからないページを画像として解析 (スキャンしたPDFの蛍光ペン)",
+            variable=self.raster_detection_var)
+        self.raster_check.grid(row=3, column=0, columnspan=2, sticky=tk.W, padx=10, pady=5)
+
+        self.auto_reextract_check = ttk.Checkbutton(
+            target_frame, text="ファイルが更新されたら、変更されたページを自動で抽出し直す",
+            variable=self.auto_reextract_var)
+        self.auto_reextract_check.grid(row=4, column=0, columnspan=2, sticky=tk.W, padx=10, pady=5)
+
         # ボタン
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(pady=10, anchor="e")
@@ -155,23 +184,39 @@ class SettingsWindow(tk.Toplevel):
         state = tk.NORMAL if self.extract_highlights_var.get() else tk.DISABLED
         for child in self.highlight_color_frame.winfo_children():
             child.configure(state=state)
+        self.highlight_ranges_text.configure(state=state)
+        self.raster_check.configure(state=state)
         
         state = tk.NORMAL if self.extract_text_color_var.get() else tk.DISABLED
         for child in self.text_color_frame.winfo_children():
             child.configure(state=state)
+        self.text_ranges_text.configure(state=state)
 
     def save_settings(self):
         """UIの現在の状態をSettingsオブジェクトに保存し、ファイルを更新します。"""
+        highlight_ranges = self._range_lines(self.highlight_ranges_text)
+        text_ranges = self._range_lines(self.text_ranges_text)
+        try:
+            parse_color_ranges(highlight_ranges)
+            parse_color_ranges(text_ranges)
+        except ValueError as e:
+            messagebox.showerror("入力エラー", f"名前付きの色範囲が正しくありません:\n{e}")
+            return
+
         try:
             self.settings.extract_highlights = self.extract_highlights_var.get()
             self.settings.extract_text_color = self.extract_text_color_var.get()
             self.settings.extract_keyword = self.extract_keyword_var.get()
             self.settings.extraction_keyword = self.extraction_keyword_var.get()
+            self.settings.raster_highlight_detection = self.raster_detection_var.get()
+            self.settings.auto_reextract = self.auto_reextract_var.get()
 
             self.settings.highlight_color_min = (int(self.h_min_r.get()), int(self.h_min_g.get()), int(self.h_min_b.get()))
             self.settings.highlight_color_max = (int(self.h_max_r.get()), int(self.h_max_g.get()), int(self.h_max_b.get()))
             self.settings.text_color_min = (int(self.t_min_r.get()), int(self.t_min_g.get()), int(self.t_min_b.get()))
             self.settings.text_color_max = (int(self.t_max_r.get()), int(self.t_max_g.get()), int(self.t_max_b.get()))
+            self.settings.highlight_color_ranges = highlight_ranges
+            self.settings.text_color_ranges = text_ranges
 
             self.settings.save()
             self.on_close()
@@ -180,6 +225,10 @@ class SettingsWindow(tk.Toplevel):
         except Exception as e:
             messagebox.showerror("保存エラー", f"設定の保存中にエラーが発生しました:\n{e}")
 
+    def _range_lines(self, text_widget):
+        """テキスト欄に入力された色範囲の定義を、空でない行のリストとして返します。"""
+        return [line.strip() for line in text_widget.get("1.0", tk.END).splitlines() if line.strip()]
+
     def on_close(self):
         """ウィンドウが閉じる際の処理を定義します。
 
@@ -0,0 +1,203 @@
+import tkinter as tk
+from tkinter import ttk
+from bisect import bisect_right
+
+class ThumbnailStrip(ttk.Frame):
+    """ページのサムネイルと、ページごとの検出件数を縦に並べて表示するパネル。
+
+    サムネイルのPNGデータは受け取った時点ではPhotoImageに変換せず、
+    表示範囲の付近に入ったページだけPhotoImageを生成し、範囲外に出た
+    ページのPhotoImageは解放します。
+    """
+
+    PADDING = 8
+    LABEL_HEIGHT = 16
+    MARKER_WIDTH = 8
+    CURRENT_COLOR = "#3399ff"
+
+    def __init__(self, master, width=150, **kwargs):
+        """ThumbnailStripオブジェクトを初期化します。
+
+        Args:
+            master (tk.Widget): 親ウィジェット。
+            width (int, optional): サムネイル領域の初期の表示幅 (ピクセル)。
+            **kwargs: ttk.Frameに渡すオプション。
+        """
+        super().__init__(master, **kwargs)
+        self.on_page_click = None
+
+        self.canvas = tk.Canvas(self, bg="gray", width=width + self.MARKER_WIDTH + self.PADDING * 3,
+                                highlightthickness=0)
+        self.vsb = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_canvas_scroll)
+        self.vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self._slot_tops = []
+        self._thumb_sizes = []
+        self._total_height = 0
+        self._png = {}
+        self._photos = {}
+        self._image_items = {}
+        self._current_page = None
+        self._refresh_job = None
+
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<Configure>", lambda e: self._schedule_refresh())
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+
+    def load(self, page_sizes, scale, hit_counts):
+        """ページのレイアウトと検出件数のマーカーを配置します。
+
+        サムネイル画像は後から `set_thumbnail` で追加します。
+
+        Args:
+            page_sizes (list[tuple[float, float]]): 各ページの幅と高さ (ポイント)。
+            scale (float): サムネイルのレンダリング倍率。
+            hit_counts (dict[int, int]): ページ番号ごとの検出件数。
+        """
+        self.clear()
+        max_hits = max(hit_counts.values(), default=0)
+        max_width = max((int(w * scale) for w, _ in page_sizes), default=0)
+        x0 = self.PADDING
+        marker_x = x0 + max_width + self.PADDING // 2
+        y = self.PADDING
+        for page_num, (w, h) in enumerate(page_sizes):
+            thumb_w, thumb_h = int(w * scale), int(h * scale)
+            self._slot_tops.append(y)
+            self._thumb_sizes.append((thumb_w, thumb_h))
+            self.canvas.create_rectangle(x0, y, x0 + thumb_w, y + thumb_h,
+                                         fill="white", outline="", tags="placeholder")
+            hits = hit_counts.get(page_num, 0)
+            if hits:
+                # 検出件数が多いページほど濃い赤で表示する
+                red = int(255 * (0.3 + 0.7 * hits / max_hits))
+                self.canvas.create_rectangle(marker_x, y, marker_x + self.MARKER_WIDTH, y + thumb_h,
+                                             fill=f"#{red:02x}0000", outline="", tags="marker")
+            label = f"{page_num + 1}" + (f" ({hits}件)" if hits else "")
+            self.canvas.create_text(x0 + thumb_w / 2, y + thumb_h + self.LABEL_HEIGHT / 2,
+                                    text=label, fill="white", tags="label")
+            y += thumb_h + self.LABEL_HEIGHT + self.PADDING
+        self._total_height = y
+        self.canvas.configure(scrollregion=(0, 0, marker_x + self.MARKER_WIDTH + self.PADDING, y),
+                              width=marker_x + self.MARKER_WIDTH + self.PADDING)
+        self.canvas.yview_moveto(0)
+        self._schedule_refresh()
+
+    def clear(self):
+        """すべてのサムネイルとレイアウトを破棄します。"""
+        self.canvas.delete("all")
+        self._slot_tops = []
+        self._thumb_sizes = []
+        self._total_height = 0
+        self._png.clear()
+        self._photos.clear()
+        self._image_items.clear()
+        self._current_page = None
+
+    def set_thumbnail(self, page_num, png):
+        """ページのサムネイル画像を設定します。
+
+        Args:
+            page_num (int): ページ番号 (0-indexed)。
+            png (bytes): サムネイルのPNGデータ。
+        """
+        if not (0 <= page_num < len(self._slot_tops)):
+            return
+        self._png[page_num] = png
+        self._schedule_refresh()
+
+    def set_current_page(self, page_num):
+        """現在表示中のページを枠で強調します。
+
+        Args:
+            page_num (int): ページ番号 (0-indexed)。
+        """
+        self.canvas.delete("current")
+        self._current_page = page_num
+        if not (0 <= page_num < len(self._slot_tops)):
+            return
+        y = self._slot_tops[page_num]
+        x0 = self.PADDING
+        thumb_w, thumb_h = self._thumb_sizes[page_num]
+        self.canvas.create_rectangle(x0 - 3, y - 3, x0 + thumb_w + 3, y + thumb_h + 3,
+                                     outline=self.CURRENT_COLOR, width=3, tags="current")
+        # 表示範囲の外にある場合は、そのページが見えるようにスクロールする
+        top, bottom = self.canvas.yview()
+        total = self._total_height
+        if not (top * total <= y and y + thumb_h <= bottom * total):
+            self.canvas.yview_moveto(max(0, (y - self.PADDING) / total))
+
+    def _schedule_refresh(self):
+        """表示範囲のサムネイル更新を、アイドル時に1回だけ実行するよう予約します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if self._refresh_job is None:
+            self._refresh_job = self.after_idle(self._refresh_visible)
+
+    def _refresh_visible(self):
+        """表示範囲付近のページだけPhotoImageを生成し、それ以外は解放します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        self._refresh_job = None
+        if not self._slot_tops:
+            return
+        height = self.canvas.winfo_height()
+        top = self.canvas.canvasy(0) - height
+        bottom = self.canvas.canvasy(height) + height
+        first = max(0, bisect_right(self._slot_tops, top) - 1)
+        last = bisect_right(self._slot_tops, bottom)
+        visible = set(range(first, last))
+
+        for page_num in list(self._photos):
+            if page_num not in visible:
+                self.canvas.delete(self._image_items.pop(page_num))
+                del self._photos[page_num]
+
+        for page_num in visible:
+            if page_num in self._photos or page_num not in self._png:
+                continue
+            photo = tk.PhotoImage(data=self._png[page_num])
+            self._photos[page_num] = photo
+            self._image_items[page_num] = self.canvas.create_image(
+                self.PADDING, self._slot_tops[page_num], anchor=tk.NW, image=photo, tags="thumbnail")
+        self.canvas.tag_raise("current")
+
+    def _on_canvas_scroll(self, first, last):
+        """スクロールバーを更新し、表示範囲のサムネイル更新を予約します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        self.vsb.set(first, last)
+        self._schedule_refresh()
+
+    def _on_click(self, event):
+        """クリックされたサムネイルのページ番号を `on_page_click` に通知します。
+
+        Args:
+            event (tk.Event): マウスクリックイベント。
+        """
+        if not self._slot_tops or self.on_page_click is None:
+            return
+        y = self.canvas.canvasy(event.y)
+        page_num = bisect_right(self._slot_tops, y) - 1
+        if 0 <= page_num < len(self._slot_tops):
+            self.on_page_click(page_num)
+
+    def _on_mousewheel(self, event):
+        """マウスホイールでスクロールします。
+
+        Args:
+            event (tk.Event): マウスホイールイベント。
+        """
+        if self.tk.call("tk", "windowingsystem") == "win32":
+            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+        else:
+            self.canvas.yview_scroll(int(-1 * event.delta), "units")
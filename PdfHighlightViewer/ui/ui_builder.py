@@ -2,6 +2,9 @@ import tkinter as tk
 from tkinter import ttk
 from dataclasses import dataclass
 
+from .virtual_listbox import VirtualListbox
+from .thumbnail_strip import ThumbnailStrip
+
 @dataclass
 class UIWidgets:
     """アプリケーションのUIウィジェットを保持するデータクラス。"""
@@ -16,13 +19,19 @@ class UIWidgets:
     entry_filepath: ttk.Entry = None
     # リストボックスパネル
     list_label: ttk.Label = None
-    listbox: tk.Listbox = None
+    group_check: ttk.Checkbutton = None
+    entry_search: ttk.Entry = None
+    btn_search: ttk.Button = None
+    listbox: VirtualListbox = None
     listbox_sby: ttk.Scrollbar = None
+    # サムネイルパネル
+    thumbnail_strip: ThumbnailStrip = None
     # ビューアパネル
     viewer_label: ttk.Label = None
     zoom_out_btn: ttk.Button = None
     scale_label: ttk.Label = None
     zoom_in_btn: ttk.Button = None
+    continuous_check: ttk.Checkbutton = None
     canvas: tk.Canvas = None
     canvas_vsb: ttk.Scrollbar = None
     canvas_hsb: ttk.Scrollbar = None
@@ -96,7 +105,7 @@ class UIBuilder:
         self.widgets.entry_filepath = entry_filepath
 
     def _create_content_panels(self, parent):
-        """リストボックスとPDFビューアを含むメインコンテンツパネルを生成します。
+        """リストボックス、サムネイル、PDFビューアを含むメインコンテンツパネルを生成します。
 
         Args:
             parent (tk.Widget): このパネルを配置する親ウィジェット。
@@ -105,6 +114,7 @@ class UIBuilder:
         content_frame.pack(fill=tk.BOTH, expand=True)
 
         self._create_listbox_panel(content_frame)
+        self._create_thumbnail_panel(content_frame)
         self._create_viewer_panel(content_frame)
 
     def _create_listbox_panel(self, parent):
@@ -116,13 +126,28 @@ class UIBuilder:
         list_frame = ttk.Frame(parent, padding=5)
         parent.add(list_frame, weight=1)
 
-        list_label = ttk.Label(list_frame, text="検出された領域:")
-        list_label.pack(anchor=tk.W)
-        
+        list_header = ttk.Frame(list_frame)
+        list_header.pack(fill=tk.X)
+
+        list_label = ttk.Label(list_header, text="検出された領域:")
+        list_label.pack(side=tk.LEFT, anchor=tk.W)
+
+        group_check = ttk.Checkbutton(list_header, text="ページごとにまとめる")
+        group_check.pack(side=tk.RIGHT)
+
+        search_frame = ttk.Frame(list_frame)
+        search_frame.pack(fill=tk.X, pady=(5,0))
+
+        btn_search = ttk.Button(search_frame, text="次を検索")
+        btn_search.pack(side=tk.RIGHT)
+        entry_search = ttk.Entry(search_frame)
+        entry_search.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0,5))
+
         listbox_container = ttk.Frame(list_frame)
         listbox_container.pack(fill=tk.BOTH, expand=True, pady=(5,0))
 
-        listbox = tk.Listbox(listbox_container)
+        # 大量の項目でも表示範囲の行だけを描画する仮想リストボックス
+        listbox = VirtualListbox(listbox_container, relief=tk.SUNKEN, borderwidth=1)
         listbox_sby = ttk.Scrollbar(listbox_container, orient=tk.VERTICAL, command=listbox.yview)
         listbox.configure(yscrollcommand=listbox_sby.set)
         
@@ -130,9 +155,28 @@ class UIBuilder:
         listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         self.widgets.list_label = list_label
+        self.widgets.group_check = group_check
+        self.widgets.entry_search = entry_search
+        self.widgets.btn_search = btn_search
         self.widgets.listbox = listbox
         self.widgets.listbox_sby = listbox_sby
 
+    def _create_thumbnail_panel(self, parent):
+        """ページのサムネイルと検出件数を表示するパネルを生成します。
+
+        Args:
+            parent (tk.PanedWindow): このパネルを追加する親のPanedWindow。
+        """
+        thumbnail_frame = ttk.Frame(parent, padding=5)
+        parent.add(thumbnail_frame, weight=0)
+
+        ttk.Label(thumbnail_frame, text="ページ:").pack(anchor=tk.W)
+
+        thumbnail_strip = ThumbnailStrip(thumbnail_frame)
+        thumbnail_strip.pack(fill=tk.BOTH, expand=True, pady=(5,0))
+
+        self.widgets.thumbnail_strip = thumbnail_strip
+
     def _create_viewer_panel(self, parent):
         """PDFプレビューとコントロールを含むビューアパネルを生成します。
 
@@ -160,6 +204,9 @@ class UIBuilder:
         zoom_in_btn = ttk.Button(zoom_frame, text="+", width=2)
         zoom_in_btn.pack(side=tk.LEFT, padx=5)
 
+        continuous_check = ttk.Checkbutton(preview_controls_frame, text="連続スクロール")
+        continuous_check.pack(side=tk.LEFT)
+
         # --- キャンバス ---
         canvas_container = ttk.Frame(viewer_frame)
         canvas_container.pack(fill=tk.BOTH, expand=True, pady=(5,0))
@@ -177,6 +224,7 @@ class UIBuilder:
         self.widgets.zoom_out_btn = zoom_out_btn
         self.widgets.scale_label = scale_label
         self.widgets.zoom_in_btn = zoom_in_btn
+        self.widgets.continuous_check = continuous_check
         self.widgets.canvas = canvas
         self.widgets.canvas_vsb = canvas_vsb
         self.widgets.canvas_hsb = canvas_hsb
@@ -0,0 +1,440 @@
+import tkinter as tk
+from tkinter import font as tkfont
+from bisect import bisect_right
+from itertools import groupby
+
+class VirtualListbox(tk.Canvas):
+    """表示範囲の行だけを描画する、大量の項目向けのリストボックス。
+
+    項目の文字列は保持せず、描画する行についてのみ `label_func` から
+    取得します。行のCanvasアイテムは表示できる行数分だけ生成され、
+    スクロールのたびに内容を書き換えて再利用されます。
+
+    `curselection`、`select_set`、`<<ListboxSelect>>` イベントなど、
+    tk.Listbox (selectmode=BROWSE) と同じ選択のインターフェースを提供します。
+    グループ化を有効にすると、グループ見出しの行をクリックして
+    項目の表示/非表示を切り替えられます。
+    """
+
+    SELECT_BG = "#3399ff"
+    SELECT_FG = "white"
+    HEADER_BG = "#e8e8e8"
+
+    def __init__(self, master, **kwargs):
+        """VirtualListboxオブジェクトを初期化します。
+
+        Args:
+            master (tk.Widget): 親ウィジェット。
+            **kwargs: tk.Canvasに渡すオプション。`yscrollcommand` も指定できます。
+        """
+        self._yscrollcommand = kwargs.pop("yscrollcommand", None)
+        kwargs.setdefault("bg", "white")
+        kwargs.setdefault("takefocus", True)
+        super().__init__(master, **kwargs)
+
+        # option_add('*Font', ...) で指定されたアプリケーションのフォントに合わせる
+        font_spec = self.option_get("font", "Font") or "TkDefaultFont"
+        self._font = tkfont.Font(root=self, font=font_spec)
+        self._row_height = self._font.metrics("linespace") + 4
+
+        # --- データモデル ---
+        self._count = 0
+        self._label_func = None
+        self._group_key = None
+        self._group_label = None
+        self._group_mode = False
+        self._grouped = False
+        self._groups = []  # [key, 先頭の項目インデックス, 項目数]
+        self._group_item_starts = []
+        self._group_row_starts = []
+        self._expanded = set()
+        self._row_count = 0
+        self._selected = None
+        self._offset = 0
+
+        # 再利用する行アイテム (背景, 文字) のプール
+        self._pool = []
+
+        self.bind("<Configure>", lambda e: self._redraw())
+        self.bind("<Button-1>", self._on_click)
+        self.bind("<MouseWheel>", self._on_mousewheel)
+        self.bind("<Button-4>", lambda e: self.yview_scroll(-3, "units"))
+        self.bind("<Button-5>", lambda e: self.yview_scroll(3, "units"))
+        self.bind("<Up>", lambda e: self._move_selection(-1))
+        self.bind("<Down>", lambda e: self._move_selection(1))
+        self.bind("<Prior>", lambda e: self._move_selection(-self._visible_rows()))
+        self.bind("<Next>", lambda e: self._move_selection(self._visible_rows()))
+        self.bind("<Home>", lambda e: self._move_selection(-self._count))
+        self.bind("<End>", lambda e: self._move_selection(self._count))
+
+    # --- tk.Listbox互換のインターフェース ---
+    def configure(self, cnf=None, **kwargs):
+        """ウィジェットのオプションを設定します。
+
+        `yscrollcommand` はCanvas自身のスクロールではなく、仮想的な
+        スクロール位置の通知に使うため、ここで横取りして保持します。
+        """
+        if cnf and "yscrollcommand" in cnf:
+            cnf = dict(cnf)
+            kwargs["yscrollcommand"] = cnf.pop("yscrollcommand")
+        if "yscrollcommand" in kwargs:
+            self._yscrollcommand = kwargs.pop("yscrollcommand")
+            self._update_scrollbar()
+            if not cnf and not kwargs:
+                return None
+        return super().configure(cnf, **kwargs)
+
+    config = configure
+
+    def curselection(self):
+        """選択中の項目のインデックスをタプルで返します。
+
+        Returns:
+            tuple[int, ...]: 選択中の項目インデックス。未選択の場合は空のタプル。
+        """
+        return () if self._selected is None else (self._selected,)
+
+    def select_set(self, first, last=None):
+        """指定された項目を選択状態にします。
+
+        tk.Listboxと同様に、このメソッドは `<<ListboxSelect>>` を発生させません。
+
+        Args:
+            first (int): 選択する項目のインデックス。
+            last (int, optional): 互換性のための引数。単一選択のため無視されます。
+        """
+        if not (0 <= first < self._count):
+            return
+        self._selected = first
+        self._expand_group_of(first)
+        self._redraw()
+
+    selection_set = select_set
+
+    def selection_clear(self, first=0, last=None):
+        """選択を解除します。
+
+        Args:
+            first (int, optional): 互換性のための引数。
+            last (int, optional): 互換性のための引数。
+        """
+        self._selected = None
+        self._redraw()
+
+    select_clear = selection_clear
+
+    def delete(self, first, last=None):
+        """すべての項目を削除します。
+
+        tk.Listboxの `delete(0, tk.END)` と互換の呼び出しを想定しています。
+        項目は `label_func` から都度生成されるため、部分的な削除はサポートしません。
+
+        Args:
+            first (int): 削除範囲の先頭。
+            last (int | str, optional): 削除範囲の末尾。
+        """
+        self.set_items(0, None)
+
+    def size(self):
+        """項目数を返します。
+
+        Returns:
+            int: 項目数。
+        """
+        return self._count
+
+    def see(self, index):
+        """指定された項目が表示範囲に入るようにスクロールします。
+
+        Args:
+            index (int): 表示する項目のインデックス。
+        """
+        if not (0 <= index < self._count):
+            return
+        self._expand_group_of(index)
+        row_top = self._item_to_row(index) * self._row_height
+        height = self.winfo_height()
+        if row_top < self._offset:
+            self._set_offset(row_top)
+        elif row_top + self._row_height > self._offset + height:
+            self._set_offset(row_top + self._row_height - height)
+
+    def yview(self, *args):
+        """垂直方向のスクロール位置を取得または変更します。
+
+        Scrollbarの `command` から呼び出されることを想定しています。
+
+        Args:
+            *args: `("moveto", fraction)` または `("scroll", number, what)`。
+
+        Returns:
+            tuple[float, float] | None: 引数がない場合、表示範囲の割合。
+        """
+        if not args:
+            return self._fractions()
+        if args[0] == "moveto":
+            self._set_offset(float(args[1]) * self._total_height())
+        elif args[0] == "scroll":
+            self.yview_scroll(int(args[1]), args[2])
+
+    def yview_scroll(self, number, what):
+        """指定された単位で垂直方向にスクロールします。
+
+        Args:
+            number (int): スクロール量。負の値で上方向。
+            what (str): "units" (行単位) または "pages" (ページ単位)。
+        """
+        if what == "pages":
+            step = max(self.winfo_height() - self._row_height, self._row_height)
+        else:
+            step = self._row_height
+        self._set_offset(self._offset + number * step)
+
+    # --- データモデルの設定 ---
+    def set_items(self, count, label_func, group_key=None, group_label=None):
+        """表示する項目を設定します。
+
+        Args:
+            count (int): 項目数。
+            label_func (Callable[[int], str]): 項目インデックスから表示文字列を返す関数。
+            group_key (Callable[[int], Hashable], optional): 項目のグループを返す関数。
+                項目はグループごとに連続して並んでいる必要があります。
+            group_label (Callable[[Hashable, int], str], optional): グループのキーと
+                項目数から見出しの文字列を返す関数。
+        """
+        self._count = count
+        self._label_func = label_func
+        self._group_key = group_key
+        self._group_label = group_label
+        self._selected = None
+        self._offset = 0
+        self._groups = []
+        self._expanded = set()
+        if group_key is not None:
+            start = 0
+            for key, items in groupby(range(count), key=group_key):
+                n = sum(1 for _ in items)
+                self._groups.append([key, start, n])
+                start += n
+        self._group_item_starts = [g[1] for g in self._groups]
+        self._grouped = self._group_mode and bool(self._groups)
+        self._rebuild_rows()
+        self._redraw()
+
+    def set_grouped(self, grouped):
+        """グループ見出しによる表示の有効/無効を切り替えます。
+
+        グループ化した直後は、選択中の項目を含むグループのみが展開されます。
+
+        Args:
+            grouped (bool): グループ化して表示する場合はTrue。
+        """
+        self._group_mode = bool(grouped)
+        self._grouped = self._group_mode and bool(self._groups)
+        self._expanded = set()
+        if self._selected is not None:
+            self._expand_group_of(self._selected)
+        self._rebuild_rows()
+        if self._selected is not None:
+            self.see(self._selected)
+        self._redraw()
+
+    # --- 行と項目の対応付け ---
+    def _rebuild_rows(self):
+        """グループの展開状態から、各グループ見出しの行番号を再計算します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if not self._grouped:
+            self._group_row_starts = []
+            self._row_count = self._count
+            return
+        starts = []
+        row = 0
+        for g, (_, _, n) in enumerate(self._groups):
+            starts.append(row)
+            row += 1 + (n if g in self._expanded else 0)
+        self._group_row_starts = starts
+        self._row_count = row
+
+    def _row_to_item(self, row):
+        """行番号を (種類, 値) に変換します。
+
+        Note:
+            この関数は内部利用を想定しています。
+
+        Returns:
+            tuple[str, int] | None: ("item", 項目インデックス) または
+                ("header", グループインデックス)。範囲外の場合はNone。
+        """
+        if not (0 <= row < self._row_count):
+            return None
+        if not self._grouped:
+            return ("item", row)
+        g = bisect_right(self._group_row_starts, row) - 1
+        offset = row - self._group_row_starts[g]
+        if offset == 0:
+            return ("header", g)
+        return ("item", self._groups[g][1] + offset - 1)
+
+    def _item_to_row(self, index):
+        """項目インデックスを行番号に変換します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if not self._grouped:
+            return index
+        g = bisect_right(self._group_item_starts, index) - 1
+        return self._group_row_starts[g] + 1 + index - self._groups[g][1]
+
+    def _expand_group_of(self, index):
+        """指定された項目を含むグループが折りたたまれていれば展開します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if not self._grouped:
+            return
+        g = bisect_right(self._group_item_starts, index) - 1
+        if g not in self._expanded:
+            self._expanded.add(g)
+            self._rebuild_rows()
+
+    def _toggle_group(self, g):
+        """グループの展開/折りたたみを切り替えます。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        if g in self._expanded:
+            self._expanded.discard(g)
+        else:
+            self._expanded.add(g)
+        self._rebuild_rows()
+        self._set_offset(self._offset)
+
+    # --- スクロールと描画 ---
+    def _total_height(self):
+        """すべての行を並べたときの高さ (ピクセル) を返します。"""
+        return self._row_count * self._row_height
+
+    def _visible_rows(self):
+        """表示範囲に収まる行数を返します。"""
+        return max(1, self.winfo_height() // self._row_height)
+
+    def _fractions(self):
+        """表示範囲の先頭と末尾を、全体に対する割合で返します。"""
+        total = self._total_height()
+        if total <= 0:
+            return (0.0, 1.0)
+        first = self._offset / total
+        last = (self._offset + self.winfo_height()) / total
+        return (first, min(last, 1.0))
+
+    def _set_offset(self, offset):
+        """スクロール位置 (ピクセル) を範囲内に収めて設定し、再描画します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        max_offset = max(0, self._total_height() - self.winfo_height())
+        self._offset = int(max(0, min(offset, max_offset)))
+        self._redraw()
+
+    def _update_scrollbar(self):
+        """`yscrollcommand` に現在の表示範囲を通知します。"""
+        if self._yscrollcommand:
+            first, last = self._fractions()
+            self._yscrollcommand(first, last)
+
+    def _redraw(self):
+        """表示範囲の行だけを、プールした行アイテムを書き換えて描画します。
+
+        Note:
+            この関数は内部利用を想定しています。
+        """
+        height = self.winfo_height()
+        width = self.winfo_width()
+        row_h = self._row_height
+        needed = height // row_h + 2
+        while len(self._pool) < needed:
+            bg = self.create_rectangle(0, 0, 0, 0, width=0)
+            text = self.create_text(0, 0, anchor=tk.W, font=self._font)
+            self._pool.append((bg, text))
+
+        first_row = self._offset // row_h
+        y = first_row * row_h - self._offset
+        for k, (bg, text) in enumerate(self._pool):
+            entry = self._row_to_item(first_row + k) if k < needed else None
+            if entry is None:
+                self.itemconfigure(bg, state=tk.HIDDEN)
+                self.itemconfigure(text, state=tk.HIDDEN)
+            else:
+                kind, value = entry
+                if kind == "header":
+                    key, _, n = self._groups[value]
+                    mark = "▼" if value in self._expanded else "▶"
+                    label = self._group_label(key, n) if self._group_label else f"{key} ({n})"
+                    label = f"{mark} {label}"
+                    fill, fg, x = self.HEADER_BG, "black", 4
+                else:
+                    label = self._label_func(value)
+                    selected = value == self._selected
+                    fill = self.SELECT_BG if selected else ""
+                    fg = self.SELECT_FG if selected else "black"
+                    x = 20 if self._grouped else 4
+                self.coords(bg, 0, y, width, y + row_h)
+                self.itemconfigure(bg, fill=fill, state=tk.NORMAL)
+                self.coords(text, x, y + row_h / 2)
+                self.itemconfigure(text, text=label, fill=fg, state=tk.NORMAL)
+            y += row_h
+        self._update_scrollbar()
+
+    # --- イベントハンドラ ---
+    def _on_click(self, event):
+        """クリックされた行に応じて、項目の選択またはグループの開閉を行います。
+
+        Args:
+            event (tk.Event): マウスクリックイベント。
+        """
+        self.focus_set()
+        entry = self._row_to_item((self._offset + event.y) // self._row_height)
+        if entry is None:
+            return
+        kind, value = entry
+        if kind == "header":
+            self._toggle_group(value)
+        elif value != self._selected:
+            self._selected = value
+            self._redraw()
+            self.event_generate("<<ListboxSelect>>")
+
+    def _on_mousewheel(self, event):
+        """マウスホイールでスクロールします。
+
+        Args:
+            event (tk.Event): マウスホイールイベント。
+        """
+        tk_platform = self.tk.call("tk", "windowingsystem")
+        delta = event.delta / 120 if tk_platform == "win32" else event.delta
+        self.yview_scroll(int(-3 * delta), "units")
+
+    def _move_selection(self, step):
+        """キーボード操作で選択を移動し、`<<ListboxSelect>>` を発生させます。
+
+        Args:
+            step (int): 移動する項目数。負の値で上方向。
+        """
+        if self._count == 0:
+            return
+        current = self._selected if self._selected is not None else (-1 if step > 0 else self._count)
+        index = max(0, min(current + step, self._count - 1))
+        if index == self._selected:
+            return
+        self._selected = index
+        self._expand_group_of(index)
+        self.see(index)
+        self._redraw()
+        self.event_generate("<<ListboxSelect>>")
@@ -0,0 +1,94 @@
+"""プレビュー用画像変換のマイクロベンチマーク。
+
+従来の PPM 経由の変換 (`pix.tobytes("ppm")` → `tk.PhotoImage(data=...)`) と、
+`renderer.render_page_to_photo` による変換を比較し、1メガピクセルあたりの
+処理時間 (ms/MP) を表示します。Tkinter を利用するため、ディスプレイのある
+環境で実行してください。
+
+使い方:
+    python benchmarks/bench_render.py [PDFファイル] [--scales 1.0 2.0] [--repeat 10]
+"""
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from PdfHighlightViewer.pdf import renderer
+
+
+def build_sample_document():
+    """PDFが指定されなかった場合に使う、文字と図形を含むA4ドキュメントを生成します。"""
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    for i in range(60):
+        page.insert_text((40, 40 + i * 13), f"Sample line {i} " * 6, fontsize=9)
+        page.draw_rect(fitz.Rect(40, 30 + i * 13, 300, 42 + i * 13), color=None, fill=(1, 1, 0.2), overlay=False)
+    return doc
+
+
+def legacy_convert(page, scale):
+    """変更前の `display_page` と同じ変換経路。"""
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale))
+    return tk.PhotoImage(data=pix.tobytes("ppm")), pix.width * pix.height
+
+
+def zero_copy_convert(page, scale, photo):
+    """`renderer.render_page_to_photo` によるPhotoImage再利用の変換経路。"""
+    photo = renderer.render_page_to_photo(page, scale, photo=photo)
+    return photo, photo.width() * photo.height()
+
+
+def measure(func, repeat):
+    """funcを repeat 回実行し、(1回あたりの秒数, ピクセル数) を返します。"""
+    pixels = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        pixels = func()
+    return (time.perf_counter() - start) / repeat, pixels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf", nargs="?", help="計測に使うPDFファイル (省略時はサンプルを生成)")
+    parser.add_argument("--page", type=int, default=0, help="計測するページ番号 (0-indexed)")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 2.0, 3.0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    doc = fitz.open(args.pdf) if args.pdf else build_sample_document()
+    page = doc[args.page]
+
+    root = tk.Tk()
+    root.withdraw()
+
+    print(f"{'scale':>6} {'MP':>7} {'legacy ms/MP':>14} {'new ms/MP':>11} {'speedup':>8}")
+    for scale in args.scales:
+        # 1回目はウォームアップとして計測から除外する
+        legacy_convert(page, scale)
+        holder = {"photo": zero_copy_convert(page, scale, None)[0]}
+
+        def run_legacy():
+            return legacy_convert(page, scale)[1]
+
+        def run_new():
+            holder["photo"], pixels = zero_copy_convert(page, scale, holder["photo"])
+            return pixels
+
+        legacy_sec, pixels = measure(run_legacy, args.repeat)
+        new_sec, _ = measure(run_new, args.repeat)
+        megapixels = pixels / 1_000_000
+        legacy_ms = legacy_sec * 1000 / megapixels
+        new_ms = new_sec * 1000 / megapixels
+        print(f"{scale:>6.2f} {megapixels:>7.2f} {legacy_ms:>14.2f} {new_ms:>11.2f} {legacy_ms / new_ms:>7.2f}x")
+
+    root.destroy()
+    doc.close()
+
+
+if __name__ == "__main__":
+    main()
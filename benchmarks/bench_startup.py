@@ -0,0 +1,78 @@
+"""アプリケーションの起動時間のベンチマーク。
+
+新しいPythonプロセスで `PdfHighlightViewer.ui.main_window` を読み込む時間を
+計測し、起動時に重いライブラリ (PyMuPDF, openpyxl, Pillow) が読み込まれて
+いるかどうかを表示します。`--window` を指定すると、メインウィンドウを作成して
+最初に表示されるまでの時間も計測します (ディスプレイのある環境で実行してください)。
+
+使い方:
+    python benchmarks/bench_startup.py [--repeat 10] [--window]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 起動時に読み込まれているかどうかを確認するモジュール
+HEAVY_MODULES = ["fitz", "openpyxl", "PIL.Image", "concurrent.futures.process"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import PdfHighlightViewer.ui.main_window
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+WINDOW_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from PdfHighlightViewer.ui.main_window import MainWindow
+window = MainWindow()
+while not window.winfo_ismapped():
+    window.update()
+elapsed = time.perf_counter() - start
+window.destroy()
+print(json.dumps({"seconds": elapsed}))
+"""
+
+
+def run_script(script):
+    """新しいPythonプロセスでスクリプトを実行し、出力されたJSONを返します。"""
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(script, repeat):
+    """スクリプトを repeat 回実行し、(秒数の中央値, 最後の結果) を返します。"""
+    results = [run_script(script) for _ in range(repeat)]
+    return statistics.median(result["seconds"] for result in results), results[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--window", action="store_true", help="ウィンドウの表示までの時間も計測する")
+    args = parser.parse_args()
+
+    # 1回目はバイトコードの生成を含むため、ウォームアップとして計測から除外する
+    run_script(IMPORT_SCRIPT % (HEAVY_MODULES,))
+
+    seconds, result = measure(IMPORT_SCRIPT % (HEAVY_MODULES,), args.repeat)
+    print(f"{'import main_window':<22} {seconds * 1000:>8.1f} ms")
+    for module in HEAVY_MODULES:
+        state = "loaded" if module in result["loaded"] else "-"
+        print(f"  {module:<28} {state}")
+
+    if args.window:
+        seconds, _ = measure(WINDOW_SCRIPT, args.repeat)
+        print(f"{'first window frame':<22} {seconds * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()